@@ -0,0 +1,127 @@
+import struct
+from array import array
+import bitmaptools
+from displayio import Bitmap
+from fontio import Glyph
+
+# Bitmap fonts in the precompiled format built by tools/build_fonts.py, so
+# loading one doesn't parse any BDF text.
+#
+# The file starts with an index from code point to glyph (two levels, by the
+# high and then the low byte, so a lookup is two array reads) and a table
+# of glyph metrics. Both are read into memory when the font is opened.
+# Glyph bitmaps stay in the file, and are read the first time each glyph is
+# asked for.
+
+_HEADER_FORMAT = "<4sBhhhhhhHH"
+_GLYPH_FORMAT = "<BBbbbbI"
+_GLYPH_SIZE = struct.calcsize(_GLYPH_FORMAT)
+_NO_GLYPH = 0xFFFF
+
+class BinaryFont:
+    def __init__(self, path, bitmap_class=Bitmap):
+        self._bitmap_class = bitmap_class
+        self._file = open(path, "rb")
+
+        header = self._file.read(struct.calcsize(_HEADER_FORMAT))
+        magic, version, width, height, x_offset, y_offset, ascent, descent, glyph_count, page_count = struct.unpack(_HEADER_FORMAT, header)
+
+        if magic != b"BFNT" or version != 1:
+            self._file.close()
+            raise ValueError("Unrecognized font file")
+
+        self._bounding_box = (width, height, x_offset, y_offset)
+        self.ascent = ascent
+        self.descent = descent
+
+        # Page number + 1 (0 for none) by the high byte of the code point,
+        # then 256 glyph indexes per page by the low byte.
+        self._pages = self._file.read(256)
+        self._glyph_indexes = array("H", self._file.read(page_count * 512))
+        self._glyph_table = self._file.read(glyph_count * _GLYPH_SIZE)
+        self._bitmaps_start = self._file.tell()
+
+        self._glyphs = {}
+        self._glyph_bytes = 0
+
+    def get_bounding_box(self):
+        return self._bounding_box
+
+    # Read the bitmaps for code points (a string, a code point, or an
+    # iterable of code points) ahead of get_glyph.
+    def load_glyphs(self, code_points):
+        if isinstance(code_points, int):
+            code_points = (code_points,)
+        elif isinstance(code_points, str):
+            code_points = [ord(c) for c in code_points]
+
+        for code_point in code_points:
+            if code_point not in self._glyphs:
+                self._load_glyph(code_point)
+
+    def get_glyph(self, code_point):
+        glyph = self._glyphs.get(code_point)
+
+        if glyph is None and code_point not in self._glyphs:
+            glyph = self._load_glyph(code_point)
+
+        return glyph
+
+    # Number of glyphs read so far.
+    @property
+    def loaded_count(self):
+        return len(self._glyphs)
+
+    # Rough bytes held in memory: the index and metrics, plus the bitmaps
+    # of the glyphs read so far.
+    @property
+    def resident_bytes(self):
+        return len(self._pages) + len(self._glyph_indexes) * 2 + len(self._glyph_table) + self._glyph_bytes
+
+    # Forget the glyphs read so far, to free their memory. They're read
+    # again the next time they're asked for.
+    def unload_glyphs(self):
+        self._glyphs = {}
+        self._glyph_bytes = 0
+
+    def _glyph_index(self, code_point):
+        if code_point < 0 or code_point > 0xFFFF:
+            return _NO_GLYPH
+
+        page = self._pages[code_point >> 8]
+
+        if page == 0:
+            return _NO_GLYPH
+
+        return self._glyph_indexes[(page - 1) * 256 + (code_point & 0xFF)]
+
+    def _load_glyph(self, code_point):
+        index = self._glyph_index(code_point)
+
+        if index == _NO_GLYPH:
+            # Remember it's missing, so it isn't looked up again.
+            self._glyphs[code_point] = None
+            return None
+
+        width, height, dx, dy, shift_x, shift_y, offset = struct.unpack_from(_GLYPH_FORMAT, self._glyph_table, index * _GLYPH_SIZE)
+        bitmap = self._bitmap_class(width, height, 2)
+
+        if width > 0 and height > 0:
+            # Rows are padded to whole bytes, MSB first.
+            self._file.seek(self._bitmaps_start + offset)
+            bitmaptools.readinto(bitmap, self._file, bits_per_pixel=1, element_size=1)
+
+        glyph = Glyph(bitmap, 0, width, height, dx, dy, shift_x, shift_y)
+        self._glyphs[code_point] = glyph
+
+        # Bitmap rows are stored in 32 bit words.
+        self._glyph_bytes += height * ((width + 31) // 32) * 4
+        return glyph
+
+# Bytes a font's index and metrics would take once opened, from its header.
+def index_bytes(path):
+    with open(path, "rb") as f:
+        header = struct.unpack(_HEADER_FORMAT, f.read(struct.calcsize(_HEADER_FORMAT)))
+
+    glyph_count, page_count = header[-2], header[-1]
+    return 256 + page_count * 512 + glyph_count * _GLYPH_SIZE
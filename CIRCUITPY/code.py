@@ -6,7 +6,7 @@ import random
 from math import ceil
 
 import rtc
-from adafruit_ticks import ticks_ms, ticks_diff, ticks_add
+from adafruit_ticks import ticks_diff
 
 import displayio
 
@@ -61,11 +61,7 @@ def sync_orientation():
     display.rotation = orientation.sync(display.rotation, accel.x, accel.y)
 
 # Coordinate display refresh with orientation handling.
-def refresh_display(wait=True):
-    # Sleep until we can refresh the display
-    if wait == True and display.time_to_refresh > 0:
-        time.sleep(display.time_to_refresh)
-
+def refresh_panel():
     # Sync the display with the accelerometer
     accel = accelerometer.acceleration
     display.rotation = orientation.sync(display.rotation, accel.x, accel.y)
@@ -75,11 +71,26 @@ def refresh_display(wait=True):
     except Exception as err:
         print(err)
 
+# Refreshes only happen when something on screen changed, and never block
+# the main loop waiting for the display to be ready.
+from refresh_scheduler import RefreshScheduler
+refresh_scheduler = RefreshScheduler(display, refresh_panel)
+
+# Refresh the whole screen, e.g. after showing a new root group.
+def refresh_display(wait=True):
+    refresh_scheduler.invalidate()
+
+    if wait:
+        refresh_scheduler.refresh_now()
+    else:
+        refresh_scheduler.request()
+        refresh_scheduler.update()
+
 ###############
 # Layout
 ###############
-from layout_helper import LayoutHelper
-layout = LayoutHelper(display_width=display.width, display_height=display.height)
+from layout_helper import LayoutHelper, MAX_LOCATION_LINES
+layout = LayoutHelper(display_width=display.width, display_height=display.height, layout_cache_size=config.LAYOUT_CACHE_SIZE)
 
 ##################
 # Splash screen
@@ -173,28 +184,59 @@ def next_splash():
 # Sync orientation for the first time
 sync_orientation()
 
-# Display initial splash screen
-display.root_group = show_splash()
-next_splash_led()
-refresh_display()
-
 ###################################
-# Connect to WiFi
+# Snapshot
 ###################################
-from network_helper import Network
-network = Network()
-network.connect_to_wifi(on_retry=next_splash)
+# What was on the map before the last reload, if anything. If there is,
+# the map is shown again straight away and the splash screens are skipped.
+from snapshot import Snapshot, SnapshotStore
+snapshot_store = None
+resume_snapshot = None
+
+if config.SNAPSHOT is not None:
+    snapshot_store = SnapshotStore(config.SNAPSHOT)
+    resume_snapshot = snapshot_store.load()
+
+# Connecting and syncing the time can take a while, so without a snapshot
+# there's a splash screen to look at; with one, this waits for the map.
+from network_helper import Network, GeoData
+
+# Where requests go (see NETWORK_TRANSPORT in config.py).
+network_transport = None
+
+if config.NETWORK_TRANSPORT == "replay":
+    from network_transport import ReplayTransport
+    network_transport = ReplayTransport(config.NETWORK_TRACE_FILE, speed=config.NETWORK_REPLAY_SPEED)
+elif config.NETWORK_TRANSPORT == "synthetic":
+    from network_transport import SyntheticTransport
+    network_transport = SyntheticTransport(clock=time.time)
+
+network = Network(
+    transport=network_transport,
+    record_path=config.NETWORK_TRACE_FILE if config.NETWORK_TRANSPORT == "record" else None
+)
 
-# Go to next splash screen, if we can
-next_splash()
+# Connect to WiFi and get the current time.
+def connect_network(on_retry=None):
+    network.connect_to_wifi(on_retry=on_retry)
 
-###################################
-# Get current time
-###################################
-rtc.RTC().datetime = network.fetch_time(on_retry=next_splash)
+    # Go to next splash screen, if we can
+    if on_retry is not None:
+        on_retry()
+
+    rtc.RTC().datetime = network.fetch_time(on_retry=on_retry)
 
-# Go to next splash screen, if we can
-next_splash()
+    # Go to next splash screen, if we can
+    if on_retry is not None:
+        on_retry()
+
+if resume_snapshot is None:
+    # Display initial splash screen
+    display.root_group = show_splash()
+    next_splash_led()
+    refresh_display()
+
+    connect_network(on_retry=next_splash)
 
 ###################################
 # World map
@@ -208,55 +250,56 @@ world_map_group.append(map_sprite)
 
 display.root_group = displayio.Group()
 display.root_group.append(world_map_group)
+refresh_scheduler.invalidate()
 
-# History markers
-from history_marker import HistoryMarker
+# Predicted ground track, drawn as a dotted line ahead of the ISS, under the trail.
+predicted_track = None
 
-# Convert to milliseconds
-HISTORY_MARKER_DURATION = config.HISTORY_MARKER_DURATION * 60 * 1000
+if config.PREDICTED_TRACK_ORBITS > 0:
+    from predicted_track import PredictedTrack
 
-# History marker storage
-history_markers = []
+    def lat_lon_to_map(lat, lon):
+        x, y = layout.lat_lon_to_screen(lat, lon)
+        return x - layout.map_x_offset, y
 
-# History marker rendering
-history_markers_group = displayio.Group()
-display.root_group.append(history_markers_group)
+    predicted_track = PredictedTrack(
+        width=layout.map_width,
+        height=layout.map_height,
+        to_map=lat_lon_to_map,
+        orbits=config.PREDICTED_TRACK_ORBITS,
+        tolerance=config.PREDICTED_TRACK_TOLERANCE
+    )
+    predicted_track.tile_grid.x = layout.map_x_offset
+    display.root_group.append(predicted_track.tile_grid)
 
-def add_history_marker(x, y):
-    new_shape = Circle(x, y, layout.history_marker_radius, fill=0, stroke=0)
-    history_markers.append(HistoryMarker(sprite=new_shape, time_to_live=HISTORY_MARKER_DURATION))
-    history_markers_group.append(new_shape)
+# Move the predicted track along to now, checking it against the fix if there is one.
+def update_predicted_track(now, fix=None):
+    if predicted_track is not None and predicted_track.update(position_source.usable_orbit(now), now, fix):
+        refresh_scheduler.mark_dirty(layout.map_region)
 
-def update_history_markers(dt):
-    removed_markers = []
+# History markers, drawn as a trail of shrinking dots.
+from trail_layer import TrailLayer
 
-    for marker_index in range(0, len(history_markers)):
-        marker = history_markers[marker_index]
+# Convert to milliseconds
+HISTORY_MARKER_DURATION = config.HISTORY_MARKER_DURATION * 60 * 1000
 
-        marker.time_to_live -= dt
-        # print(f"history marker {marker_index} time to live: {marker.time_to_live}")
+# Enough room for a marker from every refresh within the marker lifetime.
+history_trail = TrailLayer(
+    width=layout.map_width,
+    height=layout.map_height,
+    capacity=ceil(config.HISTORY_MARKER_DURATION * 60 / config.REFRESH_INTERVAL) + 1,
+    radius=layout.history_marker_radius,
+    duration=HISTORY_MARKER_DURATION
+)
+history_trail.tile_grid.x = layout.map_x_offset
+display.root_group.append(history_trail.tile_grid)
 
-        if marker.time_to_live <= 0:
-            # print(f"history marker {marker_index} is dead, removing")
-            # history_markers_group.remove(marker.sprite)
-            removed_markers.append(marker)
-        else:
-            # Decay linearly with time
-            ratio = marker.time_to_live / HISTORY_MARKER_DURATION
-            radius = ceil(ratio * layout.history_marker_radius)
-
-            # If our radius has changed, replace the old sprite with a one with the new radius.
-            if radius == 0:
-                removed_markers.append(marker)
-            elif marker.sprite.r != radius:
-                new_sprite = Circle(marker.sprite.x0, marker.sprite.y0, radius, fill=0, stroke=0)
-                marker.sprite = new_sprite
-                history_markers_group.pop(marker_index)
-                history_markers_group.insert(marker_index, new_sprite)
-
-    for marker in removed_markers:
-        history_markers_group.remove(marker.sprite)
-        history_markers.remove(marker)
+def add_history_marker(x, y):
+    history_trail.add(x - layout.map_x_offset, y)
+
+def update_history_markers(dt):
+    if history_trail.update(dt):
+        refresh_scheduler.mark_dirty(layout.map_region)
 
 # Home icon
 home_x, home_y = layout.lat_lon_to_screen(config.HOME_LATITUDE, config.HOME_LONGITUDE)
@@ -302,8 +345,14 @@ display.root_group.append(distance_label)
 
 def set_distance_text(dist):
     distance_text = f"{dist}"
-    distance_label.font = layout.font_for_distance_text(distance_text)
+    font = layout.font_for_distance_text(distance_text)
+
+    if distance_text == distance_label.text and font is distance_label.font:
+        return
+
+    distance_label.font = font
     distance_label.text = distance_text
+    refresh_scheduler.mark_dirty(layout.distance_region)
 
 # Distance units label
 distance_units_label = Label(
@@ -321,6 +370,12 @@ location_label_group.x = layout.text_left_margin
 location_label_group.y = layout.location_name_y_offset
 display.root_group.append(location_label_group)
 
+# One Label per line of the location name, reused for every name. They're
+# made with the built-in font, so no location font is read until a name is
+# shown in it.
+from label_pool import LabelPool
+location_labels = LabelPool(location_label_group, MAX_LOCATION_LINES, fonts.REGULAR_8)
+
 # Last updated label
 timestamp_label = Label(
     font=fonts.REGULAR_8,
@@ -332,41 +387,50 @@ timestamp_label = Label(
 timestamp_label.anchored_position = (layout.display_width, layout.display_height)
 display.root_group.append(timestamp_label)
 
+# Next pass label, just above the timestamp.
+pass_label = Label(
+    font=fonts.REGULAR_8,
+    text="",
+    anchor_point=(1.0, 1.0),
+    color=0x000000,
+    background_color = 0xFFFFFF
+)
+pass_label.anchored_position = (layout.display_width, layout.display_height - layout.timestamp_bg_height)
+display.root_group.append(pass_label)
+
 # Set formatted location text
+location_text = None
+
 def set_location_text(text):
-    n = len(location_label_group)
-    for i in range(0, n):
-        location_label_group.pop()
+    global location_text
+
+    if text == location_text:
+        return
+
+    location_text = text
+    refresh_scheduler.mark_dirty(layout.location_region)
 
     if text is None or text == "":
+        location_labels.clear()
         return
 
     layout_result = layout.layout_location_name(text)
     
     if layout_result is None:
         # Should probably throw but oh well
+        location_labels.clear()
         return
 
     print("rendered text:")
 
-    y = 0
     for line in layout_result.lines:
         print(f"    {line}")
 
-        label = Label(
-            font=layout_result.font,
-            text=line,
-            color=0
-        )
-
-        label.y = y
-        y += layout_result.line_height
-
-        location_label_group.append(label)
+    location_labels.show(layout_result.lines, layout_result.font, layout_result.line_height)
 
 # Update map with new ISS coordinates
 def update_map(lat, lon):
-    global history_markers_group, iss_marker
+    global iss_marker
 
     # Update the current position marker
     iss_x, iss_y = layout.lat_lon_to_screen(lat, lon)
@@ -376,10 +440,34 @@ def update_map(lat, lon):
 
     # Add a new history marker at the current position
     add_history_marker(iss_x, iss_y)
+    refresh_scheduler.mark_dirty(layout.map_region)
 
     # Update timestamp label not now
     now = time.localtime()
-    timestamp_label.text = f"{now.tm_mon:02}/{now.tm_mday:02} {now.tm_hour:02}:{now.tm_min:02}:{now.tm_sec:02} UTC"
+    timestamp_text = f"{now.tm_mon:02}/{now.tm_mday:02} {now.tm_hour:02}:{now.tm_min:02}:{now.tm_sec:02} UTC"
+
+    if timestamp_text != timestamp_label.text:
+        timestamp_label.text = timestamp_text
+        refresh_scheduler.mark_dirty(layout.timestamp_region)
+
+    set_pass_text(time.time())
+
+# Count down to the next pass over home, or say it's on.
+def set_pass_text(now):
+    next_pass = pass_predictor.next_pass(now) if passes_predicted(now) else None
+
+    if next_pass is None:
+        pass_text = ""
+    elif next_pass.rise_time <= now:
+        pass_text = "overhead now"
+    else:
+        # Round up, so it doesn't say 00:00 before the pass has started.
+        minutes = (next_pass.rise_time - now + 59) // 60
+        pass_text = f"next pass in {minutes // 60:02}:{minutes % 60:02}"
+
+    if pass_text != pass_label.text:
+        pass_label.text = pass_text
+        refresh_scheduler.mark_dirty(layout.pass_region)
 
 ##################
 # Buttons
@@ -404,9 +492,6 @@ def update_buttons():
 ##################
 # LEDs
 ##################
-night_light_on = False
-is_close_to_home = False
-
 # True if a night light toggle button was just pressed.
 # The right-most 3 buttons toggle the night light
 def night_light_toggled():
@@ -446,11 +531,9 @@ def set_busy_led_color(color):
         neopixel[0] = color
 
 def update_leds():
-    global night_light_on, is_close_to_home
-
-    if is_close_to_home:
+    if state.is_close_to_home:
         resting_color = config.CLOSE_BY_COLOR
-    elif night_light_on:
+    elif state.night_light_on:
         resting_color = config.NIGHTLIGHT_COLOR
     else:
         resting_color = 0x000000
@@ -460,169 +543,383 @@ def update_leds():
 #############################
 # State tracking
 #############################
-import supervisor
+# State shared between the main loop tasks.
+class LoopState:
+    def __init__(self):
+        # Latest ISS (lat, lon) and when it was, whether it still needs a
+        # location name, and the GeoData it got.
+        self.coordinate = None
+        self.fix_time = 0
+        self.needs_geodata = False
+        self.geodata = None
 
-# Update interval tracking
-last_refresh_time = 0
+        # Distance to home. Both units are kept, so toggling units doesn't need recomputing.
+        self.home_range = None
+        self.is_close_to_home = False
 
-# Occasionally, it seems like requests start to fail after the device has been running for awhile,
-# and they never succeed again after that. Everything works again after a reboot and re-connection.
-# Thus, as a workaround, if we notice too many failures in a row, soft reboot the device.
-# Not ideal, but unless/until I find a proper fix, it's better than just sitting there
-# for hours failing and waiting for a manual reboot.
-consecutive_refresh_failures = 0
+        self.night_light_on = False
 
-def on_refresh_coordinate(succeeded):
-    global consecutive_refresh_failures    
+        # Track whether currently displaying miles or km.
+        # Initialize to whatever the user has decided for the default.
+        self.is_displaying_miles = config.USE_MILES
 
-    if succeeded:
-        consecutive_refresh_failures = 0
-    else:
-        consecutive_refresh_failures += 1
+state = LoopState()
 
-        if consecutive_refresh_failures >= 5:
-            print("Too many consecutive coordinate refresh failures, reloading...")
-            supervisor.reload()
+# Distance to home.
+from home_distance import HomeDistance
+home_distance = HomeDistance(config.HOME_LATITUDE, config.HOME_LONGITUDE, config.CLOSE_BY_DISTANCE, use_miles=config.USE_MILES)
 
-# Track whether currently displaying miles or km.
-# Initialize to whatever the user has decided for the default.
-is_displaying_miles = config.USE_MILES
+# Get distance to home in whatever units we're currently displaying
+def get_distance_to_home():
+    if state.home_range is None:
+        return 100000
 
-# Distance to home
-distance_in_miles = 100000
+    return int(state.home_range.miles if state.is_displaying_miles else state.home_range.km)
 
-def distance_in_km():
-    global distance_in_miles
-    return distance_in_miles * 1.60934
+# Turn off all LEDs
+neopixel.fill(0x000000)
 
-# Get distance to home in whatever units we're currently displaying
-def get_distance_to_home():
-    global distance_in_miles, is_displaying_miles
-    return int(distance_in_miles if is_displaying_miles else distance_in_km())    
+# ISS position, propagated locally or downloaded, depending on config.
+from position_source import PositionSource, SOURCE_OPEN_NOTIFY
+position_source = PositionSource(
+    network,
+    mode=config.POSITION_SOURCE,
+    tle_refresh_interval=config.TLE_REFRESH_INTERVAL * 60 * 60,
+    correction_interval=config.POSITION_CORRECTION_INTERVAL * 60,
+    correction_tolerance=config.POSITION_CORRECTION_TOLERANCE,
+    fetch_interval=config.OPEN_NOTIFY_INTERVAL * 60
+)
 
-# Return "close-by" distance, based on display units and default units.
-def get_close_by_distance():
-    global is_displaying_miles
+# Passes over home, predicted from the ISS's orbit. A pass is while it's within
+# the close-by distance, which from home is the same as above some elevation.
+pass_predictor = None
+
+if config.PASS_PREDICTIONS:
+    from pass_predictor import PassPredictor, elevation_at_distance
+    pass_predictor = PassPredictor(
+        config.HOME_LATITUDE,
+        config.HOME_LONGITUDE,
+        min_elevation=elevation_at_distance(home_distance.close_by_distance(use_miles=False))
+    )
+
+# True if being close to home is decided by predicted passes, rather than by
+# where each refresh finds the ISS.
+def passes_predicted(now):
+    return pass_predictor is not None and position_source.usable_orbit(now) is not None
+
+# Offline ocean lookup, so we don't need geoapify to tell us we're over the ocean.
+land_mask = None
+
+if config.OFFLINE_OCEAN_NAMES:
+    from land_mask import LandMask
+    land_mask = LandMask()
+
+# Offline country and state lookup, for when geoapify can't name a place.
+offline_geocoder = None
+
+if config.OFFLINE_GEOCODER:
+    from offline_geocoder import OfflineGeocoder
+    offline_geocoder = OfflineGeocoder()
+
+# Geoapify gives city-level detail, but isn't required if we have the offline geocoder.
+use_geoapify = config.GEOAPIFY_LOOKUPS and network.has_geodata_key
+
+# Reverse geocoding cache, so we don't hit geoapify for places we've already been.
+from geodata_cache import GeoDataCache
+geodata_cache = GeoDataCache(
+    capacity=config.GEODATA_CACHE_SIZE,
+    cell_size=config.GEODATA_CACHE_CELL_SIZE,
+    path=config.GEODATA_CACHE_FILE
+)
 
-    if is_displaying_miles:
-        if not config.USE_MILES:
-            return config.CLOSE_BY_DISTANCE * 1.60934
-    else:
-        if config.USE_MILES:
-            return config.CLOSE_BY_DISTANCE / 1.60934    
+# Returns True if a snapshot was saved.
+def save_snapshot():
+    if snapshot_store is None or state.coordinate is None:
+        return False
 
-    return config.CLOSE_BY_DISTANCE        
+    return snapshot_store.save(Snapshot(
+        saved_at=time.time(),
+        fix_time=state.fix_time,
+        coordinate=state.coordinate,
+        trail=history_trail.points(),
+        geodata=state.geodata
+    ))
 
-# Turn off all LEDs
-neopixel.fill(0x000000)
+# Occasionally, it seems like requests start to fail after the device has been running for awhile,
+# and they never succeed again after that. The network supervisor backs off, then starts over with
+# a new session, socket pool or radio connection, and only reloads if none of that helps. Save the
+# map first, so it comes straight back after the reload.
+network.before_reload = save_snapshot
 
-# Final imports needed for main loop
-from haversine import haversine
+# Put the map back the way it was when the snapshot was taken. The position
+# and location name stay until the first refresh replaces them.
+def restore_snapshot(snapshot):
+    print(f"Resuming from snapshot: {snapshot.coordinate}, {len(snapshot.trail)} trail dots")
 
-####################
-# Main loop
-####################
-while True:
-    # If this is True by the end of the loop, the display will be refreshed.
-    display_needs_refresh = False
+    for x, y, age in snapshot.trail:
+        history_trail.add(x, y, age)
+
+    if snapshot.coordinate is not None:
+        lat, lon = snapshot.coordinate
+        iss_marker.x0, iss_marker.y0 = layout.lat_lon_to_screen(lat, lon)
+        iss_marker.hidden = False
+
+        state.coordinate = snapshot.coordinate
+        state.fix_time = snapshot.fix_time
+        state.home_range = home_distance.measure(lat, lon)
+        state.is_close_to_home = state.home_range.is_close_by
+        set_distance_text(get_distance_to_home())
+
+    if snapshot.geodata is not None:
+        state.geodata = GeoData(*snapshot.geodata)
+        set_location_text(layout.location_name_from_geodata(state.geodata))
 
-    # Refresh data when it's time. This is a blocking call, so we the status LED to indicate that we're busy.
-    last_refreshed_dt = ticks_diff(ticks_ms(), last_refresh_time)
+if resume_snapshot is not None:
+    restore_snapshot(resume_snapshot)
+    refresh_display()
 
-    if last_refresh_time == 0 or last_refreshed_dt >= config.REFRESH_INTERVAL * 1000:
+    connect_network()
+
+    # Age the trail by however long it's been since the snapshot, now that
+    # the clock is right again.
+    update_history_markers(int(max(time.time() - resume_snapshot.saved_at, 0) * 1000))
+
+####################
+# Main loop tasks
+####################
+# Each task is a generator that does a step of work and yields the ms to
+# wait until its next step. The network requests still block, but buttons,
+# orientation and LEDs get a turn between the position and geodata ones,
+# and each task's step times are reported with the other stats.
+from task_scheduler import Scheduler
+scheduler = Scheduler()
+
+# Fetches the ISS position every REFRESH_INTERVAL, and updates the distance,
+# map and trail. Naming the new position is left to the geodata resolver.
+def position_poller():
+    last_poll_time = None
+
+    while True:
         gc.collect()
         print(f"\n--- Free memory: {gc.mem_free()} ---")
 
-        print("Fetching latest ISS coordinate")
+        print("Getting latest ISS coordinate")
         set_busy_led_color(config.FETCH_LOCATION_COLOR)
-        coordinate = network.fetch_iss_coordinate()
-
-        # Track if we succeeded fetching the coordinate or not.
-        on_refresh_coordinate(succeeded=(coordinate is not None))
+        now = time.time()
+        coordinate = position_source.position(now)
 
         if coordinate is not None:
-            # Since the network requests are blocking, track the time it takes for them to complete,
-            # so we can apply that time to our history markers decay rate; otherwise, it won't be accounted for.
-            requests_start_time = ticks_ms()
-
             # unpack coordinate
             lat, lon = coordinate[0], coordinate[1]
-            print(f"    ISS coordinate: {lat}, {lon}")
+            print(f"    ISS coordinate ({position_source.last_source}): {lat}, {lon}")
 
-            # Get distance to home using the Haversine formula.
-            distance_in_miles = haversine(lat, lon, config.HOME_LATITUDE, config.HOME_LONGITUDE, use_miles=True)
-
-            # Get our distance to home and our close-by distance.
-            distance_to_home = get_distance_to_home()
-            close_by_distance = get_close_by_distance()
+            # Get distance and bearing from home, and whether we're close to home, in one go.
+            state.home_range = home_distance.measure(lat, lon)
+            print(f"    Home: {state.home_range.km:.0f} km, bearing {state.home_range.bearing:.0f}")
 
             # Update distance label
-            set_distance_text(distance_to_home)
+            set_distance_text(get_distance_to_home())
+
+            # Flag whether we're close to home or not, unless the pass tracker does.
+            if not passes_predicted(time.time()):
+                state.is_close_to_home = state.home_range.is_close_by
 
-            # Flag whether we're close to home or not.
-            is_close_to_home = distance_to_home <= close_by_distance
-            
-            # Get updated location name
+            # Update map
+            update_map(lat, lon)
+
+            state.coordinate = (lat, lon)
+            state.fix_time = time.time()
+            state.needs_geodata = True
+
+        # Only a downloaded position can say the track is off; a propagated
+        # one is on the unshifted orbit, so it would undo any correction.
+        update_predicted_track(now, coordinate if position_source.last_source == SOURCE_OPEN_NOTIFY else None)
+
+        # Make history markers size decay with the time since the last poll,
+        # which includes however long the requests took.
+        if last_poll_time is not None:
+            update_history_markers(ticks_diff(scheduler.now, last_poll_time))
+
+        last_poll_time = scheduler.now
+
+        yield config.REFRESH_INTERVAL * 1000
+
+# Names the latest position, offline or from the cache if possible, and asks
+# for a refresh once it has, so the new position and its name go out together.
+def geodata_resolver():
+    while True:
+        if not state.needs_geodata:
+            yield 0
+            continue
+
+        state.needs_geodata = False
+        lat, lon = state.coordinate
+
+        # Get updated location name, offline or from the cache if possible.
+        if land_mask is not None and not land_mask.is_land(lat, lon):
+            geodata = land_mask.ocean_geodata(lat, lon)
+        else:
+            geodata = geodata_cache.get(lat, lon)
+
+        if geodata is None and use_geoapify:
             print("Fetching geodata for coordinate")
             set_busy_led_color(config.FETCH_GEODATA_COLOR)
-
-            # Fetch geodata and get location name
             geodata = network.fetch_geodata(lat, lon)
-            location_name = layout.location_name_from_geodata(geodata)
-            set_location_text(location_name)
 
-            # Update map
-            update_map(lat, lon)
+            if geodata is not None:
+                geodata_cache.put(lat, lon, geodata)
 
-            # Make history markers size decay with time
-            requests_dt = ticks_diff(ticks_ms(), requests_start_time)
-            
-            if last_refresh_time == 0:
-                total_dt=requests_dt
-                # print(f"Updating history marker list for the first time")
-            else:
-                total_dt = ticks_add(last_refreshed_dt, requests_dt)
-                # print(f"Updating history markers, last_refresh_time: {last_refresh_time}, requests_start_time: {requests_start_time}, last_refreshed_dt: {last_refreshed_dt}, requests_dt: {requests_dt}, total_dt: {total_dt}")
+        print(f"    Geodata cache: {geodata_cache.stats_text()}")
 
-            # Update all history markers with the passage of time
-            update_history_markers(total_dt)
+        # Fall back to offline names. These aren't cached, so geoapify
+        # gets another chance to fill in the details next time around.
+        if geodata is None and offline_geocoder is not None:
+            geodata = offline_geocoder.lookup(lat, lon)
 
-            # Need to refresh the display
-            display_needs_refresh = True
+            # Near the coast, but not in any country.
+            if geodata is None and land_mask is not None:
+                geodata = land_mask.ocean_geodata(lat, lon)
 
-        # Reset data refresh timer
-        last_refresh_time = ticks_ms()
+            print(f"    Offline geodata: {geodata}")
 
-    # Update buttons
-    update_buttons()
+        state.geodata = geodata
+        location_name = layout.location_name_from_geodata(geodata)
+        set_location_text(location_name)
+        print(f"    Layout cache: {layout.layout_cache_stats_text()}")
+        print(f"    Location labels: {location_labels.stats_text()}")
 
-    # Update brightness
-    if brightness_cycled():
-        led_brightness_index += 1
+        fonts.registry.evict_idle(config.FONT_IDLE_REFRESHES)
+        print(f"    Fonts: {fonts.registry.stats_text()}")
 
-        if led_brightness_index >= len(config.LED_BRIGHTNESS_LEVELS):
-            led_brightness_index = 0
+        # Need to refresh the display
+        refresh_scheduler.request()
+        print(f"    Display: changed {refresh_scheduler.dirty_box}, {refresh_scheduler.stats_text()}")
+        print(f"    Network: {network.supervisor.stats_text()}")
 
-        neopixel.brightness = config.LED_BRIGHTNESS_LEVELS[led_brightness_index]
+        if pass_predictor is not None:
+            print(f"    Passes: {pass_predictor.stats_text()}")
 
-    # Update night light toggle
-    if night_light_toggled():
-        night_light_on = not night_light_on
+        if predicted_track is not None:
+            print(f"    Predicted track: {predicted_track.stats_text()}")
 
-    # Update distance units toggle
-    if distance_units_toggled():
-        is_displaying_miles = not is_displaying_miles
-        distance_label.text = f"{get_distance_to_home()}"
-        distance_units_label.text = layout.units_text(is_displaying_miles)        
-        display_needs_refresh = True
+        print(f"    Tasks: {scheduler.stats_text()}")
 
-    # Update orientation if necessary
-    accel = accelerometer.acceleration
-    orientation_dirty = display.rotation != orientation.sync(display.rotation, accel.x, accel.y)
+        yield 0
+
+# Polls the buttons for brightness, night light and distance units.
+def input_handler():
+    global led_brightness_index
+
+    while True:
+        update_buttons()
+
+        # Update brightness
+        if brightness_cycled():
+            led_brightness_index += 1
+
+            if led_brightness_index >= len(config.LED_BRIGHTNESS_LEVELS):
+                led_brightness_index = 0
+
+            neopixel.brightness = config.LED_BRIGHTNESS_LEVELS[led_brightness_index]
+
+        # Update night light toggle
+        if night_light_toggled():
+            state.night_light_on = not state.night_light_on
+
+        # Update distance units toggle
+        if distance_units_toggled():
+            state.is_displaying_miles = not state.is_displaying_miles
+            distance_label.text = f"{get_distance_to_home()}"
+            distance_units_label.text = layout.units_text(state.is_displaying_miles)
+            refresh_scheduler.mark_dirty(layout.distance_region)
+            refresh_scheduler.request()
+
+        yield 0
+
+# Follows the orientation, and refreshes once the display is ready, if
+# anything changed. Until then, later changes join the pending refresh.
+def display_refresher():
+    # The rotation a refresh was asked for, until the refresh applies it.
+    requested_rotation = None
+
+    while True:
+        accel = accelerometer.acceleration
+        rotation = orientation.sync(display.rotation, accel.x, accel.y)
+
+        if rotation == display.rotation:
+            requested_rotation = None
+        elif rotation != requested_rotation:
+            requested_rotation = rotation
+            refresh_scheduler.invalidate()
+            refresh_scheduler.request()
+
+        if refresh_scheduler.ready:
+            set_busy_led_color(config.DISPLAY_REFRESH_COLOR)
+
+        refresh_scheduler.update()
+
+        yield 0
+
+# Puts the LEDs back to their resting colors after any busy colors.
+def led_animator():
+    while True:
+        update_leds()
 
-    if display_needs_refresh or orientation_dirty:
-        set_busy_led_color(config.DISPLAY_REFRESH_COLOR)
-        refresh_display()
+        yield 0
 
-    # Update LEDs
-    update_leds()
+# Keeps passes over home predicted, and wakes up right when each one starts
+# and ends to turn the close-by LEDs on and off. Checks at least once a
+# minute, to pick up new orbital elements.
+def pass_tracker():
+    announced = None
+
+    while True:
+        now = time.time()
+        pass_predictor.update(position_source.usable_orbit(now), now)
+        next_pass = pass_predictor.next_pass(now) if passes_predicted(now) else None
+
+        if next_pass is None:
+            yield 60 * 1000
+            continue
+
+        # Predictions start over with new orbital elements, so compare by value.
+        if next_pass != announced and next_pass.rise_time > now:
+            announced = next_pass
+            print(f"Next pass over home in {(next_pass.rise_time - now) // 60} minutes, "
+                  f"{next_pass.set_time - next_pass.rise_time + 1} s long, up to {next_pass.max_elevation:.0f} degrees, "
+                  f"from {next_pass.rise_azimuth:.0f} to {next_pass.set_azimuth:.0f} degrees azimuth")
+
+        is_close = next_pass.rise_time <= now
+
+        if is_close != state.is_close_to_home:
+            state.is_close_to_home = is_close
+            print("ISS pass over home started" if is_close else "ISS pass over home ended")
+            set_pass_text(now)
+
+        next_change = next_pass.set_time + 1 if is_close else next_pass.rise_time
+        yield min(next_change - now, 60) * 1000
+
+# Saves what's on the map every SNAPSHOT_INTERVAL, to show again after a reload.
+def snapshot_saver():
+    while True:
+        yield config.SNAPSHOT_INTERVAL * 60 * 1000
+
+        if save_snapshot():
+            print(f"    Snapshot: {snapshot_store.stats_text()}")
+
+scheduler.add("input", input_handler)
+scheduler.add("geodata", geodata_resolver)
+scheduler.add("position", position_poller)
+scheduler.add("display", display_refresher)
+scheduler.add("leds", led_animator)
+
+if pass_predictor is not None:
+    scheduler.add("passes", pass_tracker)
+
+if snapshot_store is not None:
+    scheduler.add("snapshot", snapshot_saver)
+
+####################
+# Main loop
+####################
+scheduler.run_forever()
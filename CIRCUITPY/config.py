@@ -7,6 +7,14 @@ REFRESH_INTERVAL = 60
 # Otherwise, use a value less than 90.
 HISTORY_MARKER_DURATION = 80
 
+# How many orbits ahead to draw the ISS's predicted ground track on the map, as a
+# dotted line, or 0 to not draw it. Only drawn when POSITION_SOURCE is "propagated".
+PREDICTED_TRACK_ORBITS = 1.5
+
+# If a downloaded ISS position is further than this from the predicted track, in km,
+# the track is moved to go through it. A pixel on the map is up to ~200 km.
+PREDICTED_TRACK_TOLERANCE = 50
+
 # Home coordinate. Set this to wherever you are.
 HOME_LATITUDE = 39.742043
 HOME_LONGITUDE = -104.991531
@@ -18,6 +26,13 @@ USE_MILES = True
 # Value is in chosen units, e.g. miles if USE_MILES is True, otherwise km.
 CLOSE_BY_DISTANCE = 1000
 
+# If True, passes over home are predicted from the ISS's orbital elements (so only
+# when POSITION_SOURCE is "propagated"). A pass is while the ISS is within
+# CLOSE_BY_DISTANCE. The time until the next one is shown at the bottom of the map,
+# and the NeoPixels turn on right when it starts and off when it ends, instead of
+# only when a refresh happens to find the ISS close by.
+PASS_PREDICTIONS = True
+
 # What color should the boot/loading LEDs be?
 LOADING_COLOR = 0xFFFF00
 
@@ -37,4 +52,78 @@ NIGHTLIGHT_COLOR = 0xFFFF30
 CLOSE_BY_COLOR = 0xFF0000
 
 # Brightness levels.
-LED_BRIGHTNESS_LEVELS = (0.05, 0.2, 0.4, 0.6, 0.8, 1.0)
\ No newline at end of file
+LED_BRIGHTNESS_LEVELS = (0.05, 0.2, 0.4, 0.6, 0.8, 1.0)
+
+# Where the ISS position comes from on each refresh:
+#   "propagated": computed on the MagTag from the ISS's orbital elements, which are
+#                 downloaded every TLE_REFRESH_INTERVAL hours. Open Notify is only
+#                 checked every POSITION_CORRECTION_INTERVAL minutes.
+#   "open-notify": downloaded from Open Notify every OPEN_NOTIFY_INTERVAL minutes.
+POSITION_SOURCE = "propagated"
+
+# How often in hours to download new orbital elements when POSITION_SOURCE is "propagated".
+TLE_REFRESH_INTERVAL = 6
+
+# How often in minutes to check the computed position against Open Notify.
+POSITION_CORRECTION_INTERVAL = 30
+
+# If the computed position is further than this from Open Notify's, in km,
+# new orbital elements are downloaded right away.
+POSITION_CORRECTION_TOLERANCE = 100
+
+# How often in minutes to download the position from Open Notify, when it's used.
+# In between, the position is estimated from the last few downloaded ones, so
+# the map still moves on every refresh. 0 downloads it on every refresh.
+OPEN_NOTIFY_INTERVAL = 5
+
+# Geoapify results are cached for areas GEODATA_CACHE_CELL_SIZE degrees square,
+# so places the ISS passes over again don't use up requests. Smaller cells
+# give more precise names, larger cells save more requests.
+GEODATA_CACHE_SIZE = 256
+GEODATA_CACHE_CELL_SIZE = 1.0
+
+# Optional file to keep the geodata cache in across restarts, e.g. "/geodata_cache.json".
+# This only works if boot.py remounts the CIRCUITPY drive as writable by CircuitPython.
+GEODATA_CACHE_FILE = None
+
+# Where to keep a snapshot of the map (trail, last position and location name),
+# so it can be shown again straight away after a reload: "nvm" for the
+# microcontroller's non-volatile memory, a file path like "/snapshot.bin" (which
+# needs the drive writable, as for GEODATA_CACHE_FILE), or None to not keep one.
+SNAPSHOT = "nvm"
+
+# How often in minutes to save the snapshot. NVM and flash wear out with writes,
+# so don't make this too short.
+SNAPSHOT_INTERVAL = 10
+
+# Where network requests go, for testing without the real services:
+#   "live": to Open Notify, CelesTrak and Geoapify.
+#   "record": as "live", and each response is also appended to NETWORK_TRACE_FILE
+#             (which needs the drive writable, as for GEODATA_CACHE_FILE).
+#   "replay": nowhere; responses are served from NETWORK_TRACE_FILE, NETWORK_REPLAY_SPEED
+#             times as fast as they were recorded (0 for no wait).
+#   "synthetic": nowhere; responses are made up, following an ISS-like orbit.
+# WiFi and the time server are used in every mode.
+NETWORK_TRANSPORT = "live"
+NETWORK_TRACE_FILE = "/trace.jsonl"
+NETWORK_REPLAY_SPEED = 1
+
+# If True, positions over the open ocean are named from a map stored on the MagTag
+# instead of asking Geoapify, which saves most requests (and time) on every orbit.
+OFFLINE_OCEAN_NAMES = True
+
+# If True, places Geoapify can't name (because it's slow, rate limited, or there's no
+# API key) are named by country and state/province from data stored on the MagTag.
+OFFLINE_GEOCODER = True
+
+# If False, Geoapify is never asked for location names. Only useful with OFFLINE_GEOCODER,
+# which then names every place on land, without city-level detail.
+GEOAPIFY_LOOKUPS = True
+
+# How many location name layouts to remember, so the same name doesn't need to be
+# laid out again on every refresh (e.g. while crossing an ocean or a large country).
+LAYOUT_CACHE_SIZE = 16
+
+# Fonts that haven't been used for this many refreshes have their glyphs
+# dropped from memory (they're read again from flash if needed).
+FONT_IDLE_REFRESHES = 10
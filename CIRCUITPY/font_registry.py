@@ -0,0 +1,127 @@
+import time
+from binary_font import BinaryFont, index_bytes
+
+# Fonts that aren't opened until something first asks them for a glyph, so
+# nothing is read at startup, and fonts that are never needed (most names
+# only ever use one of the three location fonts) never take up memory.
+#
+# The registry tracks which fonts have been used since it was last asked to
+# evict (once per refresh), and forgets the glyphs of any that have sat idle
+# for too many refreshes.
+class FontRegistry:
+    def __init__(self):
+        self._fonts = []
+        self._open_ns = 0
+        self._evictions = 0
+        self._refreshes = 0
+
+    # A font for the file at path, opened on first use.
+    def font(self, path):
+        font = LazyFont(self, path)
+        self._fonts.append(font)
+        return font
+
+    def _open(self, path):
+        start = time.monotonic_ns()
+        font = BinaryFont(path)
+        self._open_ns += time.monotonic_ns() - start
+        return font
+
+    # Forget the glyphs of fonts that haven't been used in the last
+    # max_idle refreshes. Call once per refresh; returns how many were
+    # evicted.
+    def evict_idle(self, max_idle):
+        self._refreshes += 1
+        evicted = 0
+
+        for font in self._fonts:
+            if font.used:
+                font.used = False
+                font.last_used = self._refreshes
+            elif font.is_open and font.loaded_count > 0 and self._refreshes - font.last_used >= max_idle:
+                font.unload_glyphs()
+                evicted += 1
+
+        self._evictions += evicted
+        return evicted
+
+    @property
+    def resident_bytes(self):
+        return sum(font.resident_bytes for font in self._fonts)
+
+    # Bytes not taken up by fonts that haven't been opened, compared to
+    # opening them all at startup.
+    @property
+    def deferred_bytes(self):
+        return sum(font.index_bytes for font in self._fonts if not font.is_open)
+
+    def stats_text(self):
+        opened = sum(1 for font in self._fonts if font.is_open)
+        return (f"{opened}/{len(self._fonts)} opened in {self._open_ns / 1e6:.1f} ms, "
+                f"{self.resident_bytes / 1024:.1f} KiB resident, "
+                f"{self.deferred_bytes / 1024:.1f} KiB deferred, "
+                f"{self._evictions} evictions")
+
+# Stands in for a BinaryFont (FontProtocol) until it's opened.
+class LazyFont:
+    def __init__(self, registry, path):
+        self._registry = registry
+        self._path = path
+        self._font = None
+        self._index_bytes = None
+
+        # Set on every use, and cleared by FontRegistry.evict_idle.
+        self.used = False
+        self.last_used = 0
+
+    @property
+    def path(self):
+        return self._path
+
+    @property
+    def is_open(self):
+        return self._font is not None
+
+    @property
+    def loaded_count(self):
+        return 0 if self._font is None else self._font.loaded_count
+
+    @property
+    def resident_bytes(self):
+        return 0 if self._font is None else self._font.resident_bytes
+
+    @property
+    def index_bytes(self):
+        if self._index_bytes is None:
+            self._index_bytes = index_bytes(self._path)
+
+        return self._index_bytes
+
+    def _opened(self):
+        self.used = True
+
+        if self._font is None:
+            self._font = self._registry._open(self._path)
+
+        return self._font
+
+    @property
+    def ascent(self):
+        return self._opened().ascent
+
+    @property
+    def descent(self):
+        return self._opened().descent
+
+    def get_bounding_box(self):
+        return self._opened().get_bounding_box()
+
+    def load_glyphs(self, code_points):
+        self._opened().load_glyphs(code_points)
+
+    def get_glyph(self, code_point):
+        return self._opened().get_glyph(code_point)
+
+    def unload_glyphs(self):
+        if self._font is not None:
+            self._font.unload_glyphs()
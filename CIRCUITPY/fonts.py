@@ -1,60 +1,40 @@
-from adafruit_bitmap_font import bitmap_font
-from displayio import Bitmap
+from array import array
+from font_registry import FontRegistry
+import glyph_coverage
 
 from terminalio import FONT as REGULAR_8
-REGULAR_12 = bitmap_font.load_font("assets/fonts/new-science-medium-12.bdf", Bitmap)
-
-NUMERIC_32 = bitmap_font.load_font("assets/fonts/new-science-medium-numeric-32.bdf", Bitmap)
-NUMERIC_28 = bitmap_font.load_font("assets/fonts/new-science-medium-numeric-28.bdf", Bitmap)
-
-LOCATION_LARGE = bitmap_font.load_font("assets/fonts/new-science-medium-21.bdf", Bitmap)
-LOCATION_MEDIUM = bitmap_font.load_font("assets/fonts/new-science-medium-16.bdf", Bitmap)
-LOCATION_SMALL = bitmap_font.load_font("assets/fonts/new-science-medium-13.bdf", Bitmap)
-
-# Take advantage of the MagTag/ESP32-S2's massive 2MB PSRAM to store some metadata about our fonts.
-# This table provides a way to tell if a glyph is present in our fonts for a given unicode code point.
-# Since we're using the same font at different size, we only need one table. BUT...
-# I had to split this up into multiple sets, because parsing a monolithic one was exhausting the pystack.
-_new_science_medium_code_point_sets = (
-    {
-	    0x0020, 0x0021, 0x0022, 0x0023, 0x0024, 0x0025, 0x0026, 0x0027, 0x0028, 0x0029, 0x002A, 0x002B, 0x002C, 0x002D, 0x002E, 0x002F,
-	    0x0030, 0x0031, 0x0032, 0x0033, 0x0034, 0x0035, 0x0036, 0x0037, 0x0038, 0x0039, 0x003A, 0x003B, 0x003C, 0x003D, 0x003E, 0x003F,
-	    0x0040, 0x0041, 0x0042, 0x0043, 0x0044, 0x0045, 0x0046, 0x0047, 0x0048, 0x0049, 0x004A, 0x004B, 0x004C, 0x004D, 0x004E, 0x004F,
-	    0x0050, 0x0051, 0x0052, 0x0053, 0x0054, 0x0055, 0x0056, 0x0057, 0x0058, 0x0059, 0x005A, 0x005B, 0x005C, 0x005D, 0x005E, 0x005F,
-	    0x0060, 0x0061, 0x0062, 0x0063, 0x0064, 0x0065, 0x0066, 0x0067, 0x0068, 0x0069, 0x006A, 0x006B, 0x006C, 0x006D, 0x006E, 0x006F,
-	    0x0070, 0x0071, 0x0072, 0x0073, 0x0074, 0x0075, 0x0076, 0x0077, 0x0078, 0x0079, 0x007A, 0x007B, 0x007C, 0x007D, 0x007E, 0x00A0,
-	    0x00A1, 0x00A2, 0x00A3, 0x00A4, 0x00A5, 0x00A6, 0x00A7, 0x00A8, 0x00A9, 0x00AA, 0x00AB, 0x00AC, 0x00AE, 0x00AF, 0x00B0, 0x00B1,
-	    0x00B2, 0x00B3, 0x00B4, 0x00B5, 0x00B6, 0x00B7, 0x00B8, 0x00B9, 0x00BA, 0x00BB, 0x00BC, 0x00BD, 0x00BE, 0x00BF, 0x00C0, 0x00C1,
-	    0x00C2, 0x00C3, 0x00C4, 0x00C5, 0x00C6, 0x00C7, 0x00C8, 0x00C9, 0x00CA, 0x00CB, 0x00CC, 0x00CD, 0x00CE, 0x00CF, 0x00D0, 0x00D1,
-	    0x00D2, 0x00D3, 0x00D4, 0x00D5, 0x00D6, 0x00D7, 0x00D8, 0x00D9, 0x00DA, 0x00DB, 0x00DC, 0x00DD, 0x00DE, 0x00DF, 0x00E0, 0x00E1,
-	    0x00E2, 0x00E3, 0x00E4, 0x00E5, 0x00E6, 0x00E7, 0x00E8, 0x00E9, 0x00EA, 0x00EB, 0x00EC, 0x00ED, 0x00EE, 0x00EF, 0x00F0, 0x00F1,
-	    0x00F2, 0x00F3, 0x00F4, 0x00F5, 0x00F6, 0x00F7, 0x00F8, 0x00F9, 0x00FA, 0x00FB, 0x00FC, 0x00FD, 0x00FE, 0x00FF, 0x0100, 0x0101,
-	    0x0102, 0x0103, 0x0104, 0x0105, 0x0106, 0x0107, 0x0108, 0x0109, 0x010A, 0x010B, 0x010C, 0x010D, 0x010E, 0x010F, 0x0110, 0x0111,
-	    0x0112, 0x0113, 0x0114, 0x0115, 0x0116, 0x0117, 0x0118, 0x0119, 0x011A, 0x011B, 0x011C, 0x011D, 0x011E, 0x011F, 0x0120, 0x0121,
-	    0x0122, 0x0123, 0x0124, 0x0125, 0x0126, 0x0127, 0x0128, 0x0129, 0x012A, 0x012B, 0x012C, 0x012D, 0x012E, 0x012F, 0x0130, 0x0131,
-	    0x0132, 0x0133, 0x0134, 0x0135, 0x0136, 0x0137, 0x0138, 0x0139, 0x013A, 0x013B, 0x013C, 0x013D, 0x013E, 0x013F, 0x0140, 0x0141,
-	    0x0142, 0x0143, 0x0144, 0x0145, 0x0146, 0x0147, 0x0148, 0x014A, 0x014B, 0x014C, 0x014D, 0x014E, 0x014F, 0x0150, 0x0151, 0x0152,
-	    0x0153, 0x0154, 0x0155, 0x0156, 0x0157, 0x0158, 0x0159, 0x015A, 0x015B, 0x015C, 0x015D, 0x015E, 0x015F, 0x0160, 0x0161, 0x0162,
-	},
-
-    {
-	    0x0163, 0x0164, 0x0165, 0x0166, 0x0167, 0x0168, 0x0169, 0x016A, 0x016B, 0x016C, 0x016D, 0x016E, 0x016F, 0x0170, 0x0171, 0x0172,
-	    0x0173, 0x0174, 0x0175, 0x0176, 0x0177, 0x0178, 0x0179, 0x017A, 0x017B, 0x017C, 0x017D, 0x017E, 0x018F, 0x0192, 0x01E2, 0x01E3,
-	    0x01FA, 0x01FB, 0x01FC, 0x01FD, 0x01FE, 0x01FF, 0x0218, 0x0219, 0x021A, 0x021B, 0x0226, 0x0227, 0x0232, 0x0233, 0x0237, 0x0259,
-	    0x02C6, 0x02C7, 0x02D8, 0x02D9, 0x02DA, 0x02DB, 0x02DC, 0x02DD, 0x0300, 0x0301, 0x0302, 0x0303, 0x0304, 0x0306, 0x0307, 0x0308,
-	    0x030A, 0x030B, 0x030C, 0x0312, 0x0323, 0x0326, 0x0327, 0x0328, 0x0E3F, 0x1E80, 0x1E81, 0x1E82, 0x1E83, 0x1E84, 0x1E85, 0x1E9E,
-	    0x1EA0, 0x1EA1, 0x1EB8, 0x1EB9, 0x1EBC, 0x1EBD, 0x1ECA, 0x1ECB, 0x1ECC, 0x1ECD, 0x1EE4, 0x1EE5, 0x1EF2, 0x1EF3, 0x1EF8, 0x1EF9,
-	    0x2013, 0x2014, 0x2018, 0x2019, 0x201A, 0x201C, 0x201D, 0x201E, 0x2020, 0x2021, 0x2022, 0x2026, 0x2030, 0x2039, 0x203A, 0x2044,
-	    0x2070, 0x2074, 0x2075, 0x2076, 0x2077, 0x2078, 0x2079, 0x2080, 0x2081, 0x2082, 0x2083, 0x2084, 0x2085, 0x2086, 0x2087, 0x2088,
-	    0x2089, 0x20AC, 0x20B9, 0x20BA, 0x20BD, 0x20BF, 0x2122, 0x215B, 0x215C, 0x215D, 0x215E, 0x2190, 0x2191, 0x2192, 0x2193, 0x2196,
-	    0x2197, 0x2198, 0x2199, 0x2202, 0x2206, 0x220F, 0x2211, 0x2212, 0x221A, 0x221E, 0x222B, 0x2248, 0x2260, 0x2264, 0x2265, 0x25CA,
-	    0xFB01, 0xFB02,
-	}
-)
+
+# Precompiled from the .bdf files next to them by tools/build_fonts.py.
+# Each one is only opened the first time it's used.
+registry = FontRegistry()
+
+REGULAR_12 = registry.font("assets/fonts/new-science-medium-12.bin")
+
+NUMERIC_32 = registry.font("assets/fonts/new-science-medium-numeric-32.bin")
+NUMERIC_28 = registry.font("assets/fonts/new-science-medium-numeric-28.bin")
+
+LOCATION_LARGE = registry.font("assets/fonts/new-science-medium-21.bin")
+LOCATION_MEDIUM = registry.font("assets/fonts/new-science-medium-16.bin")
+LOCATION_SMALL = registry.font("assets/fonts/new-science-medium-13.bin")
+
+# Code points every text font can draw, as sorted (first, end) ranges.
+# Generated from the .bdf files by tools/build_glyph_coverage.py.
+_coverage = array("H", glyph_coverage.RANGES)
 
 def contains_glyph(code_point):
-    for code_points in _new_science_medium_code_point_sets:
-        if code_point in code_points:
-            return True
+    if code_point < _coverage[0]:
+        return False
+
+    # Find the last range that starts at or before code_point.
+    low = 0
+    high = len(_coverage) // 2 - 1
+
+    while low < high:
+        middle = (low + high + 1) // 2
+
+        if _coverage[middle * 2] <= code_point:
+            low = middle
+        else:
+            high = middle - 1
 
-    return False
\ No newline at end of file
+    return code_point < _coverage[low * 2 + 1]
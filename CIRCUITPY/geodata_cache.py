@@ -0,0 +1,83 @@
+import json
+from lru_cache import LRUCache
+from network_helper import GeoData
+
+# Only write the cache file after this many new entries, to spare the flash.
+SAVE_INTERVAL = 10
+
+# Caches reverse geocoding results by lat/lon cell, so places the ISS passes
+# over again don't need another request to Geoapify. Cells are cell_size
+# degrees square; any position within a cell gets the same GeoData.
+# If path is given, the cache is loaded from and saved to that file.
+# CircuitPython can only write files if boot.py remounts the filesystem as
+# writable; if it can't, the cache just stays in memory.
+class GeoDataCache:
+    def __init__(self, capacity=256, cell_size=1.0, path=None):
+        self._cache = LRUCache(capacity)
+        self._cell_size = cell_size
+        self._path = path
+        self._unsaved = 0
+
+        if path is not None:
+            self._load()
+
+    @property
+    def hits(self):
+        return self._cache.hits
+
+    @property
+    def misses(self):
+        return self._cache.misses
+
+    @property
+    def hit_rate(self):
+        return self._cache.hit_rate
+
+    def __len__(self):
+        return len(self._cache)
+
+    def _cell(self, lat, lon):
+        return (round(lat / self._cell_size), round(lon / self._cell_size))
+
+    # Returns the cached GeoData for the cell containing lat, lon, or None.
+    def get(self, lat, lon):
+        return self._cache.get(self._cell(lat, lon))
+
+    def put(self, lat, lon, geodata):
+        self._cache.put(self._cell(lat, lon), geodata)
+
+        if self._path is not None:
+            self._unsaved += 1
+            if self._unsaved >= SAVE_INTERVAL:
+                self.save()
+
+    def stats_text(self):
+        return f"{self.hits} hits, {self.misses} misses ({self.hit_rate}%), {len(self)}/{self._cache.capacity} entries"
+
+    # One JSON object per line: {"cell": [lat, lon], "geodata": [fields...]}
+    def save(self):
+        if self._path is None:
+            return
+
+        try:
+            with open(self._path, "w") as f:
+                for cell, geodata in self._cache.items():
+                    f.write(json.dumps({"cell": cell, "geodata": list(geodata)}))
+                    f.write("\n")
+
+            self._unsaved = 0
+        except OSError as err:
+            print(f"Unable to save geodata cache, keeping it in memory only. Error: {err}")
+            self._path = None
+
+    def _load(self):
+        try:
+            with open(self._path, "r") as f:
+                for line in f:
+                    entry = json.loads(line)
+                    cell = entry["cell"]
+                    self._cache.put((cell[0], cell[1]), GeoData(*entry["geodata"]))
+
+            print(f"Loaded {len(self)} cached geodata entries")
+        except (OSError, ValueError, KeyError, TypeError) as err:
+            print(f"No geodata cache loaded: {err}")
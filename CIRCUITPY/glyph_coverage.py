@@ -0,0 +1,20 @@
+# Generated by tools/build_glyph_coverage.py from the text fonts; don't edit.
+# 450 code points in 62 ranges of (first, end) as little endian H.
+RANGES = (
+    b"\x20\x00\x7f\x00\xa0\x00\xad\x00\xae\x00\x49\x01\x4a\x01\x7f\x01"
+    b"\x8f\x01\x90\x01\x92\x01\x93\x01\xe2\x01\xe4\x01\xfa\x01\x00\x02"
+    b"\x18\x02\x1c\x02\x26\x02\x28\x02\x32\x02\x34\x02\x37\x02\x38\x02"
+    b"\x59\x02\x5a\x02\xc6\x02\xc8\x02\xd8\x02\xde\x02\x00\x03\x05\x03"
+    b"\x06\x03\x09\x03\x0a\x03\x0d\x03\x12\x03\x13\x03\x23\x03\x24\x03"
+    b"\x26\x03\x29\x03\x3f\x0e\x40\x0e\x80\x1e\x86\x1e\x9e\x1e\x9f\x1e"
+    b"\xa0\x1e\xa2\x1e\xb8\x1e\xba\x1e\xbc\x1e\xbe\x1e\xca\x1e\xce\x1e"
+    b"\xe4\x1e\xe6\x1e\xf2\x1e\xf4\x1e\xf8\x1e\xfa\x1e\x13\x20\x15\x20"
+    b"\x18\x20\x1b\x20\x1c\x20\x1f\x20\x20\x20\x23\x20\x26\x20\x27\x20"
+    b"\x30\x20\x31\x20\x39\x20\x3b\x20\x44\x20\x45\x20\x70\x20\x71\x20"
+    b"\x74\x20\x7a\x20\x80\x20\x8a\x20\xac\x20\xad\x20\xb9\x20\xbb\x20"
+    b"\xbd\x20\xbe\x20\xbf\x20\xc0\x20\x22\x21\x23\x21\x5b\x21\x5f\x21"
+    b"\x90\x21\x94\x21\x96\x21\x9a\x21\x02\x22\x03\x22\x06\x22\x07\x22"
+    b"\x0f\x22\x10\x22\x11\x22\x13\x22\x1a\x22\x1b\x22\x1e\x22\x1f\x22"
+    b"\x2b\x22\x2c\x22\x48\x22\x49\x22\x60\x22\x61\x22\x64\x22\x66\x22"
+    b"\xca\x25\xcb\x25\x01\xfb\x03\xfb"
+)
@@ -0,0 +1,134 @@
+from math import pi, sin, cos, asin, atan2, sqrt
+
+# Estimates the ISS position between fixes, so the map can move on every
+# refresh while the position is only downloaded now and then.
+#
+# The ISS goes around on a great circle in space at a (nearly) constant
+# rate, while the earth turns underneath it. The last few fixes are turned
+# into unit vectors in a frame that doesn't turn with the earth, the plane
+# of the orbit is fitted through them, and the latest fix is rotated along
+# it at the orbital rate. Turning the earth back gives the ground track.
+#
+# All times are unix seconds, kept as integers so single precision floats
+# only ever hold differences.
+
+_DEG_TO_RAD = pi / 180
+_RAD_TO_DEG = 180 / pi
+
+# The earth's rotation rate relative to the stars, in rad/s.
+_EARTH_RATE = 2 * pi / 86164.1
+
+# The ISS's orbital period in seconds, close enough for a few orbits.
+ISS_PERIOD = 92.9 * 60
+
+# Don't estimate further than this from the latest fix.
+MAX_EXTRAPOLATION = 30 * 60
+
+def _to_vector(lat, lon):
+    lat *= _DEG_TO_RAD
+    lon *= _DEG_TO_RAD
+    cos_lat = cos(lat)
+    return (cos_lat * cos(lon), cos_lat * sin(lon), sin(lat))
+
+def _cross(a, b):
+    return (a[1] * b[2] - a[2] * b[1], a[2] * b[0] - a[0] * b[2], a[0] * b[1] - a[1] * b[0])
+
+class GroundTrack:
+    def __init__(self, capacity=4, period=ISS_PERIOD, max_extrapolation=MAX_EXTRAPOLATION):
+        self._capacity = capacity
+        self._rate = 2 * pi / period
+        self._max_extrapolation = max_extrapolation
+
+        # (time, lat, lon), oldest first.
+        self._fixes = []
+
+        # Fitted from the fixes when they change: the orbit's pole, and the
+        # latest fix as a vector.
+        self._pole = None
+        self._origin = None
+
+    @property
+    def fix_count(self):
+        return len(self._fixes)
+
+    @property
+    def last_fix_time(self):
+        return self._fixes[-1][0] if self._fixes else None
+
+    # True if estimate(now) would return a position.
+    def can_estimate(self, now):
+        return self._pole is not None and abs(now - self._fixes[-1][0]) <= self._max_extrapolation
+
+    def add_fix(self, now, lat, lon):
+        fixes = self._fixes
+
+        # Fixes out of order, or more than a quarter of an orbit apart, would
+        # bend the fitted plane the wrong way.
+        if fixes and (now <= fixes[-1][0] or now - fixes[-1][0] > pi / 2 / self._rate):
+            fixes.clear()
+
+        fixes.append((now, lat, lon))
+
+        if len(fixes) > self._capacity:
+            fixes.pop(0)
+
+        self._fit()
+
+    def clear(self):
+        self._fixes.clear()
+        self._pole = None
+        self._origin = None
+
+    def _fit(self):
+        fixes = self._fixes
+        latest = fixes[-1][0]
+        previous = None
+        x = y = z = 0
+
+        # Sum the poles of each step between fixes, each fix placed where it
+        # was in space at the time of the latest one.
+        for time, lat, lon in fixes:
+            vector = _to_vector(lat, lon + (time - latest) * _EARTH_RATE * _RAD_TO_DEG)
+
+            if previous is not None:
+                pole = _cross(previous, vector)
+                x += pole[0]
+                y += pole[1]
+                z += pole[2]
+
+            previous = vector
+
+        length = sqrt(x * x + y * y + z * z)
+
+        # Fewer than two distinct fixes: there's no direction to go in.
+        if length < 1e-6:
+            self._pole = None
+            return
+
+        self._pole = (x / length, y / length, z / length)
+        self._origin = previous
+
+    # Returns the estimated (lat, lon) at now, or None if there's no recent
+    # enough fit.
+    def estimate(self, now):
+        if not self.can_estimate(now):
+            return None
+
+        dt = now - self._fixes[-1][0]
+        angle = dt * self._rate
+        c, s = cos(angle), sin(angle)
+        n = self._pole
+        v = self._origin
+
+        # Rotate the latest fix about the pole (Rodrigues' formula).
+        n_v = _cross(n, v)
+        k = (n[0] * v[0] + n[1] * v[1] + n[2] * v[2]) * (1 - c)
+        x = v[0] * c + n_v[0] * s + n[0] * k
+        y = v[1] * c + n_v[1] * s + n[1] * k
+        z = v[2] * c + n_v[2] * s + n[2] * k
+
+        lat = asin(max(-1, min(1, z))) * _RAD_TO_DEG
+        lon = (atan2(y, x) - dt * _EARTH_RATE) * _RAD_TO_DEG
+        lon = (lon + 180) % 360 - 180
+
+        return (lat, lon)
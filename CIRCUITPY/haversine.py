@@ -2,7 +2,10 @@ from math import pi, radians, cos, sin, asin, sqrt
 
 # Get the distance between two coordinates
 def haversine(lat1, lon1, lat2, lon2, use_miles=True):
-    lat1, lon1, lat2, lon2 = map(radians, [lat1, lon1, lat2, lon2])
+    lat1 = radians(lat1)
+    lon1 = radians(lon1)
+    lat2 = radians(lat2)
+    lon2 = radians(lon2)
 
     dLat = lat2 - lat1
     dLon = lon2 - lon1
@@ -0,0 +1,89 @@
+from math import radians, degrees, sin, cos, asin, atan2, sqrt
+from collections import namedtuple
+
+EARTH_RADIUS_KM = 6371.0
+EARTH_RADIUS_MILES = 3958.8
+KM_PER_MILE = 1.60934
+
+# Where a point is relative to home: great-circle distance in both units,
+# initial bearing from home in degrees clockwise from north, and whether
+# it's within the close-by distance.
+HomeRange = namedtuple("HomeRange", ["km", "miles", "bearing", "is_close_by"])
+
+# Distances and bearings from a fixed home coordinate. Home's trig terms are
+# worked out once up front, so each point only costs its own.
+# close_by_distance is in miles if use_miles is True, otherwise km.
+class HomeDistance:
+    def __init__(self, latitude, longitude, close_by_distance, use_miles=True):
+        self._latitude = latitude
+        self._longitude = longitude
+        self._lat = radians(latitude)
+        self._lon = radians(longitude)
+        self._sin_lat = sin(radians(latitude))
+        self._cos_lat = cos(radians(latitude))
+
+        self._close_by_km = close_by_distance * KM_PER_MILE if use_miles else close_by_distance
+
+    @property
+    def latitude(self):
+        return self._latitude
+
+    @property
+    def longitude(self):
+        return self._longitude
+
+    # The close-by distance in the given units.
+    def close_by_distance(self, use_miles):
+        return self._close_by_km / KM_PER_MILE if use_miles else self._close_by_km
+
+    def measure(self, lat, lon):
+        lat = radians(lat)
+        d_lon = radians(lon) - self._lon
+        sin_lat = sin(lat)
+        cos_lat = cos(lat)
+        cos_d_lon = cos(d_lon)
+
+        # Haversine
+        sin_half_d_lat = sin((lat - self._lat) / 2)
+        sin_half_d_lon = sin(d_lon / 2)
+        a = sin_half_d_lat * sin_half_d_lat + self._cos_lat * cos_lat * sin_half_d_lon * sin_half_d_lon
+        c = 2 * asin(sqrt(min(a, 1.0)))
+
+        y = sin(d_lon) * cos_lat
+        x = self._cos_lat * sin_lat - self._sin_lat * cos_lat * cos_d_lon
+        bearing = (degrees(atan2(y, x)) + 360) % 360
+
+        km = EARTH_RADIUS_KM * c
+        return HomeRange(km=km, miles=EARTH_RADIUS_MILES * c, bearing=bearing, is_close_by=km <= self._close_by_km)
+
+    # Distance in km to each (lat, lon) in points, written into out if given
+    # (e.g. a preallocated array("f")) to avoid allocating. Returns out.
+    def distances_km(self, points, out=None):
+        if out is None:
+            out = [0.0] * len(points)
+
+        home_lat = self._lat
+        home_lon = self._lon
+        home_cos_lat = self._cos_lat
+
+        for i, (lat, lon) in enumerate(points):
+            lat = radians(lat)
+            sin_half_d_lat = sin((lat - home_lat) / 2)
+            sin_half_d_lon = sin((radians(lon) - home_lon) / 2)
+            a = sin_half_d_lat * sin_half_d_lat + home_cos_lat * cos(lat) * sin_half_d_lon * sin_half_d_lon
+            out[i] = EARTH_RADIUS_KM * 2 * asin(sqrt(min(a, 1.0)))
+
+        return out
+
+    # Index of the point in points closest to home, and its distance in km.
+    # Returns (None, None) if points is empty.
+    def closest(self, points):
+        best_index = None
+        best_km = None
+
+        for i, km in enumerate(self.distances_km(points)):
+            if best_km is None or km < best_km:
+                best_index = i
+                best_km = km
+
+        return best_index, best_km
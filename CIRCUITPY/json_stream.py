@@ -0,0 +1,218 @@
+# Pulls a few fields out of a JSON document as it streams in, without
+# building the whole document in memory.
+#
+# The fields are the members of one object, found by its path from the top
+# of the document, e.g. ("features", 0, "properties") for the first
+# feature's properties in a GeoJSON FeatureCollection. Only members whose
+# names are in `keys` and whose values are strings (or null) are kept; the
+# rest of the document is scanned past without allocating.
+
+_QUOTE = 34
+_BACKSLASH = 92
+_OPEN_OBJECT = 123
+_CLOSE_OBJECT = 125
+_OPEN_ARRAY = 91
+_CLOSE_ARRAY = 93
+_COLON = 58
+_COMMA = 44
+_WHITESPACE = (32, 9, 13, 10)
+
+_ESCAPES = {
+    34: b'"',
+    92: b"\\",
+    47: b"/",
+    98: b"\b",
+    102: b"\f",
+    110: b"\n",
+    114: b"\r",
+    116: b"\t",
+}
+
+class JsonFieldExtractor:
+    def __init__(self, path, keys):
+        self._path = path
+        self._keys = keys
+
+        # Found fields, by name.
+        self.fields = {}
+
+        # True once the object at path has been read to its end.
+        self.complete = False
+
+        # Open containers: True for objects, False for arrays, and for each
+        # the current member name or array index.
+        self._objects = []
+        self._selectors = []
+
+        # How many leading entries of _selectors match path.
+        self._matched = 0
+
+        self._expect_key = False
+        self._in_string = False
+        self._is_key = False
+        self._capturing = False
+        self._escape = False
+        self._unicode = None
+        self._high_surrogate = None
+        self._string = bytearray()
+        self._value_key = None
+
+    # Scan the next chunk of the document. Returns True once the object at
+    # path is complete, after which the rest can be skipped.
+    def feed(self, chunk):
+        for b in chunk:
+            if self._in_string:
+                self._string_byte(b)
+            elif b in _WHITESPACE:
+                pass
+            elif b == _QUOTE:
+                self._start_string()
+            elif b == _OPEN_OBJECT or b == _OPEN_ARRAY:
+                self._push(b == _OPEN_OBJECT)
+            elif b == _CLOSE_OBJECT or b == _CLOSE_ARRAY:
+                self._pop()
+
+                if self.complete:
+                    return True
+            elif b == _COLON:
+                self._expect_key = False
+            elif b == _COMMA:
+                self._next_member()
+            elif b == 110 and self._value_key is not None:
+                # null
+                self.fields[self._value_key] = None
+                self._value_key = None
+
+        return self.complete
+
+    def _wanted_depth(self):
+        return len(self._selectors) == len(self._path) + 1 and self._matched == len(self._path)
+
+    def _start_string(self):
+        self._in_string = True
+        self._is_key = self._expect_key and len(self._objects) > 0 and self._objects[-1]
+
+        if self._is_key:
+            # Only names along the path, or in the object at path, matter.
+            depth = len(self._selectors)
+            self._capturing = depth <= len(self._path) + 1 and self._matched >= depth - 1
+        else:
+            self._capturing = self._value_key is not None
+
+        if self._capturing:
+            self._string = bytearray()
+
+    def _string_byte(self, b):
+        if self._escape:
+            self._escape_byte(b)
+        elif b == _BACKSLASH:
+            self._escape = True
+        elif b == _QUOTE:
+            self._end_string()
+        elif self._capturing:
+            self._string.append(b)
+
+    def _escape_byte(self, b):
+        if self._unicode is not None:
+            self._unicode += chr(b)
+
+            if len(self._unicode) == 4:
+                self._append_code_point(int(self._unicode, 16))
+                self._unicode = None
+                self._escape = False
+
+            return
+
+        if b == 117:
+            # \uXXXX
+            self._unicode = ""
+            return
+
+        if self._capturing:
+            self._string += _ESCAPES.get(b, bytes((b,)))
+
+        self._escape = False
+
+    def _append_code_point(self, code_point):
+        if not self._capturing:
+            return
+
+        if 0xD800 <= code_point < 0xDC00:
+            self._high_surrogate = code_point
+            return
+
+        if 0xDC00 <= code_point < 0xE000 and self._high_surrogate is not None:
+            code_point = 0x10000 + ((self._high_surrogate - 0xD800) << 10) + (code_point - 0xDC00)
+
+        self._high_surrogate = None
+        self._string += chr(code_point).encode("utf-8")
+
+    def _end_string(self):
+        self._in_string = False
+
+        if self._is_key:
+            key = str(self._string, "utf-8") if self._capturing else None
+            self._set_selector(key)
+
+            if self._wanted_depth() and key in self._keys:
+                self._value_key = key
+        elif self._capturing:
+            self.fields[self._value_key] = str(self._string, "utf-8")
+            self._value_key = None
+
+        self._capturing = False
+
+    def _set_selector(self, selector):
+        depth = len(self._selectors)
+        self._selectors[-1] = selector
+        self._matched = min(self._matched, depth - 1)
+
+        if self._matched == depth - 1 and depth <= len(self._path) and self._path[depth - 1] == selector:
+            self._matched = depth
+
+    def _push(self, is_object):
+        # A container isn't a string, so it's never a wanted value.
+        self._value_key = None
+        self._objects.append(is_object)
+        self._selectors.append(None)
+        self._expect_key = is_object
+
+        if not is_object:
+            self._set_selector(0)
+
+    def _pop(self):
+        if len(self._selectors) == 0:
+            return
+
+        if self._wanted_depth():
+            self.complete = True
+
+        self._objects.pop()
+        self._selectors.pop()
+        self._matched = min(self._matched, len(self._selectors))
+        self._value_key = None
+
+    def _next_member(self):
+        self._value_key = None
+
+        if len(self._objects) == 0:
+            return
+
+        if self._objects[-1]:
+            self._expect_key = True
+        else:
+            self._set_selector(self._selectors[-1] + 1)
+
+# Read a response through the reusable buffer until the object at path is
+# complete. Returns its fields, or None if the document doesn't have it.
+def extract_fields(response, path, keys, buffer):
+    extractor = JsonFieldExtractor(path, keys)
+    view = memoryview(buffer)
+
+    while True:
+        count = response.readinto(buffer)
+
+        if count == 0 or extractor.feed(view[0:count]):
+            break
+
+    return extractor.fields if extractor.complete else None
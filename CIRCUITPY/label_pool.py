@@ -0,0 +1,81 @@
+from adafruit_display_text.label import Label
+
+# A fixed set of Labels for showing lines of text, made once up front and
+# retargeted whenever the text changes, instead of being thrown away and
+# rebuilt. Each Label allocates its own glyph bitmaps, so rebuilding them
+# was the most heap churn of any refresh.
+#
+# A line's Label only re-renders if its text or font changed, and lines
+# past the end of the text are hidden rather than removed.
+#
+# Making a Label reads its font's bounding box, so the pool is made with a
+# font that's already loaded (e.g. terminalio.FONT), and each Label only
+# gets the font it's shown in from show().
+class LabelPool:
+    def __init__(self, group, size, font, color=0):
+        self._labels = []
+
+        for _ in range(size):
+            label = Label(font=font, text="", color=color)
+            label.hidden = True
+            group.append(label)
+            self._labels.append(label)
+
+        self._shown = 0
+
+        # Lines whose Label was re-rendered, and lines whose Label was left
+        # as it was, for the last call to show() and since startup.
+        self._rewritten = 0
+        self._unchanged = 0
+        self._total_rewritten = 0
+        self._total_unchanged = 0
+
+    @property
+    def size(self):
+        return len(self._labels)
+
+    # Show lines in font, line_height apart, starting at the group's origin.
+    def show(self, lines, font, line_height):
+        if len(lines) > len(self._labels):
+            raise ValueError(f"{len(lines)} lines don't fit in a pool of {len(self._labels)}")
+
+        rewritten = 0
+
+        for i, label in enumerate(self._labels):
+            if i >= len(lines):
+                label.hidden = True
+                continue
+
+            line = lines[i]
+            changed = False
+
+            if label.font is not font:
+                # Clear the old text first, so it isn't rendered in the new font
+                # only to be replaced straight after.
+                if label.text != line:
+                    label.text = ""
+                label.font = font
+                changed = True
+
+            if label.text != line:
+                label.text = line
+                changed = True
+
+            if changed:
+                rewritten += 1
+
+            label.y = i * line_height
+            label.hidden = False
+
+        self._shown = len(lines)
+        self._rewritten = rewritten
+        self._unchanged = len(lines) - rewritten
+        self._total_rewritten += self._rewritten
+        self._total_unchanged += self._unchanged
+
+    def clear(self):
+        self.show((), None, 0)
+
+    def stats_text(self):
+        return (f"{self._shown}/{len(self._labels)} lines, {self._rewritten} rewritten, {self._unchanged} unchanged "
+                f"({self._total_rewritten} rewritten, {self._total_unchanged} unchanged in total)")
@@ -0,0 +1,119 @@
+from network_helper import GeoData
+
+# Offline land/ocean lookup, so positions over the open ocean can be named
+# without a request to Geoapify.
+#
+# The mask (assets/land-mask.bin, built by tools/build_land_mask.py) is a
+# bit-packed grid, 1 = land. Coasts are padded by a cell, and lakes count as
+# land, so those still get looked up online. Seas joined to the ocean by a
+# strait, like the Mediterranean, are ocean.
+
+_HEADER_SIZE = 11
+
+class LandMask:
+    def __init__(self, path="assets/land-mask.bin"):
+        with open(path, "rb") as f:
+            header = f.read(_HEADER_SIZE)
+
+            if header[0:4] != b"LMSK" or header[4] != 1:
+                raise ValueError("Unrecognized land mask file")
+
+            self._cell_size = int.from_bytes(header[5:7], "big") / 100
+            self._width = int.from_bytes(header[7:9], "big")
+            self._height = int.from_bytes(header[9:11], "big")
+            self._row_bytes = (self._width + 7) // 8
+            self._bits = f.read(self._row_bytes * self._height)
+
+    def is_land(self, lat, lon):
+        row = int((90 - lat) / self._cell_size)
+        col = int((lon + 180) / self._cell_size)
+
+        # Clamp the poles and wrap the antimeridian.
+        row = min(max(row, 0), self._height - 1)
+        col = col % self._width
+
+        byte = self._bits[row * self._row_bytes + (col >> 3)]
+        return (byte >> (7 - (col & 7))) & 1 == 1
+
+    # GeoData for an ocean position, named the way Geoapify names them.
+    def ocean_geodata(self, lat, lon):
+        return GeoData(
+            city=None,
+            district=None,
+            county=None,
+            state=None,
+            region=None,
+            country=None,
+            name=ocean_name(lat, lon)
+        )
+
+# Seas that get their own name, as (name, south, north, west, east).
+# The boxes are rough, and checked in order, so smaller seas come first.
+_SEAS = (
+    ("Gulf of Mexico", 18, 31, -98, -80),
+    ("Caribbean Sea", 9, 22, -86, -60),
+    ("Hudson Bay", 51, 64, -95, -76),
+    ("Black Sea", 40.5, 47, 27.5, 42),
+    ("Mediterranean Sea", 30, 46, 0, 36.5),
+    ("Mediterranean Sea", 34.5, 41, -6, 0),
+    ("Baltic Sea", 53, 60, 10, 30.5),
+    ("Baltic Sea", 60, 66, 17, 30.5),
+    ("Red Sea", 12.5, 30, 32, 43),
+    ("Gulf of Aden", 10.5, 15, 43, 52),
+    ("Gulf of Alaska", 52, 61, -155, -132),
+    ("Bering Sea", 52, 66, 162, 180),
+    ("Bering Sea", 52, 66, -180, -157),
+    ("Sea of Okhotsk", 44, 62, 135, 157),
+    ("Sea of Japan", 34, 52, 127, 142),
+    ("East China Sea", 23, 33, 117, 131),
+    ("South China Sea", 0, 23, 99, 121),
+    ("Philippine Sea", 5, 35, 121, 140),
+    ("Java Sea", -8, -3, 105, 117),
+    ("Banda Sea", -8, -3, 122, 132),
+    ("Arafura Sea", -11, -5, 133, 141),
+    ("Timor Sea", -15, -9, 122, 132),
+    ("Coral Sea", -30, -10, 145, 165),
+    ("Tasman Sea", -47, -30, 147, 175),
+    ("Bay of Bengal", 5, 23, 80, 95),
+    ("Arabian Sea", 5, 25, 51, 77),
+    ("Gulf of Guinea", -5, 6, -8, 11),
+    ("Labrador Sea", 52, 64, -64, -44),
+    ("North Sea", 51, 61, -4, 9),
+    ("Norwegian Sea", 61, 72, -10, 15),
+    ("Scotia Sea", -61, -54, -60, -30),
+)
+
+# Western edge of the Atlantic by latitude band, as (south, north, west).
+# West of this (and outside the other oceans) is the Pacific.
+_ATLANTIC_WEST = (
+    (50, 90, -100),
+    (30, 50, -82),
+    (18, 30, -98),
+    (8, 18, -84),
+    (-90, 8, -70),
+)
+
+def ocean_name(lat, lon):
+    for name, south, north, west, east in _SEAS:
+        if south <= lat <= north and west <= lon <= east:
+            return name
+
+    if lat < -60:
+        return "Southern Ocean"
+
+    if lat > 66:
+        return "Arctic Ocean"
+
+    # Indian Ocean: south of Asia, between Africa and Australia.
+    if lat < 30 and (20 <= lon <= 100 or (100 < lon <= 147 and lat < -8)):
+        return "Indian Ocean"
+
+    hemisphere = "North" if lat >= 0 else "South"
+
+    for south, north, west in _ATLANTIC_WEST:
+        if south <= lat < north:
+            if west <= lon <= 20:
+                return f"{hemisphere} Atlantic Ocean"
+            break
+
+    return f"{hemisphere} Pacific Ocean"
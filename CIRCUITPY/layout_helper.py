@@ -1,16 +1,26 @@
 from wrap_text_to_pixels import wrap_text_to_pixels, split_for_wrapping
 import fonts
 from collections import namedtuple
-from printable import is_printable, make_printable
+from printable import transliterate, EXACT, SUBSTITUTED
 from abbreviate_country import abbreviate_country
+from lru_cache import LRUCache
+import time
 
 FormatLocationResult = namedtuple("FormatLocationResult", ["lines", "font", "line_height"])
 
+# The most lines a location name is laid out in, with the smallest font.
+MAX_LOCATION_LINES = 6
+
 class LayoutHelper:
-    def __init__(self, display_width, display_height):
+    def __init__(self, display_width, display_height, layout_cache_size=16):
         self._display_width = display_width
         self._display_height = display_height
 
+        # Location name layouts, keyed by (text, info_panel_content_width).
+        # Each entry also keeps how long the layout took, to count time saved.
+        self._layout_cache = LRUCache(layout_cache_size)
+        self._layout_time_saved_ns = 0
+
     @property
     def display_width(self):
         return self._display_width
@@ -87,6 +97,30 @@ class LayoutHelper:
     def timestamp_bg_height(self):
         return 15
 
+    # Screen regions that change independently, as (x, y, width, height),
+    # so refreshes can be skipped when none of them changed.
+    @property
+    def distance_region(self):
+        return (0, 0, self.map_x_offset, self.distance_bg_height)
+
+    @property
+    def location_region(self):
+        return (0, self.distance_bg_height, self.map_x_offset, self._display_height - self.distance_bg_height)
+
+    @property
+    def map_region(self):
+        return (self.map_x_offset, 0, self.map_width, self.map_height)
+
+    # The timestamp is drawn over the bottom of the map, from the right.
+    @property
+    def timestamp_region(self):
+        return (self.map_x_offset, self._display_height - self.timestamp_bg_height, self.map_width, self.timestamp_bg_height)
+
+    # The next pass countdown is drawn just above the timestamp, from the right.
+    @property
+    def pass_region(self):
+        return (self.map_x_offset, self._display_height - 2 * self.timestamp_bg_height, self.map_width, self.timestamp_bg_height)
+
     def lat_lon_to_screen(self, lat, lon):
         meridian_offset_px = abs(lon) * (self.map_width / 360)
         screen_x = (round(self.meridian_x - meridian_offset_px if lon < 0 else self.meridian_x + meridian_offset_px)) + self.map_x_offset
@@ -104,41 +138,10 @@ class LayoutHelper:
         if geodata is None:
             return None
 
-        # Get locality component, if possible
-        locality = None
-        
-        # Try for an "ideal" name first (i.e. one that can be printed with no substitutions)
-        if is_printable(geodata.city, substitute_ascii=False):
-            locality = make_printable(geodata.city, substitute_ascii=False)
-        elif is_printable(geodata.district, substitute_ascii=False):
-            locality = make_printable(geodata.district, substitute_ascii=False)
-        elif is_printable(geodata.county, substitute_ascii=False):
-            locality = make_printable(geodata.county, substitute_ascii=False)
-
-        # If none were "ideal", see if any are printable with substitutions
-        if locality is None:
-            if is_printable(geodata.city, substitute_ascii=True):
-                locality = make_printable(geodata.city, substitute_ascii=True)
-            elif is_printable(geodata.district, substitute_ascii=True):
-                locality = make_printable(geodata.district, substitute_ascii=True)
-            elif is_printable(geodata.county, substitute_ascii=True):
-                locality = make_printable(geodata.county, substitute_ascii=True)
-
-        # Get region component
-        region = None
-
-        # Try for an "ideal" name first (i.e. one that can be printed with no substitutions)
-        if is_printable(geodata.state, substitute_ascii=False):
-            region = make_printable(geodata.state, substitute_ascii=False)
-        elif is_printable(geodata.region, substitute_ascii=False):
-            region = make_printable(geodata.region, substitute_ascii=False)
-
-        # If none were "ideal", see if any are printable with substitutions
-        if region is None:
-            if is_printable(geodata.state, substitute_ascii=True):
-                region = make_printable(geodata.state, substitute_ascii=True)
-            elif is_printable(geodata.region, substitute_ascii=True):
-                region = make_printable(geodata.region, substitute_ascii=True)
+        # Use the first name that can be printed as-is (an "ideal" name), or
+        # failing that, the first that can be printed with ascii substitutions.
+        locality = self._best_printable_name((geodata.city, geodata.district, geodata.county))
+        region = self._best_printable_name((geodata.state, geodata.region))
 
         # Assemble name components
         components = []
@@ -150,16 +153,63 @@ class LayoutHelper:
             components.append(region)   
 
         if geodata.country is not None:
-            country_abbr = make_printable(abbreviate_country(geodata.country))
+            country_abbr = transliterate(abbreviate_country(geodata.country)).text
             components.append(country_abbr)
 
         # Assemble name from components, or fall back to pre-formatted name.
         if len(components) > 0:
             return ", ".join(components)
         elif geodata.name is not None:
-            return make_printable(geodata.name)
+            return transliterate(geodata.name).text
+
+    # Transliterates each name once, in order, stopping at the first exact one.
+    def _best_printable_name(self, names):
+        substituted = None
+
+        for name in names:
+            if name is None:
+                continue
 
+            result = transliterate(name)
+
+            if result.quality == EXACT:
+                return result.text
+
+            if substituted is None and result.quality == SUBSTITUTED:
+                substituted = result.text
+
+        return substituted
+
+    @property
+    def layout_cache(self):
+        return self._layout_cache
+
+    # Total time in ms that cached layouts saved.
+    @property
+    def layout_time_saved(self):
+        return self._layout_time_saved_ns / 1_000_000
+
+    def layout_cache_stats_text(self):
+        cache = self._layout_cache
+        return f"{cache.hits} hits, {cache.misses} misses ({cache.hit_rate}%), {self.layout_time_saved:.0f} ms saved"
+
+    # Same as _layout_location_name, but returns the stored result if the
+    # same text was laid out before at the same width.
     def layout_location_name(self, text):
+        key = (text, self.info_panel_content_width)
+        cached = self._layout_cache.get(key)
+
+        if cached is not None:
+            result, elapsed_ns = cached
+            self._layout_time_saved_ns += elapsed_ns
+            return result
+
+        start_ns = time.monotonic_ns()
+        result = self._layout_location_name(text)
+        self._layout_cache.put(key, (result, time.monotonic_ns() - start_ns))
+        return result
+
+    def _layout_location_name(self, text):
         result = None
 
         # First, see if any words in the string are too long to fit on one line.
@@ -246,7 +296,7 @@ class LayoutHelper:
             max_lines = 5
             line_height = 17
         else:
-            max_lines = 6
+            max_lines = MAX_LOCATION_LINES
             line_height = 14
 
         max_width = self.info_panel_content_width
@@ -0,0 +1,61 @@
+from collections import OrderedDict
+
+# A bounded mapping that evicts the least recently used entry when full,
+# and counts hits and misses so its size can be tuned.
+class LRUCache:
+    def __init__(self, capacity):
+        self._capacity = capacity
+        self._entries = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+
+    @property
+    def capacity(self):
+        return self._capacity
+
+    @property
+    def hits(self):
+        return self._hits
+
+    @property
+    def misses(self):
+        return self._misses
+
+    # Percentage of lookups that were hits.
+    @property
+    def hit_rate(self):
+        lookups = self._hits + self._misses
+        return 0 if lookups == 0 else (self._hits * 100) // lookups
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def get(self, key, default=None):
+        if key not in self._entries:
+            self._misses += 1
+            return default
+
+        # Re-insert to mark as most recently used.
+        value = self._entries.pop(key)
+        self._entries[key] = value
+        self._hits += 1
+        return value
+
+    def put(self, key, value):
+        if key in self._entries:
+            self._entries.pop(key)
+        elif len(self._entries) >= self._capacity:
+            oldest = next(iter(self._entries))
+            del self._entries[oldest]
+
+        self._entries[key] = value
+
+    # (key, value) pairs, least recently used first.
+    def items(self):
+        return self._entries.items()
+
+    def clear(self):
+        self._entries = OrderedDict()
@@ -3,9 +3,12 @@ import supervisor
 import adafruit_connection_manager
 import wifi
 import socketpool
-import adafruit_requests
 import adafruit_ntp
+import json
+import time
 from collections import namedtuple
+from json_stream import extract_fields
+from network_supervisor import NetworkSupervisor, backoff_delay
 
 GeoData = namedtuple("GeoData", [
     "city",
@@ -17,10 +20,417 @@ GeoData = namedtuple("GeoData", [
     "name"
 ])
 
+# How long a request took, in ms, broken down by phase.
+# On CircuitPython the TLS handshake happens inside connect(), so for https
+# the connect time includes it. dns and connect are 0 for a reused socket.
+class RequestTiming:
+    def __init__(self, host, https, reused):
+        self.host = host
+        self.https = https
+        self.reused = reused
+        self.dns = 0
+        self.connect = 0
+        self.first_byte = 0
+        self.body = 0
+
+    @property
+    def total(self):
+        return self.dns + self.connect + self.first_byte + self.body
+
+    def __str__(self):
+        connect = "reused socket" if self.reused else f"dns {self.dns:.0f} ms, connect{' + TLS' if self.https else ''} {self.connect:.0f} ms"
+        return f"{self.host}: {connect}, first byte {self.first_byte:.0f} ms, body {self.body:.0f} ms, total {self.total:.0f} ms"
+
+def _elapsed_ms(start_ns):
+    return (time.monotonic_ns() - start_ns) / 1_000_000
+
+# A socket kept open to one host between requests.
+class _Connection:
+    def __init__(self, key, sock):
+        self.key = key
+        self.socket = sock
+        self.expires_ns = None
+
+    def close(self):
+        try:
+            self.socket.close()
+        except OSError:
+            pass
+
+# Response to an HttpSession request. The body can be read all at once with
+# content/text/json(), or streamed with readinto()/iter_content().
+# Close it (or use it in a with block) so the socket can be reused.
+class HttpResponse:
+    def __init__(self, session, connection, timing):
+        self._session = session
+        self._connection = connection
+        self._timing = timing
+        self._buffer = session._buffer
+        self._view = memoryview(self._buffer)
+        self._start = 0
+        self._end = 0
+
+        self.status_code = None
+        self.headers = {}
+
+        self._keep_alive = True
+        self._chunked = False
+        self._remaining = None
+        self._done = False
+        self._content = None
+        self._body_start_ns = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    @property
+    def timing(self):
+        return self._timing
+
+    # Wait for and parse the status line and headers.
+    def _read_head(self, start_ns):
+        status_line = self._readline()
+        self._timing.first_byte = _elapsed_ms(start_ns)
+
+        parts = status_line.split(b" ", 2)
+
+        if len(parts) < 2 or not parts[0].startswith(b"HTTP/"):
+            raise OSError("Invalid HTTP response")
+
+        self.status_code = int(parts[1])
+
+        while True:
+            line = self._readline()
+
+            if len(line) == 0:
+                break
+
+            name, _, value = line.partition(b":")
+            self.headers[str(name.strip(), "utf-8").lower()] = str(value.strip(), "utf-8")
+
+        connection = self.headers.get("connection", "").lower()
+        self._keep_alive = connection != "close" and (parts[0] == b"HTTP/1.1" or connection == "keep-alive")
+        self._chunked = self.headers.get("transfer-encoding", "").lower() == "chunked"
+
+        if "content-length" in self.headers:
+            self._remaining = int(self.headers["content-length"])
+        elif not self._chunked:
+            # Body runs until the server closes the socket.
+            self._keep_alive = False
+
+        keep_alive = self.headers.get("keep-alive")
+
+        if keep_alive is not None:
+            for option in keep_alive.split(","):
+                name, _, value = option.partition("=")
+
+                if name.strip() == "timeout":
+                    self._connection.expires_ns = time.monotonic_ns() + int(value) * 1_000_000_000
+
+        self._done = self._remaining == 0
+        self._body_start_ns = time.monotonic_ns()
+
+    # Read more from the socket into the buffer. Returns the number of bytes read.
+    def _fill(self):
+        self._start = 0
+        self._end = self._connection.socket.recv_into(self._buffer, len(self._buffer))
+        return self._end
+
+    # Header and chunk size lines, without the line ending.
+    def _readline(self):
+        line = b""
+
+        while True:
+            if self._start == self._end and self._fill() == 0:
+                raise OSError("Connection closed")
+
+            # (CircuitPython's bytearray has no find())
+            for i in range(self._start, self._end):
+                if self._buffer[i] == 10:
+                    line += self._buffer[self._start:i]
+                    self._start = i + 1
+                    return line.rstrip(b"\r")
+
+            line += self._buffer[self._start:self._end]
+            self._start = self._end
+
+    # Read up to len(buf) bytes of the body into buf. Returns 0 at the end of the body.
+    def readinto(self, buf):
+        if self._done:
+            return 0
+
+        if self._chunked and not self._remaining:
+            if self._remaining == 0:
+                # End of the previous chunk.
+                self._readline()
+
+            self._remaining = int(self._readline().split(b";", 1)[0], 16)
+
+            if self._remaining == 0:
+                # Skip any trailers.
+                while len(self._readline()) > 0:
+                    pass
+
+                self._finish()
+                return 0
+
+        if self._start == self._end and self._fill() == 0:
+            if self._remaining is not None:
+                raise OSError("Connection closed")
+
+            self._finish()
+            return 0
+
+        count = min(len(buf), self._end - self._start)
+
+        if self._remaining is not None:
+            count = min(count, self._remaining)
+            self._remaining -= count
+
+        buf[0:count] = self._view[self._start:self._start + count]
+        self._start += count
+
+        if self._remaining == 0 and not self._chunked:
+            self._finish()
+
+        return count
+
+    def _finish(self):
+        self._done = True
+        self._timing.body = _elapsed_ms(self._body_start_ns)
+
+    def iter_content(self, chunk_size=256):
+        chunk = bytearray(chunk_size)
+        view = memoryview(chunk)
+
+        while True:
+            count = self.readinto(chunk)
+
+            if count == 0:
+                return
+
+            yield bytes(view[0:count])
+
+    @property
+    def content(self):
+        if self._content is None:
+            content = bytearray()
+            chunk = bytearray(256)
+            view = memoryview(chunk)
+
+            while True:
+                count = self.readinto(chunk)
+
+                if count == 0:
+                    break
+
+                content += view[0:count]
+
+            self._content = bytes(content)
+
+        return self._content
+
+    @property
+    def text(self):
+        return str(self.content, "utf-8")
+
+    def json(self):
+        return json.loads(self.content)
+
+    # Hands the socket back to the session if the whole body was read (or can
+    # be skipped cheaply), otherwise closes it.
+    def close(self):
+        if self._connection is None:
+            return
+
+        if not self._done and self._keep_alive and self._remaining is not None and self._remaining <= len(self._buffer):
+            try:
+                while self.readinto(self._buffer) > 0:
+                    pass
+            except OSError:
+                self._keep_alive = False
+
+        self._session._release(self._connection, self._done and self._keep_alive)
+        self._connection = None
+        self._session.last_timing = self._timing
+        print(f"    HTTP {self._timing}")
+
+# Minimal HTTP/1.1 client that keeps one socket open per host between
+# requests, so repeat requests skip DNS, connect, and (for https) the TLS
+# handshake. A kept socket the server has since closed is detected on the
+# next request, which is then retried on a new socket.
+# Only one response can be open at a time; they share one read buffer.
+class HttpSession:
+    def __init__(self, socket_pool, ssl_context, max_connections=2, max_idle=120, buffer_size=1024):
+        self._socket_pool = socket_pool
+        self._ssl_context = ssl_context
+        self._max_connections = max_connections
+        self._max_idle_ns = max_idle * 1_000_000_000
+        self._buffer = bytearray(buffer_size)
+        self._connections = []
+
+        self.last_timing = None
+        self.requests = 0
+        self.reused = 0
+
+    def get(self, url, timeout=30):
+        https, host, port, path = _split_url(url)
+        key = (host, port, https)
+        request = f"GET {path} HTTP/1.1\r\nHost: {host}\r\nUser-Agent: Adafruit CircuitPython\r\nConnection: keep-alive\r\n\r\n".encode("utf-8")
+        self.requests += 1
+
+        connection = self._take(key)
+
+        if connection is not None:
+            timing = RequestTiming(host, https, reused=True)
+
+            try:
+                response = self._send(connection, request, timing, timeout)
+                self.reused += 1
+                return response
+            except OSError as err:
+                print(f"Kept socket to {host} went stale ({err}), reconnecting")
+                connection.close()
+            except Exception:
+                connection.close()
+                raise
+
+        timing = RequestTiming(host, https, reused=False)
+        connection = self._connect(key, timing, timeout)
+
+        try:
+            return self._send(connection, request, timing, timeout)
+        except Exception:
+            connection.close()
+            raise
+
+    def close(self):
+        for connection in self._connections:
+            connection.close()
+
+        self._connections = []
+
+    def _connect(self, key, timing, timeout):
+        host, port, https = key
+
+        start_ns = time.monotonic_ns()
+        family, socket_type, proto, _, address = self._socket_pool.getaddrinfo(host, port, 0, self._socket_pool.SOCK_STREAM)[0]
+        timing.dns = _elapsed_ms(start_ns)
+
+        start_ns = time.monotonic_ns()
+        sock = self._socket_pool.socket(family, socket_type, proto)
+
+        try:
+            sock.settimeout(timeout)
+
+            if https:
+                sock = self._ssl_context.wrap_socket(sock, server_hostname=host)
+
+            sock.connect(address)
+        except Exception:
+            sock.close()
+            raise
+
+        timing.connect = _elapsed_ms(start_ns)
+        return _Connection(key, sock)
+
+    def _send(self, connection, request, timing, timeout):
+        connection.socket.settimeout(timeout)
+        start_ns = time.monotonic_ns()
+        sent = 0
+
+        while sent < len(request):
+            count = connection.socket.send(request[sent:])
+
+            if count == 0:
+                raise OSError("Connection closed")
+
+            sent += count
+
+        response = HttpResponse(self, connection, timing)
+        response._read_head(start_ns)
+        return response
+
+    # Take the kept socket for a host, if there is one that hasn't expired.
+    def _take(self, key):
+        for connection in self._connections:
+            if connection.key == key:
+                self._connections.remove(connection)
+
+                if time.monotonic_ns() >= connection.expires_ns:
+                    connection.close()
+                    return None
+
+                return connection
+
+        return None
+
+    def _release(self, connection, keep_alive):
+        if not keep_alive:
+            connection.close()
+            return
+
+        # Keep it for max_idle, unless the server asked for less.
+        expires_ns = time.monotonic_ns() + self._max_idle_ns
+
+        if connection.expires_ns is None or connection.expires_ns > expires_ns:
+            connection.expires_ns = expires_ns
+
+        self._connections.append(connection)
+
+        # Close the least recently used sockets beyond the limit.
+        while len(self._connections) > self._max_connections:
+            self._connections.pop(0).close()
+
+# Returns (https, host, port, path)
+def _split_url(url):
+    scheme, _, rest = url.partition("://")
+    https = scheme == "https"
+    host, slash, path = rest.partition("/")
+    port = 443 if https else 80
+
+    if ":" in host:
+        host, port = host.split(":", 1)
+        port = int(port)
+
+    return https, host, port, slash + path if slash else "/"
+
+# Endpoints, each with its own circuit breaker.
+ENDPOINT_OPEN_NOTIFY = "open-notify"
+ENDPOINT_CELESTRAK = "celestrak"
+ENDPOINT_GEOAPIFY = "geoapify"
+
 class Network:
-    def __init__(self):
+    # clock is the supervisor's, in ns.
+    # Requests go through transport if one's given (see network_transport.py),
+    # otherwise through the live session, and if record_path is given, the live
+    # session's responses are recorded to that file.
+    def __init__(self, clock=time.monotonic_ns, transport=None, record_path=None):
         self._pool = None
-        self._requests = None
+        self._ssl_context = None
+        self._http = None
+        self._transport = transport
+        self._record_path = record_path
+
+        # Reused for every streamed response, so reading one doesn't allocate.
+        self._chunk = bytearray(256)
+
+        # Called just before the supervisor's last resort reload, e.g. to save state.
+        self.before_reload = None
+
+        self._supervisor = NetworkSupervisor([
+            ("new session", self.reset_session),
+            ("new socket pool", self.reset_socket_pool),
+            ("restart radio", self.restart_radio),
+            ("reload", self._reload),
+        ], clock=clock)
+
+    @property
+    def supervisor(self):
+        return self._supervisor
 
     def connect_to_wifi(self, on_retry=None):
         wifi_ssid = os.getenv("WIFI_SSID")
@@ -44,64 +454,188 @@ class Network:
 
                 if connection_attempts > MAX_CONNECTION_ATTEMPTS:
                     print(f"Failed to connect to WiFi with provided credentials, error: {err}.\nNo attempts remaining. Soft-rebooting.")
-                    supervisor.reload()
+                    self._reload()
                 else:
-                    print(f"Failed to connect to WiFi with provided credentials, error: {err}.\nRetrying...")
+                    delay = backoff_delay(i, 1, 60)
+                    print(f"Failed to connect to WiFi with provided credentials, error: {err}.\nRetrying in {delay:.0f} s...")
 
                     if on_retry is not None:
                         on_retry()
 
-        self._pool = socketpool.SocketPool(wifi.radio)
-        ssl_context = adafruit_connection_manager.get_radio_ssl_context(wifi.radio)
-        self._requests = adafruit_requests.Session(self._pool, ssl_context)
+                    time.sleep(delay)
+
+        self._start_session(new_pool=True)
         print("Connected to WiFi")  
 
+    def _start_session(self, new_pool):
+        restarting = self._http is not None
+
+        if restarting:
+            self._http.close()
+
+        if new_pool:
+            self._pool = socketpool.SocketPool(wifi.radio)
+            self._ssl_context = adafruit_connection_manager.get_radio_ssl_context(wifi.radio)
+
+        session = HttpSession(self._pool, self._ssl_context)
+
+        # The recorder is kept, so the trace carries on with the new session.
+        if self._record_path is None:
+            self._http = session
+        elif restarting:
+            self._http.session = session
+        else:
+            from network_transport import RecordingTransport
+            self._http = RecordingTransport(session, self._record_path)
+
+        # The transport makes the requests if there is one, so it's what
+        # needs starting over too.
+        if restarting and self._transport is not None:
+            self._transport.reset()
+
+    # Recovery steps for the supervisor, gentlest first.
+    def reset_session(self):
+        self._start_session(new_pool=False)
+
+    def reset_socket_pool(self):
+        self._start_session(new_pool=True)
+
+    def restart_radio(self):
+        self._http.close()
+        wifi.radio.enabled = False
+        wifi.radio.enabled = True
+        self.connect_to_wifi()
+
+    def _reload(self):
+        if self.before_reload is not None:
+            self.before_reload()
+
+        supervisor.reload()
+
     def fetch_time(self, on_retry=None):
+        attempt = 0
+
         while True:
             try:
                 print("Fetching current time")
                 ntp = adafruit_ntp.NTP(self._pool, tz_offset=0, cache_seconds=3600)
                 return ntp.datetime
             except Exception as err:
-                print(f"Error getting time: {err}")
+                delay = backoff_delay(attempt, 1, 60)
+                attempt += 1
+                print(f"Error getting time: {err}, retrying in {delay:.0f} s")
 
                 if on_retry is not None:
                     on_retry()
 
+                time.sleep(delay)
+
+    @property
+    def last_timing(self):
+        return self._http.last_timing
+
+    def _get(self, url):
+        return (self._transport or self._http).get(url)
+
+    # Each fetch returns None if it failed, or if its endpoint's circuit is open.
+    # Socket errors and timeouts (OSError) are told apart from error statuses
+    # and bad bodies, since only they count toward recovering the network.
     def fetch_iss_coordinate(self):
+        if not self._supervisor.allow(ENDPOINT_OPEN_NOTIFY):
+            return None
+
+        coordinate = None
+        transport_error = False
+
         try:
-            with self._requests.get("http://api.open-notify.org/iss-now.json") as response:
-                json = response.json()
-                location = json["iss_position"]
+            with self._get("http://api.open-notify.org/iss-now.json") as response:
+                if response.status_code != 200:
+                    print(f"Failed to fetch ISS location, status: {response.status_code}")
+                else:
+                    json = response.json()
+                    location = json["iss_position"]
 
-                lat = float(location["latitude"])
-                lon = float(location["longitude"])
+                    lat = float(location["latitude"])
+                    lon = float(location["longitude"])
 
-                return (lat, lon)
+                    coordinate = (lat, lon)
 
+        except OSError as err:
+            print(f"Failed to fetch ISS location, error: {err}")
+            transport_error = True
         except Exception as err:
             print(f"Failed to fetch ISS location, error: {err}")
 
-        return None
+        self._supervisor.record(ENDPOINT_OPEN_NOTIFY, coordinate is not None, transport_error)
+        return coordinate
+
+    # Fetch the ISS's current two-line orbital elements as text.
+    def fetch_tle(self):
+        if not self._supervisor.allow(ENDPOINT_CELESTRAK):
+            return None
+
+        text = None
+        transport_error = False
+
+        try:
+            with self._get("https://celestrak.org/NORAD/elements/gp.php?CATNR=25544&FORMAT=TLE") as response:
+                if response.status_code != 200:
+                    print(f"Failed to fetch ISS orbital elements, status: {response.status_code}")
+                else:
+                    text = response.text
+
+        except OSError as err:
+            print(f"Failed to fetch ISS orbital elements, error: {err}")
+            transport_error = True
+        except Exception as err:
+            print(f"Failed to fetch ISS orbital elements, error: {err}")
+
+        self._supervisor.record(ENDPOINT_CELESTRAK, text is not None, transport_error)
+        return text
+
+    # Geodata can only be fetched with a Geoapify API key in settings.toml.
+    @property
+    def has_geodata_key(self):
+        api_key = os.getenv("GEOAPIFY_KEY")
+        return api_key is not None and len(api_key) > 0
 
     def fetch_geodata(self, lat, lon):
+        if not self._supervisor.allow(ENDPOINT_GEOAPIFY):
+            return None
+
+        geodata = None
+        succeeded = False
+        transport_error = False
         api_key = os.getenv("GEOAPIFY_KEY")
         url = f"https://api.geoapify.com/v1/geocode/reverse?lat={lat}&lon={lon}&apiKey={api_key}&lang=en&limit=1"
 
         try:
-            with self._requests.get(url) as response:
-                json = response.json()
+            with self._get(url) as response:
+                if response.status_code != 200:
+                    print(f"Failed to fetch geoapify data, status: {response.status_code}")
+                else:
+                    # Only read the properties we use, rather than parsing the whole response.
+                    properties = extract_fields(response, _GEODATA_PATH, _GEODATA_KEYS, self._chunk)
+
+                    # No properties (e.g. nothing there) still means geoapify answered.
+                    succeeded = True
 
-                if len(json["features"]) > 0:
-                    feature = json["features"][0]
-                    properties = feature["properties"]
-                    _debug_print_geodata(properties)
-                    return _geodata_from_properties(properties)
+                    if properties is not None:
+                        _debug_print_geodata(properties)
+                        geodata = _geodata_from_properties(properties)
 
+        except OSError as err:
+            print(f"Failed to fetch geoapify data, error: {err}")
+            transport_error = True
         except Exception as err:
             print(f"Failed to fetch geoapify data, error: {err}")
 
-        return None
+        self._supervisor.record(ENDPOINT_GEOAPIFY, succeeded, transport_error)
+        return geodata
+
+# Where the properties are in a geoapify response, and which ones we use.
+_GEODATA_PATH = ("features", 0, "properties")
+_GEODATA_KEYS = ("city", "district", "county", "state", "region", "country", "formatted", "name")
 
 # Given a bag of properties, derive a location name.
 def _geodata_from_properties(properties):
@@ -120,10 +654,8 @@ def _geodata_from_properties(properties):
 
 # Print the properties we care about from returned geodata properties
 def _debug_print_geodata(properties):
-    # Just print out the properties we care about, defined in this list.
-    keys = ["city", "district", "county", "state", "region", "country", "formatted", "name"]
-
-    for key in keys:
+    # Just print out the properties we care about, listed in _GEODATA_KEYS.
+    for key in _GEODATA_KEYS:
         if key in properties:
             print(f"    {key}: {properties[key]}")    
 
@@ -0,0 +1,191 @@
+import random
+import time
+
+# Keeps an eye on how network requests are going, and backs off and
+# recovers when they keep failing, instead of soft rebooting.
+#
+# Each endpoint (open-notify, celestrak, geoapify) has a circuit breaker.
+# After BREAKER_THRESHOLD failures in a row it opens, and requests to that
+# endpoint are skipped (the callers fall back to the propagated or
+# estimated position, or offline names) until a backoff delay has passed.
+# Then one request is let through: if it succeeds the breaker closes, if
+# not it opens again for twice as long, up to BACKOFF_MAX.
+#
+# Transport failures (socket errors and timeouts) in a row across all
+# endpoints mean the problem is more likely on our side, so every
+# RECOVERY_THRESHOLD of them, the next recovery step is taken: a new HTTP
+# session, then a new socket pool, then restarting the radio, and only then
+# a reload. Any answer from a server starts over, even an error status or a
+# bad body, which only count against that endpoint's breaker: the network
+# is working, so recovering it wouldn't help (e.g. a 401 for a bad API key,
+# or a 429 for asking too often).
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half-open"
+
+BREAKER_THRESHOLD = 3
+RECOVERY_THRESHOLD = 3
+
+# Backoff delays in seconds.
+BACKOFF_BASE = 30
+BACKOFF_MAX = 30 * 60
+
+_NS_PER_S = 1_000_000_000
+
+# Exponential backoff with jitter: the delay before retry number `attempt`
+# (from 0) is base * 2^attempt, capped at maximum, with the lower half of
+# it fixed and the upper half random, so devices that failed together
+# don't all retry together.
+def backoff_delay(attempt, base, maximum):
+    delay = min(base * (1 << min(attempt, 16)), maximum)
+    return delay / 2 + random.random() * delay / 2
+
+class CircuitBreaker:
+    def __init__(self, name, now, threshold=BREAKER_THRESHOLD, backoff_base=BACKOFF_BASE, backoff_max=BACKOFF_MAX):
+        self._name = name
+        self._threshold = threshold
+        self._backoff_base = backoff_base
+        self._backoff_max = backoff_max
+
+        self._state = CLOSED
+        self._state_since = now
+        self._failures = 0
+        self._opens = 0
+        self._retry_at = 0
+
+        # ns spent in each state, not counting the current one.
+        self._state_ns = {CLOSED: 0, OPEN: 0, HALF_OPEN: 0}
+
+    @property
+    def name(self):
+        return self._name
+
+    @property
+    def state(self):
+        return self._state
+
+    # Times the breaker has opened in a row, without closing in between.
+    @property
+    def opens(self):
+        return self._opens
+
+    # Seconds spent in a state, up to now.
+    def time_in(self, state, now):
+        elapsed = self._state_ns[state]
+
+        if state == self._state:
+            elapsed += now - self._state_since
+
+        return elapsed / _NS_PER_S
+
+    def _set_state(self, state, now):
+        self._state_ns[self._state] += now - self._state_since
+        self._state = state
+        self._state_since = now
+
+    # True if a request may be made now.
+    def allow(self, now):
+        if self._state == OPEN and now - self._retry_at >= 0:
+            self._set_state(HALF_OPEN, now)
+
+        return self._state != OPEN
+
+    def record(self, succeeded, now):
+        if succeeded:
+            self._failures = 0
+            self._opens = 0
+
+            if self._state != CLOSED:
+                print(f"Network: {self._name} is back, closing its circuit")
+                self._set_state(CLOSED, now)
+
+            return
+
+        self._failures += 1
+
+        if self._state == HALF_OPEN or self._failures >= self._threshold:
+            delay = backoff_delay(self._opens, self._backoff_base, self._backoff_max)
+            self._opens += 1
+            self._retry_at = now + int(delay * _NS_PER_S)
+            print(f"Network: {self._name} failed {self._failures} times, skipping it for {delay:.0f} s")
+            self._set_state(OPEN, now)
+
+    # Time in each state is only shown once the breaker has opened.
+    def stats_text(self, now):
+        if self._state == CLOSED and self._state_ns[OPEN] == 0:
+            return f"{self._name} {self._state}"
+
+        return (f"{self._name} {self._state} (closed {self.time_in(CLOSED, now):.0f} s, "
+                f"open {self.time_in(OPEN, now):.0f} s, half-open {self.time_in(HALF_OPEN, now):.0f} s)")
+
+class NetworkSupervisor:
+    # recovery_steps: (name, function) pairs, gentlest first.
+    def __init__(self, recovery_steps, clock=time.monotonic_ns, recovery_threshold=RECOVERY_THRESHOLD):
+        self._recovery_steps = recovery_steps
+        self._clock = clock
+        self._recovery_threshold = recovery_threshold
+
+        self._breakers = {}
+        self._failures = 0
+        self._next_step = 0
+        self._recoveries = [0] * len(recovery_steps)
+        self._skipped = 0
+
+    def breaker(self, endpoint):
+        breaker = self._breakers.get(endpoint)
+
+        if breaker is None:
+            breaker = CircuitBreaker(endpoint, self._clock())
+            self._breakers[endpoint] = breaker
+
+        return breaker
+
+    # True if a request to endpoint may be made now.
+    def allow(self, endpoint):
+        if self.breaker(endpoint).allow(self._clock()):
+            return True
+
+        self._skipped += 1
+        return False
+
+    # transport_error: the request failed without an answer from the server.
+    def record(self, endpoint, succeeded, transport_error=False):
+        self.breaker(endpoint).record(succeeded, self._clock())
+
+        if succeeded or not transport_error:
+            self._failures = 0
+            self._next_step = 0
+            return
+
+        self._failures += 1
+
+        if self._failures % self._recovery_threshold == 0 and self._next_step < len(self._recovery_steps):
+            self._recover()
+
+    def _recover(self):
+        step = self._next_step
+        name, recover = self._recovery_steps[step]
+        self._next_step += 1
+        self._recoveries[step] += 1
+        print(f"Network: {self._failures} failures in a row, recovering: {name}")
+
+        try:
+            recover()
+        except Exception as err:
+            print(f"Network: recovery step {name} failed, error: {err}")
+
+    @property
+    def skipped(self):
+        return self._skipped
+
+    # Times each recovery step was taken, by name.
+    @property
+    def recoveries(self):
+        return {name: self._recoveries[i] for i, (name, _) in enumerate(self._recovery_steps)}
+
+    def stats_text(self):
+        now = self._clock()
+        breakers = ", ".join(breaker.stats_text(now) for breaker in self._breakers.values())
+        recoveries = ", ".join(f"{name} {count}" for name, count in self.recoveries.items() if count > 0)
+        return f"{breakers}; {self._skipped} skipped; recoveries: {recoveries or 'none'}"
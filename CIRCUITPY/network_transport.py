@@ -0,0 +1,336 @@
+import json
+import time
+from math import floor
+
+from orbit import Orbit
+
+# Stand-ins for the live HTTP session, which Network can make its requests
+# through instead (see Network's transport and record_path):
+#
+#   RecordingTransport wraps the live session, and appends every response,
+#   with its timing, to a trace file.
+#   ReplayTransport serves the responses in a trace file, per endpoint in
+#   recorded order and at the recorded pace, starting over when an endpoint
+#   runs out.
+#   SyntheticTransport makes responses up: positions along an orbit, its
+#   orbital elements, and place names for each area of the map.
+#
+# Traces are JSON lines, the same as host/traces, so a trace recorded on the
+# MagTag can be replayed by the host tools and vice versa. The first line
+# holds metadata, {"trace": name, "start": unix seconds}, and each other line
+# one response: {"t": ms since start, "url": ..., "status": ..., "elapsed": ms, "body": ...}
+
+# Response with the body already in memory, with the parts of HttpResponse's
+# interface that Network uses.
+class BufferedResponse:
+    def __init__(self, status_code, body):
+        self.status_code = status_code
+        self.headers = {}
+        self._body = body
+        self._offset = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def readinto(self, buf):
+        count = min(len(buf), len(self._body) - self._offset)
+        buf[0:count] = self._body[self._offset:self._offset + count]
+        self._offset += count
+        return count
+
+    @property
+    def content(self):
+        return self._body
+
+    @property
+    def text(self):
+        return str(self._body, "utf-8")
+
+    def json(self):
+        return json.loads(self._body)
+
+    def close(self):
+        pass
+
+# Host and path of a URL, without the scheme or query.
+def _endpoint(url):
+    url = url.split("://", 1)[-1]
+    return url.split("?", 1)[0]
+
+# One recorder lasts for the whole run, so the trace has one header and one
+# start time; when Network makes a new session, it's handed to the recorder.
+class RecordingTransport:
+    def __init__(self, session, path, name="magtag"):
+        self._session = session
+        self._path = path
+        self._start_ns = time.monotonic_ns()
+        self.recorded = 0
+
+        try:
+            with open(path, "a") as f:
+                f.write(json.dumps({"trace": name, "start": time.time()}))
+                f.write("\n")
+        except OSError as err:
+            print(f"Unable to record to {path}, not recording. Error: {err}")
+            self._path = None
+
+    @property
+    def session(self):
+        return self._session
+
+    @session.setter
+    def session(self, session):
+        self._session = session
+
+    @property
+    def last_timing(self):
+        return self._session.last_timing
+
+    def get(self, url, timeout=30):
+        start_ns = time.monotonic_ns()
+        t = (start_ns - self._start_ns) // 1_000_000
+
+        with self._session.get(url, timeout=timeout) as response:
+            status = response.status_code
+            body = response.content
+
+        if self._path is not None:
+            entry = {
+                "t": t,
+                "url": url,
+                "status": status,
+                "elapsed": (time.monotonic_ns() - start_ns) // 1_000_000,
+                "body": str(body, "utf-8")
+            }
+
+            try:
+                with open(self._path, "a") as f:
+                    f.write(json.dumps(entry))
+                    f.write("\n")
+
+                self.recorded += 1
+            except OSError as err:
+                print(f"Unable to record to {self._path}, not recording. Error: {err}")
+                self._path = None
+
+        return BufferedResponse(status, body)
+
+    def close(self):
+        self._session.close()
+
+# Only the offset of each response is kept in memory; the line is read back
+# from the file when it's served.
+#
+# Responses are paced as they were recorded: each is served no sooner than
+# its "t" plus "elapsed" after the first request, divided by speed. When an
+# endpoint starts over, its times carry on from the end of the trace.
+class ReplayTransport:
+    # speed: 1 keeps the recorded pace, 10 is ten times as fast, and 0
+    # doesn't wait at all.
+    def __init__(self, path, speed=1):
+        self._path = path
+        self._speed = speed
+        self.served = 0
+        self._index()
+
+    # Find where each endpoint's responses are, and start them all from the first.
+    def _index(self):
+        self._offsets = {}
+        self._next = {}
+        self._laps = {}
+        self._length = 0
+        self._start_ns = None
+
+        with open(self._path, "rb") as f:
+            while True:
+                offset = f.tell()
+                line = f.readline()
+
+                if not line:
+                    break
+
+                # Only the url and time are needed now, so don't parse the whole body.
+                start = line.find(b'"url": "')
+
+                if start < 0:
+                    continue
+
+                start += 8
+                url = str(line[start:line.find(b'"', start)], "utf-8")
+                self._offsets.setdefault(_endpoint(url), []).append(offset)
+
+                start = line.find(b'"t": ')
+
+                if start >= 0:
+                    start += 5
+                    self._length = max(self._length, int(line[start:line.find(b',', start)]))
+
+        print(f"Replaying {sum(len(o) for o in self._offsets.values())} responses from {self._path}")
+
+    # Network's recovery steps call this in place of making a new session:
+    # the trace is read again, in case it was replaced.
+    def reset(self):
+        self._index()
+
+    def get(self, url, timeout=30):
+        endpoint = _endpoint(url)
+        offsets = self._offsets.get(endpoint)
+
+        if not offsets:
+            raise OSError(f"No recorded responses for {endpoint}")
+
+        index = self._next.get(endpoint, 0)
+        lap = self._laps.get(endpoint, 0)
+        self._next[endpoint] = (index + 1) % len(offsets)
+
+        if index + 1 == len(offsets):
+            self._laps[endpoint] = lap + 1
+
+        with open(self._path, "rb") as f:
+            f.seek(offsets[index])
+            entry = json.loads(f.readline())
+
+        if self._start_ns is None:
+            self._start_ns = time.monotonic_ns()
+
+        if self._speed > 0:
+            due_ms = lap * self._length + entry.get("t", 0) + entry.get("elapsed", 0)
+            wait_ns = self._start_ns + int(due_ms * 1_000_000 / self._speed) - time.monotonic_ns()
+
+            if wait_ns > 0:
+                time.sleep(wait_ns / 1_000_000_000)
+
+        self.served += 1
+        return BufferedResponse(entry.get("status", 200), entry["body"].encode("utf-8"))
+
+    def close(self):
+        pass
+
+# ISS-like orbital elements. The epoch (columns 19-32 of line 1) is filled
+# in when the transport is made, and moved on once a day so the elements
+# never get too old to use.
+_TLE_LINE1 = "1 25544U 98067A   {epoch}  .00012000  00000+0  21500-3 0  999"
+_TLE_LINE2 = "2 25544  51.6400   1.5648 0003000   0.0000 300.0000 15.50050000527378"
+
+_EPOCH_INTERVAL = 24 * 60 * 60
+
+# Place names of all lengths, some needing transliteration, some very long.
+_PLACES = (
+    ("Springfield", "Illinois", "United States"),
+    ("Saint-Rémy-en-Bouzemont-Saint-Genest-et-Isson", "Grand Est", "France"),
+    (None, "Nunavut", "Canada"),
+    ("Llanfairpwllgwyngyllgogerychwyrndrobwllllantysiliogogogoch", "Wales", "United Kingdom"),
+    ("Zürich", "Zürich", "Switzerland"),
+    ("Krung Thep Maha Nakhon", "Bangkok", "Thailand"),
+    (None, "Northern Territory", "Australia"),
+    ("Ushuaia", "Tierra del Fuego", "Argentina"),
+    ("Reykjavík", "Capital Region", "Iceland"),
+    (None, None, "Kazakhstan"),
+    ("Nouakchott", "Nouakchott", "Mauritania"),
+    ("Ōsaka", "Ōsaka Prefecture", "Japan"),
+)
+
+# Cells of this many degrees get the same place, or are open ocean.
+_PLACE_CELL = 10
+
+def _checksum(line):
+    total = 0
+    for char in line:
+        if char.isdigit():
+            total += int(char)
+        elif char == "-":
+            total += 1
+
+    return str(total % 10)
+
+# CircuitPython has no gmtime, but its localtime is UTC (there are no time zones).
+_utc_time = time.gmtime if hasattr(time, "gmtime") else time.localtime
+
+# TLE epoch field, "YYDDD.DDDDDDDD", for a unix time, in UTC.
+def _epoch_field(unix_time):
+    t = _utc_time(unix_time)
+    seconds = t.tm_hour * 3600 + t.tm_min * 60 + t.tm_sec
+    return f"{t.tm_year % 100:02d}{t.tm_yday:03d}.{seconds * 100_000_000 // 86400:08d}"
+
+class SyntheticTransport:
+    # clock returns the time in unix seconds.
+    def __init__(self, clock=time.time):
+        self._clock = clock
+        self._epoch = None
+        self._orbit = None
+        self._tle = None
+        self.served = 0
+
+    def _update_orbit(self, now):
+        epoch = now - now % _EPOCH_INTERVAL
+
+        if epoch == self._epoch:
+            return
+
+        line1 = _TLE_LINE1.format(epoch=_epoch_field(epoch))
+        line1 += _checksum(line1)
+        self._epoch = epoch
+        self._orbit = Orbit(line1, _TLE_LINE2)
+        self._tle = f"ISS (ZARYA)\r\n{line1}\r\n{_TLE_LINE2}\r\n"
+
+    def get(self, url, timeout=30):
+        now = self._clock()
+        self._update_orbit(now)
+        endpoint = _endpoint(url)
+
+        if endpoint.endswith("iss-now.json"):
+            position = self._orbit.position(now)
+            body = json.dumps({
+                "message": "success",
+                "timestamp": int(now),
+                "iss_position": {"latitude": f"{position.latitude:.4f}", "longitude": f"{position.longitude:.4f}"}
+            })
+        elif endpoint.endswith("gp.php"):
+            body = self._tle
+        elif endpoint.endswith("geocode/reverse"):
+            body = json.dumps(self._geocode(url))
+        else:
+            return BufferedResponse(404, b"Not Found")
+
+        self.served += 1
+        return BufferedResponse(200, body.encode("utf-8"))
+
+    # Network's recovery steps call this in place of making a new session:
+    # the orbital elements are made again on the next request.
+    def reset(self):
+        self._epoch = None
+        self._orbit = None
+        self._tle = None
+
+    def _geocode(self, url):
+        params = {}
+
+        for param in url.split("?", 1)[1].split("&"):
+            name, _, value = param.partition("=")
+            params[name] = value
+
+        row = floor(float(params["lat"]) / _PLACE_CELL)
+        col = floor(float(params["lon"]) / _PLACE_CELL)
+        index = (row * 37 + col * 11) % (len(_PLACES) * 2)
+
+        # Every other cell is ocean, which geoapify names but gives no country.
+        if index >= len(_PLACES):
+            name = "South Pacific Ocean" if row < 0 else "North Atlantic Ocean"
+            return {"features": [{"properties": {"name": name, "formatted": name}}]}
+
+        city, state, country = _PLACES[index]
+        properties = {"country": country, "formatted": ", ".join(p for p in (city, state, country) if p)}
+
+        if city is not None:
+            properties["city"] = city
+
+        if state is not None:
+            properties["state"] = state
+
+        return {"features": [{"properties": properties}]}
+
+    def close(self):
+        pass
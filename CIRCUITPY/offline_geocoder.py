@@ -0,0 +1,85 @@
+import struct
+from array import array
+from network_helper import GeoData
+
+# Offline reverse geocoding to country and state/province, so there's always
+# something to show when Geoapify is slow, rate limited, or has no API key.
+#
+# The data (assets/geocoder.bin, built by tools/build_geocoder.py) is a grid
+# of region indexes, run length encoded by row. Looking up a position is a
+# binary search within one row, so it's quick even on the MagTag.
+
+_HEADER_FORMAT = "<4sBHHHHHI"
+
+class OfflineGeocoder:
+    def __init__(self, path="assets/geocoder.bin"):
+        with open(path, "rb") as f:
+            header = f.read(struct.calcsize(_HEADER_FORMAT))
+            magic, version, cell_size, width, height, country_count, region_count, run_count = struct.unpack(_HEADER_FORMAT, header)
+
+            if magic != b"RGEO" or version != 1:
+                raise ValueError("Unrecognized geocoder file")
+
+            self._cell_size = cell_size / 100
+            self._width = width
+            self._height = height
+
+            self._country_offsets = array("H", f.read((country_count + 1) * 2))
+            self._country_names = f.read(self._country_offsets[-1])
+
+            self._region_countries = array("H", f.read(region_count * 2))
+            self._region_offsets = array("H", f.read((region_count + 1) * 2))
+            self._region_names = f.read(self._region_offsets[-1])
+
+            self._row_starts = array("I", f.read((height + 1) * 4))
+
+            # Pairs of (first column, region index + 1 or 0 for none).
+            self._runs = array("H", f.read(run_count * 4))
+
+    # Returns GeoData with the country and state for a position, or None if
+    # it isn't in any country.
+    def lookup(self, lat, lon):
+        region = self._region_at(lat, lon)
+
+        if region == 0:
+            return None
+
+        region -= 1
+        country = self._region_countries[region]
+        state = _name(self._region_names, self._region_offsets, region)
+
+        return GeoData(
+            city=None,
+            district=None,
+            county=None,
+            state=state if len(state) > 0 else None,
+            region=None,
+            country=_name(self._country_names, self._country_offsets, country),
+            name=None
+        )
+
+    def _region_at(self, lat, lon):
+        row = int((90 - lat) / self._cell_size)
+        col = int((lon + 180) / self._cell_size)
+
+        # Clamp the poles and wrap the antimeridian.
+        row = min(max(row, 0), self._height - 1)
+        col = col % self._width
+
+        # Find the last run in the row that starts at or before col.
+        runs = self._runs
+        low = self._row_starts[row]
+        high = self._row_starts[row + 1] - 1
+
+        while low < high:
+            middle = (low + high + 1) // 2
+
+            if runs[middle * 2] <= col:
+                low = middle
+            else:
+                high = middle - 1
+
+        return runs[low * 2 + 1]
+
+def _name(names, offsets, index):
+    return names[offsets[index]:offsets[index + 1]].decode("utf-8")
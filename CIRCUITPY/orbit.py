@@ -0,0 +1,397 @@
+from math import pi, sin, cos, sqrt, atan2, fmod
+from collections import namedtuple
+
+# Local ISS position from a two-line element set (TLE), using the near-earth
+# SGP4 model (Spacetrack Report #3, as revised by Vallado et al.).
+# Deep-space terms are left out: they only apply to orbits with periods over
+# 225 minutes, and the ISS goes around in ~92.
+#
+# CircuitPython floats are single precision, so times are kept as integer
+# unix seconds and only differences are converted to floats. With a TLE
+# refreshed a few times a day, the error is a few kilometers, far below
+# the size of a pixel on the map.
+
+OrbitPosition = namedtuple("OrbitPosition", ["latitude", "longitude", "altitude"])
+
+_TWO_PI = 2 * pi
+_DEG_TO_RAD = pi / 180
+_RAD_TO_DEG = 180 / pi
+_X2O3 = 2 / 3
+
+# WGS-72 constants, which TLEs are generated with.
+_EARTH_RADIUS_KM = 6378.135
+_XKE = 0.0743669161331734
+_J2 = 0.001082616
+_J3 = -0.00000253881
+_J4 = -0.00000165597
+_J3OJ2 = _J3 / _J2
+
+# WGS-84 ellipsoid, for converting to geodetic latitude.
+_WGS84_RADIUS_KM = 6378.137
+_WGS84_E2 = 0.00669437999014
+
+# 2000-01-01 12:00 UTC
+_J2000_UNIX = 946728000
+
+_SECONDS_PER_DAY = 86400
+
+# Days from 1970-01-01 to January 1st of the given year.
+def _days_to_year(year):
+    days = 0
+    for y in range(1970, year):
+        days += 366 if (y % 4 == 0 and y % 100 != 0) or y % 400 == 0 else 365
+    return days
+
+# TLE epochs are "YYDDD.DDDDDDDD". The fraction is parsed separately so it
+# doesn't lose precision in a single precision float.
+def _epoch_to_unix(field):
+    year = int(field[0:2])
+    year += 2000 if year < 57 else 1900
+
+    day, _, fraction = field.strip()[2:].partition(".")
+    seconds = round(float("0." + (fraction or "0")) * _SECONDS_PER_DAY)
+
+    return (_days_to_year(year) + int(day) - 1) * _SECONDS_PER_DAY + seconds
+
+# Parse TLE "assumed decimal point" fields, e.g. " 12345-4" -> 0.12345e-4
+def _implied_decimal(field):
+    field = field.strip()
+    if not field:
+        return 0.0
+
+    sign = -1 if field[0] == "-" else 1
+    field = field.lstrip("+-")
+    mantissa, exponent = field[:-2], field[-2:]
+
+    return sign * float("0." + mantissa) * pow(10, int(exponent))
+
+def _checksum_ok(line):
+    total = 0
+    for char in line[:68]:
+        if char.isdigit():
+            total += int(char)
+        elif char == "-":
+            total += 1
+
+    return total % 10 == int(line[68])
+
+# Extract the two element lines from a TLE, with or without a name line.
+def split_tle(text):
+    line1 = None
+    line2 = None
+
+    for line in text.splitlines():
+        line = line.strip()
+        if line.startswith("1 ") and line1 is None:
+            line1 = line
+        elif line.startswith("2 ") and line1 is not None:
+            line2 = line
+            break
+
+    if line1 is None or line2 is None:
+        raise ValueError("TLE lines not found")
+
+    return line1, line2
+
+# Greenwich mean sidereal time in radians.
+def _gmst(unix_time):
+    # Whole days and the remaining fraction are kept apart to avoid
+    # multiplying a large day count by a large rate in single precision.
+    seconds = unix_time - _J2000_UNIX
+    days = seconds // _SECONDS_PER_DAY
+    fraction = (seconds - days * _SECONDS_PER_DAY) / _SECONDS_PER_DAY
+
+    degrees = fmod(280.46061837 + fmod(0.98564736629 * days, 360.0) + 360.98564736629 * fraction, 360.0)
+    return degrees * _DEG_TO_RAD
+
+class Orbit:
+    def __init__(self, line1, line2):
+        if len(line1) < 69 or len(line2) < 69 or line1[0] != "1" or line2[0] != "2":
+            raise ValueError("Malformed TLE")
+
+        if not (_checksum_ok(line1) and _checksum_ok(line2)):
+            raise ValueError("TLE checksum mismatch")
+
+        self._line1 = line1
+        self._line2 = line2
+        self._epoch = _epoch_to_unix(line1[18:32])
+
+        bstar = _implied_decimal(line1[53:61])
+        inclo = float(line2[8:16]) * _DEG_TO_RAD
+        nodeo = float(line2[17:25]) * _DEG_TO_RAD
+        ecco = float("0." + line2[26:33].strip())
+        argpo = float(line2[34:42]) * _DEG_TO_RAD
+        mo = float(line2[43:51]) * _DEG_TO_RAD
+        no_kozai = float(line2[52:63]) * _TWO_PI / 1440.0
+
+        self._initialize(bstar, inclo, nodeo, ecco, argpo, mo, no_kozai)
+
+    @property
+    def line1(self):
+        return self._line1
+
+    @property
+    def line2(self):
+        return self._line2
+
+    # Epoch of the element set, in unix seconds.
+    @property
+    def epoch(self):
+        return self._epoch
+
+    # Orbital period in seconds.
+    @property
+    def period(self):
+        return _TWO_PI / self._no_unkozai * 60
+
+    # Seconds between the element set's epoch and unix_time.
+    def age(self, unix_time):
+        return unix_time - self._epoch
+
+    # Sub-satellite point at unix_time (integer seconds since 1970, UTC).
+    def position(self, unix_time):
+        x, y, z = self._propagate((unix_time - self._epoch) / 60)
+
+        # TEME -> earth-fixed, ignoring polar motion.
+        longitude = atan2(y, x) - _gmst(unix_time)
+        longitude = fmod(longitude + pi, _TWO_PI)
+        if longitude < 0:
+            longitude += _TWO_PI
+        longitude -= pi
+
+        # Geodetic latitude, by fixed-point iteration.
+        r_xy = sqrt(x * x + y * y)
+        latitude = atan2(z, r_xy)
+        c = 1.0
+        for _ in range(3):
+            s = sin(latitude)
+            c = 1 / sqrt(1 - _WGS84_E2 * s * s)
+            latitude = atan2(z + _WGS84_RADIUS_KM * c * _WGS84_E2 * s, r_xy)
+
+        altitude = r_xy / cos(latitude) - _WGS84_RADIUS_KM * c
+
+        return OrbitPosition(latitude * _RAD_TO_DEG, longitude * _RAD_TO_DEG, altitude)
+
+    # Earth-fixed (x, y, z) in km at unix_time, ignoring polar motion. Cheaper
+    # than position() when only geometry is needed, e.g. look angles.
+    def earth_fixed(self, unix_time):
+        x, y, z = self._propagate((unix_time - self._epoch) / 60)
+        gmst = _gmst(unix_time)
+        cos_gmst = cos(gmst)
+        sin_gmst = sin(gmst)
+
+        return (x * cos_gmst + y * sin_gmst, y * cos_gmst - x * sin_gmst, z)
+
+    def _initialize(self, bstar, inclo, nodeo, ecco, argpo, mo, no_kozai):
+        self._bstar = bstar
+        self._inclo = inclo
+        self._nodeo = nodeo
+        self._ecco = ecco
+        self._argpo = argpo
+        self._mo = mo
+
+        eccsq = ecco * ecco
+        omeosq = 1 - eccsq
+        rteosq = sqrt(omeosq)
+        cosio = cos(inclo)
+        cosio2 = cosio * cosio
+
+        # Recover the original mean motion and semi-major axis.
+        ak = pow(_XKE / no_kozai, _X2O3)
+        d1 = 0.75 * _J2 * (3 * cosio2 - 1) / (rteosq * omeosq)
+        delta = d1 / (ak * ak)
+        adel = ak * (1 - delta * delta - delta * (1 / 3 + 134 * delta * delta / 81))
+        delta = d1 / (adel * adel)
+        no_unkozai = no_kozai / (1 + delta)
+        ao = pow(_XKE / no_unkozai, _X2O3)
+
+        sinio = sin(inclo)
+        po = ao * omeosq
+        con42 = 1 - 5 * cosio2
+        con41 = -con42 - cosio2 - cosio2
+        posq = po * po
+        rp = ao * (1 - ecco)
+
+        # Drag constants depend on perigee height.
+        self._isimp = 1 if rp < (220 / _EARTH_RADIUS_KM + 1) else 0
+        sfour = 78 / _EARTH_RADIUS_KM + 1
+        qzms24 = pow((120 - 78) / _EARTH_RADIUS_KM, 4)
+        perige = (rp - 1) * _EARTH_RADIUS_KM
+
+        if perige < 156:
+            sfour = perige - 78
+            if perige < 98:
+                sfour = 20
+            qzms24 = pow((120 - sfour) / _EARTH_RADIUS_KM, 4)
+            sfour = sfour / _EARTH_RADIUS_KM + 1
+
+        pinvsq = 1 / posq
+        tsi = 1 / (ao - sfour)
+        eta = ao * ecco * tsi
+        etasq = eta * eta
+        eeta = ecco * eta
+        psisq = abs(1 - etasq)
+        coef = qzms24 * pow(tsi, 4)
+        coef1 = coef / pow(psisq, 3.5)
+        cc2 = coef1 * no_unkozai * (ao * (1 + 1.5 * etasq + eeta * (4 + etasq)) +
+              0.375 * _J2 * tsi / psisq * con41 * (8 + 3 * etasq * (8 + etasq)))
+        cc1 = bstar * cc2
+        cc3 = 0.0
+        if ecco > 1.0e-4:
+            cc3 = -2 * coef * tsi * _J3OJ2 * no_unkozai * sinio / ecco
+        x1mth2 = 1 - cosio2
+        cc4 = 2 * no_unkozai * coef1 * ao * omeosq * (
+            eta * (2 + 0.5 * etasq) + ecco * (0.5 + 2 * etasq) -
+            _J2 * tsi / (ao * psisq) * (
+                -3 * con41 * (1 - 2 * eeta + etasq * (1.5 - 0.5 * eeta)) +
+                0.75 * x1mth2 * (2 * etasq - eeta * (1 + etasq)) * cos(2 * argpo)))
+        cc5 = 2 * coef1 * ao * omeosq * (1 + 2.75 * (etasq + eeta) + eeta * etasq)
+
+        # Secular rates from gravity.
+        cosio4 = cosio2 * cosio2
+        temp1 = 1.5 * _J2 * pinvsq * no_unkozai
+        temp2 = 0.5 * temp1 * _J2 * pinvsq
+        temp3 = -0.46875 * _J4 * pinvsq * pinvsq * no_unkozai
+        self._mdot = no_unkozai + 0.5 * temp1 * rteosq * con41 + 0.0625 * temp2 * rteosq * (13 - 78 * cosio2 + 137 * cosio4)
+        self._argpdot = -0.5 * temp1 * con42 + 0.0625 * temp2 * (7 - 114 * cosio2 + 395 * cosio4) + temp3 * (3 - 36 * cosio2 + 49 * cosio4)
+        xhdot1 = -temp1 * cosio
+        self._nodedot = xhdot1 + (0.5 * temp2 * (4 - 19 * cosio2) + 2 * temp3 * (3 - 7 * cosio2)) * cosio
+
+        self._omgcof = bstar * cc3 * cos(argpo)
+        self._xmcof = -_X2O3 * coef * bstar / eeta if ecco > 1.0e-4 else 0.0
+        self._nodecf = 3.5 * omeosq * xhdot1 * cc1
+        self._t2cof = 1.5 * cc1
+        self._xlcof = -0.25 * _J3OJ2 * sinio * (3 + 5 * cosio) / max(abs(1 + cosio), 1.5e-12)
+        self._aycof = -0.5 * _J3OJ2 * sinio
+        self._delmo = pow(1 + eta * cos(mo), 3)
+        self._sinmao = sin(mo)
+        self._x7thm1 = 7 * cosio2 - 1
+
+        self._no_unkozai = no_unkozai
+        self._con41 = con41
+        self._x1mth2 = x1mth2
+        self._eta = eta
+        self._cc1 = cc1
+        self._cc4 = cc4
+        self._cc5 = cc5
+        self._sinio = sinio
+        self._cosio = cosio
+
+        self._d2 = self._d3 = self._d4 = 0.0
+        self._t3cof = self._t4cof = self._t5cof = 0.0
+
+        if self._isimp != 1:
+            cc1sq = cc1 * cc1
+            self._d2 = 4 * ao * tsi * cc1sq
+            temp = self._d2 * tsi * cc1 / 3
+            self._d3 = (17 * ao + sfour) * temp
+            self._d4 = 0.5 * temp * ao * tsi * (221 * ao + 31 * sfour) * cc1
+            self._t3cof = self._d2 + 2 * cc1sq
+            self._t4cof = 0.25 * (3 * self._d3 + cc1 * (12 * self._d2 + 10 * cc1sq))
+            self._t5cof = 0.2 * (3 * self._d4 + 12 * cc1 * self._d3 + 6 * self._d2 * self._d2 + 15 * cc1sq * (2 * self._d2 + cc1sq))
+
+    # Position in the TEME frame, in km, tsince minutes after epoch.
+    def _propagate(self, tsince):
+        t = tsince
+        t2 = t * t
+
+        # Secular gravity and drag.
+        xmdf = self._mo + self._mdot * t
+        argpdf = self._argpo + self._argpdot * t
+        nodedf = self._nodeo + self._nodedot * t
+        argpm = argpdf
+        mm = xmdf
+        nodem = nodedf + self._nodecf * t2
+        tempa = 1 - self._cc1 * t
+        tempe = self._bstar * self._cc4 * t
+        templ = self._t2cof * t2
+
+        if self._isimp != 1:
+            delomg = self._omgcof * t
+            delm = self._xmcof * (pow(1 + self._eta * cos(xmdf), 3) - self._delmo)
+            temp = delomg + delm
+            mm = xmdf + temp
+            argpm = argpdf - temp
+            t3 = t2 * t
+            t4 = t3 * t
+            tempa = tempa - self._d2 * t2 - self._d3 * t3 - self._d4 * t4
+            tempe = tempe + self._bstar * self._cc5 * (sin(mm) - self._sinmao)
+            templ = templ + self._t3cof * t3 + t4 * (self._t4cof + t * self._t5cof)
+
+        am = pow(_XKE / self._no_unkozai, _X2O3) * tempa * tempa
+        em = self._ecco - tempe
+        if em < 1.0e-6:
+            em = 1.0e-6
+
+        mm = mm + self._no_unkozai * templ
+        xlm = mm + argpm + nodem
+        nodem = fmod(nodem, _TWO_PI)
+        argpm = fmod(argpm, _TWO_PI)
+        xlm = fmod(xlm, _TWO_PI)
+        mm = fmod(xlm - argpm - nodem, _TWO_PI)
+
+        # Long period periodics.
+        axnl = em * cos(argpm)
+        temp = 1 / (am * (1 - em * em))
+        aynl = em * sin(argpm) + temp * self._aycof
+        xl = mm + argpm + nodem + temp * self._xlcof * axnl
+
+        # Solve Kepler's equation.
+        u = fmod(xl - nodem, _TWO_PI)
+        eo1 = u
+        sineo1 = sin(eo1)
+        coseo1 = cos(eo1)
+        for _ in range(10):
+            sineo1 = sin(eo1)
+            coseo1 = cos(eo1)
+            step = (u - aynl * coseo1 + axnl * sineo1 - eo1) / (1 - coseo1 * axnl - sineo1 * aynl)
+            if step > 0.95:
+                step = 0.95
+            elif step < -0.95:
+                step = -0.95
+            eo1 += step
+            if abs(step) < 1.0e-12:
+                break
+
+        # Short period periodics.
+        ecose = axnl * coseo1 + aynl * sineo1
+        esine = axnl * sineo1 - aynl * coseo1
+        el2 = axnl * axnl + aynl * aynl
+        pl = am * (1 - el2)
+
+        if pl < 0:
+            raise ValueError("Orbit has decayed")
+
+        rl = am * (1 - ecose)
+        betal = sqrt(1 - el2)
+        temp = esine / (1 + betal)
+        sinu = am / rl * (sineo1 - aynl - axnl * temp)
+        cosu = am / rl * (coseo1 - axnl + aynl * temp)
+        su = atan2(sinu, cosu)
+        sin2u = (cosu + cosu) * sinu
+        cos2u = 1 - 2 * sinu * sinu
+        temp = 1 / pl
+        temp1 = 0.5 * _J2 * temp
+        temp2 = temp1 * temp
+
+        mrt = rl * (1 - 1.5 * temp2 * betal * self._con41) + 0.5 * temp1 * self._x1mth2 * cos2u
+        su = su - 0.25 * temp2 * self._x7thm1 * sin2u
+        xnode = nodem + 1.5 * temp2 * self._cosio * sin2u
+        xinc = self._inclo + 1.5 * temp2 * self._cosio * self._sinio * cos2u
+
+        # Orientation vectors.
+        sinsu = sin(su)
+        cossu = cos(su)
+        snod = sin(xnode)
+        cnod = cos(xnode)
+        sini = sin(xinc)
+        cosi = cos(xinc)
+        xmx = -snod * cosi
+        xmy = cnod * cosi
+
+        radius = mrt * _EARTH_RADIUS_KM
+        return (
+            radius * (xmx * sinsu + cnod * cossu),
+            radius * (xmy * sinsu + snod * cossu),
+            radius * sini * sinsu,
+        )
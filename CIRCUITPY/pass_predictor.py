@@ -0,0 +1,271 @@
+import time
+from math import pi, sin, cos, asin, acos, atan2, sqrt
+from collections import namedtuple
+
+# Predicts passes of the ISS over home from its orbital elements, so the
+# next one can be counted down to, and the close-by LEDs turned on and off
+# right when it starts and ends instead of whenever a refresh notices.
+#
+# A pass is while the ISS is at least min_elevation degrees above home's
+# horizon. The search steps through time coarsely, skipping ahead while
+# the ISS is too far away to possibly come into view before the next step
+# (its ground track moves no faster than the orbital rate plus the earth's),
+# and in fine steps once it's close. Each crossing of min_elevation is then
+# refined by bisection, and the highest point by ternary search, to a second.
+#
+# All times are unix seconds, kept as integers so single precision floats
+# only ever hold differences.
+
+#   rise_time, set_time: the first and last second the ISS is above min_elevation
+#   rise_azimuth, set_azimuth: degrees clockwise from north at those times
+#   max_time, max_elevation, max_azimuth: the highest point of the pass
+Pass = namedtuple("Pass", ["rise_time", "rise_azimuth", "max_time", "max_elevation", "max_azimuth",
+                           "set_time", "set_azimuth"])
+
+# Where the ISS is as seen from home: degrees above the horizon, degrees
+# clockwise from north, and straight line distance in km.
+LookAngles = namedtuple("LookAngles", ["elevation", "azimuth", "range"])
+
+_DEG_TO_RAD = pi / 180
+_RAD_TO_DEG = 180 / pi
+
+# WGS-84 ellipsoid, as in orbit.py.
+_WGS84_RADIUS_KM = 6378.137
+_WGS84_E2 = 0.00669437999014
+
+_MEAN_EARTH_RADIUS_KM = 6371.0
+
+# The ISS's typical altitude, close enough to turn a distance into an elevation.
+ISS_ALTITUDE_KM = 420
+
+# The earth's rotation rate relative to the stars, in rad/s.
+_EARTH_RATE = 2 * pi / 86164.1
+
+# Seconds between samples near home; shorter passes than this can be missed.
+FINE_STEP = 20
+
+# Longest step while the ISS is far from home.
+MAX_STEP = 20 * 60
+
+# Elevation in degrees of something altitude_km up, distance_km away from
+# home along the ground. E.g. the ISS being within the close-by distance is
+# the same as it being above the elevation for that distance.
+def elevation_at_distance(distance_km, altitude_km=ISS_ALTITUDE_KM):
+    angle = distance_km / _MEAN_EARTH_RADIUS_KM
+    ratio = _MEAN_EARTH_RADIUS_KM / (_MEAN_EARTH_RADIUS_KM + altitude_km)
+    return atan2(cos(angle) - ratio, sin(angle)) * _RAD_TO_DEG
+
+class PassPredictor:
+    # count passes are kept predicted, searching up to horizon seconds ahead.
+    def __init__(self, latitude, longitude, min_elevation=10, count=3, horizon=24 * 60 * 60):
+        lat = latitude * _DEG_TO_RAD
+        lon = longitude * _DEG_TO_RAD
+        self._sin_lat = sin(lat)
+        self._cos_lat = cos(lat)
+        self._sin_lon = sin(lon)
+        self._cos_lon = cos(lon)
+
+        # Home in earth-fixed coordinates, on the ellipsoid.
+        n = _WGS84_RADIUS_KM / sqrt(1 - _WGS84_E2 * self._sin_lat * self._sin_lat)
+        self._home = (n * self._cos_lat * self._cos_lon, n * self._cos_lat * self._sin_lon, n * (1 - _WGS84_E2) * self._sin_lat)
+        self._home_radius = sqrt(self._home[0] ** 2 + self._home[1] ** 2 + self._home[2] ** 2)
+
+        self._min_elevation = min_elevation
+        self._cos_min_elevation = cos(min_elevation * _DEG_TO_RAD)
+        self._count = count
+        self._horizon = horizon
+
+        self._orbit = None
+        self._passes = []
+        self._searched_to = 0
+
+        self._searches = 0
+        self._evaluations = 0
+        self._search_ns = 0
+
+    @property
+    def min_elevation(self):
+        return self._min_elevation
+
+    # Predicted passes that haven't ended as of the last update(), soonest first.
+    @property
+    def passes(self):
+        return self._passes
+
+    # The pass that's on or next as of now, or None if none was found.
+    def next_pass(self, now):
+        for next_pass in self._passes:
+            if next_pass.set_time >= now:
+                return next_pass
+
+        return None
+
+    def look_angles(self, orbit, unix_time):
+        return self._look_angles(orbit.earth_fixed(unix_time))
+
+    def _look_angles(self, position):
+        rx = position[0] - self._home[0]
+        ry = position[1] - self._home[1]
+        rz = position[2] - self._home[2]
+        distance = sqrt(rx * rx + ry * ry + rz * rz)
+
+        # Topocentric south, east, up.
+        horizontal = self._cos_lon * rx + self._sin_lon * ry
+        south = self._sin_lat * horizontal - self._cos_lat * rz
+        east = self._cos_lon * ry - self._sin_lon * rx
+        up = self._cos_lat * horizontal + self._sin_lat * rz
+
+        elevation = asin(max(-1.0, min(1.0, up / distance))) * _RAD_TO_DEG
+        azimuth = (atan2(east, -south) * _RAD_TO_DEG + 360) % 360
+
+        return LookAngles(elevation, azimuth, distance)
+
+    # Elevation at t, and a lower bound on the seconds until it could reach
+    # min_elevation, from the angle between home and the ISS at the earth's
+    # center and the widest that angle can be for the ISS to be in view.
+    def _sample(self, orbit, t):
+        self._evaluations += 1
+        position = orbit.earth_fixed(t)
+        elevation = self._look_angles(position).elevation
+
+        radius = sqrt(position[0] ** 2 + position[1] ** 2 + position[2] ** 2)
+        dot = position[0] * self._home[0] + position[1] * self._home[1] + position[2] * self._home[2]
+        angle = acos(max(-1.0, min(1.0, dot / (radius * self._home_radius))))
+
+        max_angle = acos(self._home_radius / radius * self._cos_min_elevation) - self._min_elevation * _DEG_TO_RAD
+
+        # The ISS's mean angular rate around the earth, with a little to spare
+        # since the orbit isn't quite circular, plus the earth's own.
+        rate = 1.01 * 2 * pi / orbit.period + _EARTH_RATE
+        return elevation, (angle - max_angle) / rate
+
+    def _elevation(self, orbit, t):
+        self._evaluations += 1
+        return self._look_angles(orbit.earth_fixed(t)).elevation
+
+    # The second at which elevation crosses min_elevation between below and
+    # above, which are one sample either side of it.
+    def _crossing(self, orbit, below, above):
+        while abs(above - below) > 1:
+            middle = (below + above) // 2
+
+            if self._elevation(orbit, middle) >= self._min_elevation:
+                above = middle
+            else:
+                below = middle
+
+        return above
+
+    # The second of the highest elevation between start and end.
+    def _culmination(self, orbit, start, end):
+        while end - start > 2:
+            third = (end - start) // 3
+
+            if self._elevation(orbit, start + third) < self._elevation(orbit, end - third):
+                start += third
+            else:
+                end -= third
+
+        return max(range(start, end + 1), key=lambda t: self._elevation(orbit, t))
+
+    def _make_pass(self, orbit, rise_time, max_sample, set_time):
+        max_time = self._culmination(orbit, max(max_sample - FINE_STEP, rise_time), min(max_sample + FINE_STEP, set_time))
+        rise = self.look_angles(orbit, rise_time)
+        highest = self.look_angles(orbit, max_time)
+        setting = self.look_angles(orbit, set_time)
+
+        return Pass(
+            rise_time=rise_time,
+            rise_azimuth=rise.azimuth,
+            max_time=max_time,
+            max_elevation=highest.elevation,
+            max_azimuth=highest.azimuth,
+            set_time=set_time,
+            set_azimuth=setting.azimuth
+        )
+
+    # Returns up to count passes that end after start and begin before end,
+    # and the time the search got to.
+    def search(self, orbit, start, end, count):
+        passes = []
+        t = start
+        elevation, _ = self._sample(orbit, t)
+        rise_time = None
+
+        # Already in a pass, so find where it began.
+        if elevation >= self._min_elevation:
+            before = t
+
+            while self._elevation(orbit, before) >= self._min_elevation:
+                before -= FINE_STEP
+
+            rise_time = self._crossing(orbit, before, t)
+            max_sample = t
+            max_elevation = elevation
+
+        # Last time the ISS was sampled below min_elevation. Steps are never
+        # longer than the wait, so it can't have risen and set in between.
+        previous = t
+
+        while len(passes) < count:
+            if rise_time is None:
+                if t >= end:
+                    break
+
+                elevation, wait = self._sample(orbit, t)
+
+                if elevation >= self._min_elevation:
+                    rise_time = self._crossing(orbit, previous, t)
+                    max_sample = t
+                    max_elevation = elevation
+                    t += FINE_STEP
+                else:
+                    previous = t
+                    t += min(max(int(wait), FINE_STEP), MAX_STEP)
+            else:
+                elevation = self._elevation(orbit, t)
+
+                if elevation >= self._min_elevation:
+                    if elevation > max_elevation:
+                        max_sample = t
+                        max_elevation = elevation
+
+                    t += FINE_STEP
+                else:
+                    set_time = self._crossing(orbit, t, t - FINE_STEP)
+                    passes.append(self._make_pass(orbit, rise_time, max_sample, set_time))
+                    rise_time = None
+                    previous = t
+
+        return passes, t
+
+    # Keeps count passes predicted from orbit as of now. Predictions start
+    # over when the orbit changes; otherwise, finished passes are dropped and
+    # more searched for, but only once the last search's end gets within half
+    # the horizon, so a quiet stretch isn't searched again on every update.
+    def update(self, orbit, now):
+        if orbit is not self._orbit:
+            self._orbit = orbit
+            self._passes = []
+            self._searched_to = now
+
+        if orbit is None:
+            return
+
+        while self._passes and self._passes[0].set_time < now:
+            self._passes.pop(0)
+
+        if len(self._passes) >= self._count or self._searched_to - now > self._horizon // 2:
+            return
+
+        start_ns = time.monotonic_ns()
+        found, self._searched_to = self.search(orbit, max(self._searched_to, now), now + self._horizon,
+                                               self._count - len(self._passes))
+        self._passes.extend(found)
+        self._searches += 1
+        self._search_ns += time.monotonic_ns() - start_ns
+
+    def stats_text(self):
+        mean_ms = 0 if self._searches == 0 else self._search_ns / self._searches / 1_000_000
+        return (f"{len(self._passes)} predicted, {self._searches} searches, "
+                f"{self._evaluations} positions, {mean_ms:.0f} ms each")
@@ -0,0 +1,159 @@
+from orbit import Orbit, split_tle
+from ground_track import GroundTrack
+from haversine import haversine
+
+SOURCE_PROPAGATED = "propagated"
+SOURCE_OPEN_NOTIFY = "open-notify"
+SOURCE_ESTIMATED = "estimated"
+
+# Orbital elements older (or newer) than this are too inaccurate to use.
+MAX_ORBIT_AGE = 7 * 24 * 60 * 60
+
+# How long to wait before trying again after failing to download orbital elements.
+TLE_RETRY_INTERVAL = 10 * 60
+
+# Provides the ISS position for each refresh, either by downloading it from
+# Open Notify every time, or by propagating the ISS's orbit locally and only
+# checking in with Open Notify occasionally. If no usable orbit is available,
+# falls back to Open Notify.
+# Open Notify is only asked every fetch_interval; in between, and when a
+# request fails, the position is estimated from the ground track of the
+# last few fixes.
+# All times are unix seconds; intervals are in seconds, tolerance in km.
+class PositionSource:
+    def __init__(self, network, mode=SOURCE_PROPAGATED, tle_refresh_interval=6 * 60 * 60,
+                 correction_interval=30 * 60, correction_tolerance=100, fetch_interval=0):
+        self._network = network
+        self._mode = mode
+        self._fetch_interval = fetch_interval
+        self._tle_refresh_interval = tle_refresh_interval
+        self._correction_interval = correction_interval
+        self._correction_tolerance = correction_tolerance
+
+        self._orbit = None
+        self._tle_fetch_time = None
+        self._tle_attempt_time = None
+        self._correction_time = None
+
+        self._ground_track = GroundTrack()
+        self._fetch_time = None
+
+        self._last_source = None
+        self._network_succeeded = None
+
+    @property
+    def orbit(self):
+        return self._orbit
+
+    # The orbit, if it's recent enough to use at now, otherwise None.
+    def usable_orbit(self, now):
+        return self._orbit if self._orbit_usable(now) else None
+
+    # Where the last returned position came from.
+    @property
+    def last_source(self):
+        return self._last_source
+
+    # True/False if the last call to position() made a network request that
+    # succeeded/failed, None if it didn't need the network.
+    @property
+    def network_succeeded(self):
+        return self._network_succeeded
+
+    # Returns (lat, lon), or None if no position is available.
+    def position(self, now):
+        self._network_succeeded = None
+
+        if self._mode != SOURCE_PROPAGATED:
+            return self._fetch_or_estimate(now)
+
+        self._refresh_orbit(now)
+
+        if not self._orbit_usable(now):
+            print("No usable orbit, falling back to Open Notify")
+            return self._fetch_or_estimate(now)
+
+        if self._correction_time is None or now - self._correction_time >= self._correction_interval:
+            return self._correct(now)
+
+        return self._propagate(now)
+
+    def _orbit_usable(self, now):
+        return self._orbit is not None and abs(self._orbit.age(now)) <= MAX_ORBIT_AGE
+
+    def _refresh_orbit(self, now):
+        if self._tle_fetch_time is not None and now - self._tle_fetch_time < self._tle_refresh_interval:
+            return
+
+        if self._tle_attempt_time is not None and now - self._tle_attempt_time < TLE_RETRY_INTERVAL:
+            return
+
+        print("Fetching ISS orbital elements")
+        self._tle_attempt_time = now
+        text = self._network.fetch_tle()
+        self._network_succeeded = text is not None
+
+        if text is None:
+            return
+
+        try:
+            self._orbit = Orbit(*split_tle(text))
+            self._tle_fetch_time = now
+            print(f"    TLE epoch age: {self._orbit.age(now) // 60} minutes")
+        except ValueError as err:
+            print(f"Invalid ISS orbital elements, error: {err}")
+
+    def _propagate(self, now):
+        position = self._orbit.position(now)
+        self._last_source = SOURCE_PROPAGATED
+        return (position.latitude, position.longitude)
+
+    def _fetch(self, now):
+        coordinate = self._network.fetch_iss_coordinate()
+        self._network_succeeded = coordinate is not None
+
+        if coordinate is not None:
+            self._last_source = SOURCE_OPEN_NOTIFY
+            self._fetch_time = now
+            self._ground_track.add_fix(now, coordinate[0], coordinate[1])
+
+        return coordinate
+
+    def _estimate(self, now):
+        self._last_source = SOURCE_ESTIMATED
+        return self._ground_track.estimate(now)
+
+    # Ask Open Notify if it's been fetch_interval since the last fix, or the
+    # fixes so far can't be estimated from.
+    def _fetch_or_estimate(self, now):
+        can_estimate = self._ground_track.can_estimate(now)
+
+        if can_estimate and now - self._fetch_time < self._fetch_interval:
+            return self._estimate(now)
+
+        coordinate = self._fetch(now)
+
+        if coordinate is None and can_estimate:
+            return self._estimate(now)
+
+        return coordinate
+
+    # Check the propagated position against Open Notify. If they've drifted
+    # too far apart, the orbital elements are refreshed on the next call.
+    def _correct(self, now):
+        coordinate = self._fetch(now)
+
+        if coordinate is None:
+            return self._propagate(now)
+
+        self._correction_time = now
+        propagated = self._orbit.position(now)
+        error = haversine(coordinate[0], coordinate[1], propagated.latitude, propagated.longitude, use_miles=False)
+        print(f"    Propagated position error: {error:.1f} km")
+
+        if error > self._correction_tolerance:
+            print("    Error exceeds tolerance, orbital elements will be refreshed")
+            self._tle_fetch_time = None
+            self._tle_attempt_time = None
+
+        return coordinate
@@ -0,0 +1,306 @@
+from array import array
+from math import ceil, cos, sqrt, radians
+import time
+import displayio
+import bitmaptools
+
+from ground_track import ISS_PERIOD
+from haversine import haversine
+
+# Seconds between predicted positions. The ISS covers about two map pixels
+# in this time, so the dots between them are placed along straight lines.
+STEP = 60
+
+# The track is never shifted by more than this to meet a fix, in seconds.
+MAX_SHIFT = 15 * 60
+
+def _wrap(lon):
+    if lon > 180:
+        return lon - 360
+
+    if lon < -180:
+        return lon + 360
+
+    return lon
+
+# Where the ISS will go over the next `orbits` orbits, drawn on the map as a
+# dotted line from its current position.
+#
+# Positions are computed from the orbit in a batch, covering an orbit more
+# than is shown, and turned into dots spaced evenly along the line. Each
+# update only erases the dots the ISS has passed and draws the ones coming
+# into the shown window, so the batch is only computed again about once an
+# orbit, when the orbit changes, or when a fix is further than tolerance km
+# from where the batch says the ISS should be. Then the track is also
+# shifted in time to go through the fix, since orbital elements mostly go
+# wrong along the track, by the ISS being early or late.
+#
+# As with TrailLayer, the dots are drawn into one 1-bit bitmap the size of
+# the map, and kept in fixed-size arrays. to_map turns (lat, lon) into map
+# pixels.
+class PredictedTrack:
+    def __init__(self, width, height, to_map, orbits=1.5, tolerance=100, spacing=4, dot_size=2, capacity=256):
+        self._width = width
+        self._height = height
+        self._to_map = to_map
+        self._orbits = orbits
+        self._tolerance = tolerance
+        self._spacing = spacing
+        self._dot_size = dot_size
+        self._capacity = capacity
+
+        self._bitmap = displayio.Bitmap(width, height, 2)
+        palette = displayio.Palette(2)
+        palette[1] = 0x000000
+        palette.make_transparent(0)
+        self._tile_grid = displayio.TileGrid(self._bitmap, pixel_shader=palette)
+
+        # Predicted positions every STEP seconds from _start, with room for
+        # a little longer period than the ISS's.
+        samples = ceil((orbits + 1) * ISS_PERIOD * 1.1 / STEP) + 1
+        self._lat = array("f", [0] * samples)
+        self._lon = array("f", [0] * samples)
+        self._samples = 0
+
+        # Dots in time order, with their times in seconds from _start. Those
+        # from _first up to _last are drawn.
+        self._x = array("h", [0] * capacity)
+        self._y = array("h", [0] * capacity)
+        self._t = array("l", [0] * capacity)
+        self._dots = 0
+        self._first = 0
+        self._last = 0
+
+        self._orbit = None
+        self._start = 0
+        self._end = 0
+        self._horizon = 0
+
+        # Seconds the track is shifted from the orbit by, to meet the fixes.
+        self._offset = 0
+
+        self._batches = 0
+        self._corrections = 0
+        self._batch_ns = 0
+
+    @property
+    def tile_grid(self):
+        return self._tile_grid
+
+    # Seconds the track is shifted from the orbit by.
+    @property
+    def offset(self):
+        return self._offset
+
+    # Times the positions have been computed.
+    @property
+    def batches(self):
+        return self._batches
+
+    # Update the track for the time now (unix seconds), and optionally a fix
+    # of the ISS's position as (lat, lon) at that time. If orbit is None, the
+    # track is cleared. Returns True if the bitmap changed.
+    def update(self, orbit, now, fix=None):
+        if orbit is None:
+            if self._orbit is None:
+                return False
+
+            self._orbit = None
+            self.clear()
+            return True
+
+        if orbit is not self._orbit:
+            self._orbit = orbit
+            self._offset = 0
+            self._predict(now)
+            return True
+
+        if fix is not None:
+            deviation = self._deviation(now, fix)
+
+            if deviation is not None and deviation > self._tolerance:
+                shift = self._along_track_shift(now, fix)
+
+                # Further off than that, the orbital elements are wrong, and
+                # new ones will replace the orbit.
+                if abs(self._offset + shift) <= MAX_SHIFT:
+                    self._offset += shift
+                    self._corrections += 1
+                    print(f"    Predicted track off by {deviation:.0f} km, shifting it {shift} s")
+                    self._predict(now)
+                    return True
+
+        if now + self._horizon > self._end:
+            self._predict(now)
+            return True
+
+        return self._advance(now)
+
+    def clear(self):
+        self._bitmap.fill(0)
+        self._samples = 0
+        self._dots = 0
+        self._first = 0
+        self._last = 0
+
+    # Predicted (lat, lon) at unix time t, or None if it's outside the batch.
+    def predicted(self, t):
+        index, fraction = divmod(t - self._start, STEP)
+
+        if index < 0 or index + 1 >= self._samples:
+            return None
+
+        fraction /= STEP
+        lat = self._lat[index] + (self._lat[index + 1] - self._lat[index]) * fraction
+        lon = self._lon[index] + _wrap(self._lon[index + 1] - self._lon[index]) * fraction
+        return (lat, _wrap(lon))
+
+    def _deviation(self, now, fix):
+        predicted = self.predicted(now)
+
+        if predicted is None:
+            return None
+
+        return haversine(predicted[0], predicted[1], fix[0], fix[1], use_miles=False)
+
+    # Seconds the ISS is ahead of the track at now, from how far the fix is
+    # along the track's direction there.
+    def _along_track_shift(self, now, fix):
+        here = self.predicted(now)
+        ahead = self.predicted(now + STEP)
+
+        if here is None or ahead is None:
+            return 0
+
+        scale = cos(radians(here[0]))
+        v_lat = ahead[0] - here[0]
+        v_lon = _wrap(ahead[1] - here[1]) * scale
+        d_lat = fix[0] - here[0]
+        d_lon = _wrap(fix[1] - here[1]) * scale
+        speed = v_lat * v_lat + v_lon * v_lon
+
+        if speed == 0:
+            return 0
+
+        return round(STEP * (d_lat * v_lat + d_lon * v_lon) / speed)
+
+    # Compute a new batch from now, and draw what's in the shown window.
+    def _predict(self, now):
+        start_ns = time.monotonic_ns()
+        orbit = self._orbit
+        period = orbit.period
+        self._horizon = int(self._orbits * period)
+
+        self._start = now
+        self._samples = min(ceil((self._orbits + 1) * period / STEP) + 1, len(self._lat))
+
+        for i in range(self._samples):
+            position = orbit.position(now + self._offset + i * STEP)
+            self._lat[i] = position.latitude
+            self._lon[i] = position.longitude
+
+        self._make_dots()
+
+        # If the dots ran out of room, the batch ends at the last one.
+        self._end = now + (self._samples - 1) * STEP
+
+        if self._dots == self._capacity:
+            self._end = now + self._t[self._dots - 1]
+
+        self._bitmap.fill(0)
+        self._first = 0
+        self._last = 0
+        self._advance(now)
+
+        self._batches += 1
+        self._batch_ns += time.monotonic_ns() - start_ns
+
+    # Place dots every _spacing pixels along the straight lines between the
+    # predicted positions. Where the track leaves one side of the map and
+    # comes back on the other, the spacing starts over.
+    def _make_dots(self):
+        self._dots = 0
+        x0, y0 = self._to_map(self._lat[0], self._lon[0])
+        to_next = 0
+
+        for i in range(1, self._samples):
+            x1, y1 = self._to_map(self._lat[i], self._lon[i])
+            dx = x1 - x0
+            dy = y1 - y0
+
+            if abs(dx) > self._width // 2:
+                to_next = 0
+            else:
+                length = sqrt(dx * dx + dy * dy)
+                along = to_next
+
+                while along < length:
+                    if self._dots == self._capacity:
+                        return
+
+                    fraction = along / length
+                    self._x[self._dots] = x0 + round(dx * fraction)
+                    self._y[self._dots] = y0 + round(dy * fraction)
+                    self._t[self._dots] = round((i - 1 + fraction) * STEP)
+                    self._dots += 1
+                    along += self._spacing
+
+                to_next = along - length
+
+            x0 = x1
+            y0 = y1
+
+    # Erase the dots the ISS has passed, and draw the ones now within the
+    # shown window. Returns True if the bitmap changed.
+    def _advance(self, now):
+        elapsed = now - self._start
+        changed = False
+
+        while self._first < self._last and self._t[self._first] < elapsed:
+            i = self._first
+            self._first += 1
+            self._erase(i)
+            changed = True
+
+        # Dots that passed before they were ever drawn.
+        while self._first < self._dots and self._first == self._last and self._t[self._first] < elapsed:
+            self._first += 1
+            self._last += 1
+
+        while self._last < self._dots and self._t[self._last] <= elapsed + self._horizon:
+            self._draw(self._last)
+            self._last += 1
+            changed = True
+
+        return changed
+
+    def _draw(self, i):
+        self._fill(self._x[i], self._y[i], 1)
+
+    # Fill a dot's square around (x, y), clipped to the map (lon 180 is just
+    # off its right edge).
+    def _fill(self, x, y, value):
+        x1 = max(x - self._dot_size // 2, 0)
+        y1 = max(y - self._dot_size // 2, 0)
+        x2 = min(x1 + self._dot_size, self._width)
+        y2 = min(y1 + self._dot_size, self._height)
+
+        if x1 < x2 and y1 < y2:
+            bitmaptools.fill_region(self._bitmap, x1, y1, x2, y2, value)
+
+    # Clear a dot, then draw back any drawn dots that overlapped it (e.g.
+    # where the next orbit crosses this one).
+    def _erase(self, i):
+        x = self._x[i]
+        y = self._y[i]
+        size = self._dot_size
+        self._fill(x, y, 0)
+
+        for j in range(self._first, self._last):
+            if abs(self._x[j] - x) < size and abs(self._y[j] - y) < size:
+                self._draw(j)
+
+    def stats_text(self):
+        mean_ms = 0 if self._batches == 0 else self._batch_ns / self._batches / 1_000_000
+        return (f"{self._last - self._first} dots shown, {self._batches} batches ({mean_ms:.0f} ms each), "
+                f"{self._corrections} corrections, shifted {self._offset} s")
@@ -1,3 +1,5 @@
+from array import array
+from collections import namedtuple
 from fonts import contains_glyph
 
 # Take advantage of the MagTag/ESP32-S2's massive 2MB PSRAM to provide a 
@@ -5,395 +7,370 @@ from fonts import contains_glyph
 # Fair warning: I used ChatGPT to help generate this map, and I have not double-checked 
 # every single mapping. I am 0% vouching for its accuracy, and if you use it, you do so 
 # at your own risk. Corrections by speakers of any of the included languages are welcome.
-_unicode_to_ascii_map = {
-    # Latin characters with acute, grave, circumflex, tilde, umlaut, and other common accents
-    0x00C0: 'A',  # À
-    0x00C1: 'A',  # Á
-    0x00C2: 'A',  # Â
-    0x00C3: 'A',  # Ã
-    0x00C4: 'A',  # Ä
-    0x00C5: 'A',  # Å
-    0x00C6: 'AE', # Æ
-    0x00C7: 'C',  # Ç
-    0x00C8: 'E',  # È
-    0x00C9: 'E',  # É
-    0x00CA: 'E',  # Ê
-    0x00CB: 'E',  # Ë
-    0x00CC: 'I',  # Ì
-    0x00CD: 'I',  # Í
-    0x00CE: 'I',  # Î
-    0x00CF: 'I',  # Ï
-    0x00D1: 'N',  # Ñ
-    0x00D2: 'O',  # Ò
-    0x00D3: 'O',  # Ó
-    0x00D4: 'O',  # Ô
-    0x00D5: 'O',  # Õ
-    0x00D6: 'O',  # Ö
-    0x00D8: 'O',  # Ø
-    0x00D9: 'U',  # Ù
-    0x00DA: 'U',  # Ú
-    0x00DB: 'U',  # Û
-    0x00DC: 'U',  # Ü
-    0x00DD: 'Y',  # Ý
-    0x0152: 'OE', # Œ
-    0x00DF: 'ss', # ß
-    0x00E0: 'a',  # à
-    0x00E1: 'a',  # á
-    0x00E2: 'a',  # â
-    0x00E3: 'a',  # ã
-    0x00E4: 'a',  # ä
-    0x00E5: 'a',  # å
-    0x00E6: 'ae', # æ
-    0x00E7: 'c',  # ç
-    0x00E8: 'e',  # è
-    0x00E9: 'e',  # é
-    0x00EA: 'e',  # ê
-    0x00EB: 'e',  # ë
-    0x00EC: 'i',  # ì
-    0x00ED: 'i',  # í
-    0x00EE: 'i',  # î
-    0x00EF: 'i',  # ï
-    0x00F1: 'n',  # ñ
-    0x00F2: 'o',  # ò
-    0x00F3: 'o',  # ó
-    0x00F4: 'o',  # ô
-    0x00F5: 'o',  # õ
-    0x00F6: 'o',  # ö
-    0x00F8: 'o',  # ø
-    0x00F9: 'u',  # ù
-    0x00FA: 'u',  # ú
-    0x00FB: 'u',  # û
-    0x00FC: 'u',  # ü
-    0x00FD: 'y',  # ý
-    0x00FF: 'y',  # ÿ
+#
+# Each entry is a character followed by its substitute and a space, sorted by
+# code point. The literals are joined into one string when the module is
+# compiled, and split into arrays below, so there's no dict of boxed ints.
+_SUBSTITUTIONS = (
+    # Latin-1 Supplement
+    "\u00C0A "      # À
+    "\u00C1A "      # Á
+    "\u00C2A "      # Â
+    "\u00C3A "      # Ã
+    "\u00C4A "      # Ä
+    "\u00C5A "      # Å
+    "\u00C6AE "     # Æ
+    "\u00C7C "      # Ç
+    "\u00C8E "      # È
+    "\u00C9E "      # É
+    "\u00CAE "      # Ê
+    "\u00CBE "      # Ë
+    "\u00CCI "      # Ì
+    "\u00CDI "      # Í
+    "\u00CEI "      # Î
+    "\u00CFI "      # Ï
+    "\u00D1N "      # Ñ
+    "\u00D2O "      # Ò
+    "\u00D3O "      # Ó
+    "\u00D4O "      # Ô
+    "\u00D5O "      # Õ
+    "\u00D6O "      # Ö
+    "\u00D8O "      # Ø
+    "\u00D9U "      # Ù
+    "\u00DAU "      # Ú
+    "\u00DBU "      # Û
+    "\u00DCU "      # Ü
+    "\u00DDY "      # Ý
+    "\u00DFss "     # ß
+    "\u00E0a "      # à
+    "\u00E1a "      # á
+    "\u00E2a "      # â
+    "\u00E3a "      # ã
+    "\u00E4a "      # ä
+    "\u00E5a "      # å
+    "\u00E6ae "     # æ
+    "\u00E7c "      # ç
+    "\u00E8e "      # è
+    "\u00E9e "      # é
+    "\u00EAe "      # ê
+    "\u00EBe "      # ë
+    "\u00ECi "      # ì
+    "\u00EDi "      # í
+    "\u00EEi "      # î
+    "\u00EFi "      # ï
+    "\u00F1n "      # ñ
+    "\u00F2o "      # ò
+    "\u00F3o "      # ó
+    "\u00F4o "      # ô
+    "\u00F5o "      # õ
+    "\u00F6o "      # ö
+    "\u00F8o "      # ø
+    "\u00F9u "      # ù
+    "\u00FAu "      # ú
+    "\u00FBu "      # û
+    "\u00FCu "      # ü
+    "\u00FDy "      # ý
+    "\u00FFy "      # ÿ
 
-    # Characters with macron, caron, and other diacritic marks
-    0x0100: 'A',  # Ā
-    0x0102: 'A',  # Ă
-    0x0104: 'A',  # Ą
-    0x0112: 'E',  # Ē
-    0x0114: 'E',  # Ĕ
-    0x0116: 'E',  # Ė
-    0x0118: 'E',  # Ę
-    0x011A: 'E',  # Ě
-    0x012A: 'I',  # Ī
-    0x012C: 'I',  # Ĭ
-    0x012E: 'I',  # Į
-    0x0130: 'I',  # İ
-    0x014C: 'O',  # Ō
-    0x014E: 'O',  # Ŏ
-    0x0150: 'O',  # Ő
-    0x016A: 'U',  # Ū
-    0x016C: 'U',  # Ŭ
-    0x016E: 'U',  # Ů
-    0x0170: 'U',  # Ű
-    0x0172: 'U',  # Ų
-    0x0176: 'Y',  # Ŷ
-    0x0179: 'Z',  # Ź
-    0x017B: 'Z',  # Ż
-    0x017D: 'Z',  # Ž
+    # Latin Extended-A
+    "\u0100A "      # Ā
+    "\u0102A "      # Ă
+    "\u0104A "      # Ą
+    "\u0107c "      # ć
+    "\u010CC "      # Č
+    "\u010ED "      # Ď
+    "\u0111d "      # đ
+    "\u0112E "      # Ē
+    "\u0113e "      # ē
+    "\u0114E "      # Ĕ
+    "\u0116E "      # Ė
+    "\u0118E "      # Ę
+    "\u011AE "      # Ě
+    "\u011Be "      # ě
+    "\u011EG "      # Ğ
+    "\u011Fg "      # ğ
+    "\u012AI "      # Ī
+    "\u012CI "      # Ĭ
+    "\u012EI "      # Į
+    "\u0130I "      # İ
+    "\u0131i "      # ı
+    "\u0136K "      # Ķ
+    "\u0137k "      # ķ
+    "\u0139L "      # Ĺ
+    "\u013Al "      # ĺ
+    "\u0141L "      # Ł
+    "\u0142l "      # ł
+    "\u014CO "      # Ō
+    "\u014Do "      # ō
+    "\u014EO "      # Ŏ
+    "\u0150O "      # Ő
+    "\u0151o "      # ő
+    "\u0152OE "     # Œ
+    "\u0158R "      # Ř
+    "\u0159r "      # ř
+    "\u015ES "      # Ş
+    "\u015Fs "      # ş
+    "\u0160S "      # Š
+    "\u0161s "      # š
+    "\u016AU "      # Ū
+    "\u016CU "      # Ŭ
+    "\u016EU "      # Ů
+    "\u0170U "      # Ű
+    "\u0171u "      # ű
+    "\u0172U "      # Ų
+    "\u0176Y "      # Ŷ
+    "\u0179Z "      # Ź
+    "\u017BZ "      # Ż
+    "\u017DZ "      # Ž
+    "\u017Ez "      # ž
 
-    # Ligatures used in various languages (common in French, German, Danish, etc.)
-    0x0152: 'OE', # Œ
-    0x00E6: 'ae', # æ
+    # Latin Extended-B
+    "\u0218S "      # Ș
+    "\u0219s "      # ș
+    "\u021AT "      # Ț
+    "\u021Bt "      # ț
 
-    # Characters used in Scandinavian languages (e.g., Danish, Norwegian, Swedish)
-    0x00C5: 'A',  # Å
-    0x00E5: 'a',  # å
-    0x00D8: 'O',  # Ø
-    0x00F8: 'o',  # ø
-    0x00C4: 'A',  # Ä
-    0x00E4: 'a',  # ä
-    0x00D6: 'O',  # Ö
-    0x00F6: 'o',  # ö
+    # Greek (closest Latin equivalents)
+    "\u03B1a "      # α
+    "\u03B2b "      # β
+    "\u03B3g "      # γ
+    "\u03B4d "      # δ
+    "\u03B5e "      # ε
+    "\u03B6z "      # ζ
+    "\u03B7h "      # η
+    "\u03B8th "     # θ
+    "\u03B9i "      # ι
+    "\u03BAk "      # κ
+    "\u03BBl "      # λ
+    "\u03BCm "      # μ
+    "\u03BDn "      # ν
+    "\u03BEx "      # ξ
 
-    # Characters used in Eastern European and Slavic languages (e.g., Czech, Slovak, Polish)
-    0x010C: 'C',  # Č
-    0x0107: 'c',  # č
-    0x010E: 'D',  # Ď
-    0x0111: 'd',  # ď
-    0x011A: 'E',  # Ė
-    0x011B: 'e',  # ė
-    0x0158: 'R',  # Ř
-    0x0159: 'r',  # ř
-    0x0160: 'S',  # Š
-    0x0161: 's',  # š
-    0x017D: 'Z',  # Ž
-    0x017E: 'z',  # ž
-    0x0141: 'L',  # Ł
-    0x0142: 'l',  # ł
+    # Cyrillic
+    "\u0401Yo "     # Ё
+    "\u0410A "      # А
+    "\u0411B "      # Б
+    "\u0412V "      # В
+    "\u0413G "      # Г
+    "\u0414D "      # Д
+    "\u0415E "      # Е
+    "\u0416Zh "     # Ж
+    "\u0417Z "      # З
+    "\u0418I "      # И
+    "\u0419J "      # Й
+    "\u041AK "      # К
+    "\u041BL "      # Л
+    "\u041CM "      # М
+    "\u041DN "      # Н
+    "\u041EO "      # О
+    "\u041FP "      # П
+    "\u0420R "      # Р
+    "\u0421S "      # С
+    "\u0422T "      # Т
+    "\u0423U "      # У
+    "\u0424F "      # Ф
+    "\u0425H "      # Х
+    "\u0426C "      # Ц
+    "\u0427Ch "     # Ч
+    "\u0428Sh "     # Ш
+    "\u0429Shch "   # Щ
+    "\u042BY "      # Ы
+    "\u042CE "      # Ь
+    "\u042EYu "     # Ю
+    "\u042FYa "     # Я
+    "\u0430a "      # а
+    "\u0431b "      # б
+    "\u0432v "      # в
+    "\u0433g "      # г
+    "\u0434d "      # д
+    "\u0435e "      # е
+    "\u0436zh "     # ж
+    "\u0437z "      # з
+    "\u0438i "      # и
+    "\u0439j "      # й
+    "\u043Ak "      # к
+    "\u043Bl "      # л
+    "\u043Cm "      # м
+    "\u043Dn "      # н
+    "\u043Eo "      # о
+    "\u043Fp "      # п
+    "\u0440r "      # р
+    "\u0441s "      # с
+    "\u0442t "      # т
+    "\u0443u "      # у
+    "\u0444f "      # ф
+    "\u0445h "      # х
+    "\u0446c "      # ц
+    "\u0447ch "     # ч
+    "\u0448sh "     # ш
+    "\u0449shch "   # щ
+    "\u044By "      # ы
+    "\u044Ce "      # ь
+    "\u044Eyu "     # ю
+    "\u044Fya "     # я
+    "\u0451yo "     # ё
+    "\u0454u "      # є
+    "\u0456i "      # і
+    "\u0457yi "     # ї
+    "\u0458j "      # ј
+    "\u045Al "      # њ
+    "\u045Cnj "     # ќ
+    "\u045Ets "     # ў
+    "\u0460s "      # Ѡ
+    "\u0462s "      # Ѣ
 
-    # Characters from the Baltic languages (e.g., Latvian, Lithuanian)
-    0x0112: 'E',  # Ē
-    0x0113: 'e',  # ē
-    0x0136: 'K',  # Ķ
-    0x0137: 'k',  # ķ
-    0x0139: 'L',  # Ĺ
-    0x013A: 'l',  # ĺ
-    0x014C: 'O',  # Ō
-    0x014D: 'o',  # ō
-
-    # Characters used in Romanian (e.g., Ș, Ț) and some other regional variations
-    0x0218: 'S',  # Ș
-    0x0219: 's',  # ș
-    0x021A: 'T',  # Ţ
-    0x021B: 't',  # ţ
-
-    # Characters used in Turkish (e.g., İ, ı, Ğ, Ş)
-    0x0130: 'I',  # İ
-    0x0131: 'i',  # ı
-    0x011E: 'G',  # Ğ
-    0x011F: 'g',  # ğ
-    0x015E: 'S',  # Ş
-    0x015F: 's',  # ş
+    # Hebrew
+    "\u05D0A "      # א
+    "\u05D1B "      # ב
+    "\u05D2G "      # ג
+    "\u05D3D "      # ד
+    "\u05D4H "      # ה
+    "\u05D5V "      # ו
+    "\u05D6Z "      # ז
+    "\u05D7Ch "     # ח
+    "\u05D8T "      # ט
+    "\u05D9Y "      # י
+    "\u05DAK "      # ך
+    "\u05DBL "      # כ
+    "\u05DCM "      # ל
+    "\u05DDN "      # ם
+    "\u05DES "      # מ
+    "\u05DFE "      # ן
+    "\u05E0P "      # נ
+    "\u05E1Ts "     # ס
+    "\u05E2Q "      # ע
+    "\u05E3R "      # ף
+    "\u05E4Sh "     # פ
+    "\u05E5T "      # ץ
 
-    # Iberian Peninsula (Spanish, Portuguese)
-    0x00D1: 'N',  # Ñ
-    0x00F1: 'n',  # ñ
-    0x00C7: 'C',  # Ç
-    0x00E7: 'c',  # ç
+    # Arabic and Farsi
+    "\u0621' "      # ء
+    "\u0622A "      # آ
+    "\u0623A "      # أ
+    "\u0624A "      # ؤ
+    "\u0625E "      # إ
+    "\u0626E "      # ئ
+    "\u0627A "      # ا
+    "\u0628b "      # ب
+    "\u0629t "      # ة
+    "\u062At "      # ت
+    "\u062Bth "     # ث
+    "\u062Cj "      # ج
+    "\u062Dh "      # ح
+    "\u062Ekh "     # خ
+    "\u062Fd "      # د
+    "\u0630dh "     # ذ
+    "\u0631r "      # ر
+    "\u0632z "      # ز
+    "\u0633s "      # س
+    "\u0634sh "     # ش
+    "\u0635s "      # ص
+    "\u0636sh "     # ض
+    "\u0637s "      # ط
+    "\u0638th "     # ظ
+    "\u0639a "      # ع
+    "\u063Agh "     # غ
+    "\u063Bf "      # ػ
+    "\u063Cq "      # ؼ
+    "\u063Dk "      # ؽ
+    "\u063El "      # ؾ
+    "\u063Fm "      # ؿ
+    "\u0640n "      # ـ
+    "\u0641f "      # ف
+    "\u0642q "      # ق
+    "\u0643k "      # ك
+    "\u0644l "      # ل
+    "\u0645m "      # م
+    "\u0646n "      # ن
+    "\u0647h "      # ه
+    "\u0648w "      # و
+    "\u0649y "      # ى
+    "\u064Ay "      # ي
+    "\u067Ep "      # پ
+    "\u0686ch "     # چ
+    "\u0698zh "     # ژ
+    "\u06A9k "      # ک
+    "\u06AFg "      # گ
+)
 
-    # Special characters for Eastern European languages (Hungarian, Ukrainian, etc.)
-    0x0150: 'O',  # Ő
-    0x0151: 'o',  # ő
-    0x0170: 'U',  # Ű
-    0x0171: 'u',  # ű
+# Split _SUBSTITUTIONS into the sorted code points, and one string of all
+# their substitutes with where each one starts (plus where the last ends).
+def _split_substitutions():
+    code_points = array("H")
+    offsets = array("H", [0])
+    substitutes = []
 
-    # Characters from French, Italian, and other Romance languages (é, è, ç)
-    0x00E9: 'e',  # é
-    0x00E8: 'e',  # è
-    0x00EA: 'e',  # ê
-    0x00EB: 'e',  # ë
-    0x00E7: 'c',  # ç
-    
-    # Miscellaneous European characters
-    0x011E: 'G',  # Ğ
-    0x011F: 'g',  # ğ
-    0x0130: 'I',  # İ
-    0x0131: 'i',  # ı
-    0x015E: 'S',  # Ş
-    0x015F: 's',  # ş
+    for entry in _SUBSTITUTIONS.split(" ")[:-1]:
+        code_points.append(ord(entry[0]))
+        substitutes.append(entry[1:])
+        offsets.append(offsets[-1] + len(entry) - 1)
 
-    # Greek letters (converted to closest Latin equivalent for display)
-    0x03B1: 'a',  # α
-    0x03B2: 'b',  # β
-    0x03B3: 'g',  # γ
-    0x03B4: 'd',  # δ
-    0x03B5: 'e',  # ε
-    0x03B6: 'z',  # ζ
-    0x03B7: 'h',  # η
-    0x03B8: 'th', # θ
-    0x03B9: 'i',  # ι
-    0x03BA: 'k',  # κ
-    0x03BB: 'l',  # λ
-    0x03BC: 'm',  # μ
-    0x03BD: 'n',  # ν
-    0x03BE: 'x',  #,
+    return code_points, offsets, "".join(substitutes)
 
-    # Uppercase Cyrillic
-    0x0410: "A",   # А -> A
-    0x0411: "B",   # Б -> B
-    0x0412: "V",   # В -> V
-    0x0413: "G",   # Г -> G
-    0x0414: "D",   # Д -> D
-    0x0415: "E",   # Е -> E
-    0x0401: "Yo",  # Ё -> Yo (or just E)
-    0x0416: "Zh",  # Ж -> Zh
-    0x0417: "Z",   # З -> Z
-    0x0418: "I",   # И -> I
-    0x0419: "J",   # Й -> J (or I)
-    0x041A: "K",   # К -> K
-    0x041B: "L",   # Л -> L
-    0x041C: "M",   # М -> M
-    0x041D: "N",   # Н -> N
-    0x041E: "O",   # О -> O
-    0x041F: "P",   # П -> P
-    0x0420: "R",   # Р -> R
-    0x0421: "S",   # С -> S
-    0x0422: "T",   # Т -> T
-    0x0423: "U",   # У -> U
-    0x0424: "F",   # Ф -> F
-    0x0425: "H",   # Х -> H
-    0x0426: "C",   # Ц -> C
-    0x0427: "Ch",  # Ч -> Ch
-    0x0428: "Sh",  # Ш -> Sh
-    0x0429: "Shch",# Щ -> Shch
-    0x042B: "Y",   # Ы -> Y
-    0x042C: "E",   # Э -> E
-    0x042E: "Yu",  # Ю -> Yu
-    0x042F: "Ya",  # Я -> Ya
+_substitute_code_points, _substitute_offsets, _substitutes = _split_substitutions()
+del _SUBSTITUTIONS
 
-    # Lowercase Cyrillic
-    0x0430: "a",   # а -> a
-    0x0431: "b",   # б -> b
-    0x0432: "v",   # в -> v
-    0x0433: "g",   # г -> g
-    0x0434: "d",   # д -> d
-    0x0435: "e",   # е -> e
-    0x0451: "yo",  # ё -> yo
-    0x0436: "zh",  # ж -> zh
-    0x0437: "z",   # з -> z
-    0x0438: "i",   # и -> i
-    0x0439: "j",   # й -> j (or i)
-    0x043A: "k",   # к -> k
-    0x043B: "l",   # л -> l
-    0x043C: "m",   # м -> m
-    0x043D: "n",   # н -> n
-    0x043E: "o",   # о -> o
-    0x043F: "p",   # п -> p
-    0x0440: "r",   # р -> r
-    0x0441: "s",   # с -> s
-    0x0442: "t",   # т -> t
-    0x0443: "u",   # у -> u
-    0x0444: "f",   # ф -> f
-    0x0445: "h",   # х -> h
-    0x0446: "c",   # ц -> c
-    0x0447: "ch",  # ч -> ch
-    0x0448: "sh",  # ш -> sh
-    0x0449: "shch",# щ -> shch
-    0x044B: "y",   # ы -> y
-    0x044C: "e",   # э -> e
-    0x044E: "yu",  # ю -> yu
-    0x044F: "ya",  # я -> ya
+# How faithfully transliterate() could print a string.
+EXACT = 0        # Every character is in the fonts.
+SUBSTITUTED = 1  # Some characters were replaced with ascii substitutes.
+LOSSY = 2        # Some characters had no substitute, and were replaced with the fallback.
 
-    # Special characters
-    0x0454: "u",   # є -> u
-    0x0456: "i",   # і -> i
-    0x0457: "yi",  # ї -> yi
-    0x0458: "j",   # ј -> j
-    0x045A: "l",   # љ -> l
-    0x045C: "nj",  # њ -> nj
-    0x045E: "ts",  # тс (non-standard)
-    0x0460: "s",   # ш -> s
-    0x0462: "s",   # шч
+Transliteration = namedtuple("Transliteration", ["text", "quality"])
 
-    # Arabic
-    0x0621: "'",   # ء -> '
-    0x0622: "A",   # آ -> A
-    0x0623: "A",   # أ -> A
-    0x0624: "A",   # إ -> A
-    0x0625: "E",   # ة -> E
-    0x0626: "E",   # ة -> E
-    0x0627: "A",   # ا -> A
-    0x0628: "b",   # ب -> b
-    0x0629: "t",   # ت -> t
-    0x062A: "t",   # ت -> t
-    0x062B: "th",  # ث -> th
-    0x062C: "j",   # ج -> j
-    0x062D: "h",   # ح -> h
-    0x062E: "kh",  # خ -> kh
-    0x062F: "d",   # د -> d
-    0x0630: "dh",  # ذ -> dh
-    0x0631: "r",   # ر -> r
-    0x0632: "z",   # ز -> z
-    0x0633: "s",   # س -> s
-    0x0634: "sh",  # ش -> sh
-    0x0635: "s",   # ص -> s
-    0x0636: "sh",  # ض -> sh
-    0x0637: "s",   # ط -> t
-    0x0638: "th",  # ظ -> th
-    0x0639: "a",   # ع -> a
-    0x063A: "gh",  # غ -> gh
-    0x063B: "f",   # ف -> f
-    0x063C: "q",   # ق -> q
-    0x063D: "k",   # ك -> k
-    0x063E: "l",   # ل -> l
-    0x063F: "m",   # م -> m
-    0x0640: "n",   # ن -> n
-    0x0641: "f",   # ف -> f
-    0x0642: "q",   # ق -> q
-    0x0643: "k",   # ك -> k
-    0x0644: "l",   # ل -> l
-    0x0645: "m",   # م -> m
-    0x0646: "n",   # ن -> n
-    0x0647: "h",   # ه -> h
-    0x0648: "w",   # و -> w
-    0x0649: "y",   # ى -> y
-    0x064A: "y",   # ي -> y    
+# Convert text into characters our fonts can print, in one pass: characters
+# in the fonts are kept, others are transliterated into ascii substitutes
+# where possible, and replaced with the fallback otherwise. Returns the
+# converted text (the original string if nothing changed) and its quality.
+def transliterate(text, fallback="?"):
+    if text is None:
+        return Transliteration("", LOSSY)
 
-    # Farsi
-    0x067E: "p",   # پ -> p
-    0x0686: "ch",  # چ -> ch
-    0x0698: "zh",  # ژ -> zh
-    0x06A9: "k",   # ک -> k
-    0x06AF: "g",   # گ -> g
+    quality = EXACT
 
-    # Hebrew
-    0x05D0: "A",   # א -> A
-    0x05D1: "B",   # ב -> B
-    0x05D2: "G",   # ג -> G
-    0x05D3: "D",   # ד -> D
-    0x05D4: "H",   # ה -> H
-    0x05D5: "V",   # ו -> V
-    0x05D6: "Z",   # ז -> Z
-    0x05D7: "Ch",  # ח -> Ch
-    0x05D8: "T",   # ט -> T
-    0x05D9: "Y",   # י -> Y
-    0x05DA: "K",   # כ -> K
-    0x05DB: "L",   # ל -> L
-    0x05DC: "M",   # מ -> M
-    0x05DD: "N",   # נ -> N
-    0x05DE: "S",   # ס -> S
-    0x05DF: "E",   # ע -> E
-    0x05E0: "P",   # פ -> P
-    0x05E1: "Ts",  # צ -> Ts
-    0x05E2: "Q",   # ק -> Q
-    0x05E3: "R",   # ר -> R
-    0x05E4: "Sh",  # ש -> Sh
-    0x05E5: "T",   # ת -> T    
-}
+    # Only built once a character needs replacing; joined once at the end.
+    pieces = None
 
-# Returns whether text can be printed without any "?" characters.
-# If substitute_ascii is True, ascii substitions are are allowed, where possible.
-def is_printable(text, substitute_ascii):
-    if text is None:
-        return False
+    for index, char in enumerate(text):
+        code_point = ord(char)
 
-    for char in text:
-        c = get_printable_character(char, substitute_ascii=substitute_ascii)
+        if contains_glyph(code_point):
+            if pieces is not None:
+                pieces.append(char)
+            continue
 
-        if c is None:
-            return False
+        if pieces is None:
+            pieces = [text[:index]]
 
-    return True
+        substitute = _substitute(code_point)
 
-# Convert non-printable characters into printable characters.
-# If substitute_ascii is True, an attempt will be made
-# to transliterate unrecognized characters into ASCII substitutes.
-# If no substitution can be found, unrecognized character will
-# be replaced with the fallback.
-def make_printable(text, substitute_ascii=True, fallback='?'):
-    if text is None:
-        return ""
+        if substitute is None:
+            pieces.append(fallback)
+            quality = LOSSY
+        else:
+            pieces.append(substitute)
+            quality = max(quality, SUBSTITUTED)
 
-    validated_string = ""
+    if pieces is None:
+        return Transliteration(text, quality)
 
-    for char in text:
-        printable = get_printable_character(char, substitute_ascii)
+    return Transliteration("".join(pieces), quality)
 
-        if printable is not None:
-            validated_string += printable
-        else:
-            validated_string += fallback
+# The ascii substitute for a code point, or None if there isn't one.
+def _substitute(code_point):
+    code_points = _substitute_code_points
+    low = 0
+    high = len(code_points) - 1
 
-    return validated_string
+    while low <= high:
+        middle = (low + high) // 2
+        value = code_points[middle]
 
-# Given a character, determine if it can be printed by our fonts.
-# If substitute_ascii is True, an attempt will be made
-# to transliterate unrecognized characters into ASCII substitutes.
-# If no printable character can be found, return None.
-# Otherwise, return the printable character.
-def get_printable_character(char, substitute_ascii):
-    code_point = ord(char)
+        if value == code_point:
+            return _substitutes[_substitute_offsets[middle]:_substitute_offsets[middle + 1]]
 
-    # First, check to see if the code point is supported by the font.
-    if contains_glyph(code_point):
-        return char
+        if value < code_point:
+            low = middle + 1
+        else:
+            high = middle - 1
 
-    # If not, and if specified, attempt to substitute the
-    # code points not in the font with "reduced" ascii equivalents.
-    if substitute_ascii and (code_point in _unicode_to_ascii_map):
-        return _unicode_to_ascii_map[code_point]
-    
-    # Give up and let the caller decide how to handle the character.
     return None
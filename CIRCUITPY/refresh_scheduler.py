@@ -0,0 +1,138 @@
+import time
+
+# Decides when the e-paper display actually gets refreshed.
+#
+# The UI marks the screen regions it changes, and asks for a refresh where
+# it used to refresh straight away. The scheduler only refreshes if
+# something was marked since the last refresh, and if the display isn't
+# ready yet (time_to_refresh > 0) it keeps the request for a later update()
+# instead of sleeping, so buttons stay responsive and changes made in the
+# meantime go out with the same refresh.
+#
+# The MagTag's panel can only refresh in full, which also clears any
+# ghosting, so the dirty box decides whether to refresh, not what to
+# refresh.
+class RefreshScheduler:
+    def __init__(self, display, refresh):
+        self._display = display
+        self._refresh = refresh
+
+        # Union of the changed regions, as [x1, y1, x2, y2], or None.
+        self._dirty = None
+        self._pending = False
+        self._deferred = False
+
+        self._requests = 0
+        self._refreshes = 0
+        self._deferrals = 0
+        self._blocked_ns = 0
+
+    # Note that the region (x, y, width, height) has changed.
+    def mark_dirty(self, region):
+        x, y, width, height = region
+
+        if width <= 0 or height <= 0:
+            return
+
+        if self._dirty is None:
+            self._dirty = [x, y, x + width, y + height]
+        else:
+            dirty = self._dirty
+            dirty[0] = min(dirty[0], x)
+            dirty[1] = min(dirty[1], y)
+            dirty[2] = max(dirty[2], x + width)
+            dirty[3] = max(dirty[3], y + height)
+
+    # Note that the whole screen has changed (e.g. rotated, or a new root group).
+    def invalidate(self):
+        self.mark_dirty((0, 0, self._display.width, self._display.height))
+
+    # The changed area since the last refresh, as (x, y, width, height), or None.
+    @property
+    def dirty_box(self):
+        if self._dirty is None:
+            return None
+
+        x1, y1, x2, y2 = self._dirty
+        return (x1, y1, x2 - x1, y2 - y1)
+
+    @property
+    def is_dirty(self):
+        return self._dirty is not None
+
+    # Ask for a refresh once the display is ready; update() does it.
+    def request(self):
+        self._requests += 1
+        self._pending = True
+
+    # True if update() would refresh now.
+    @property
+    def ready(self):
+        return self._pending and self._dirty is not None and self._display.time_to_refresh == 0
+
+    # Call regularly: refreshes if a request is waiting, something changed,
+    # and the display is ready. Returns True if it refreshed.
+    def update(self):
+        if not self._pending:
+            return False
+
+        if self._dirty is None:
+            # Nothing changed since the last refresh.
+            self._pending = False
+            self._deferred = False
+            return False
+
+        if self._display.time_to_refresh > 0:
+            # Counted once, however many updates it waits through.
+            if not self._deferred:
+                self._deferred = True
+                self._deferrals += 1
+
+            return False
+
+        self._do_refresh()
+        return True
+
+    # Refresh now if anything changed, sleeping until the display is ready
+    # if need be. For the startup screens, where there's nothing else to do.
+    def refresh_now(self):
+        self._requests += 1
+
+        if self._dirty is None:
+            return False
+
+        wait = self._display.time_to_refresh
+
+        if wait > 0:
+            start = time.monotonic_ns()
+            time.sleep(wait)
+            self._blocked_ns += time.monotonic_ns() - start
+
+        self._do_refresh()
+        return True
+
+    def _do_refresh(self):
+        self._refresh()
+        self._refreshes += 1
+        self._dirty = None
+        self._pending = False
+        self._deferred = False
+
+    @property
+    def refreshes(self):
+        return self._refreshes
+
+    # Requests that didn't need a refresh of their own: nothing had changed,
+    # or they went out with a later one.
+    @property
+    def refreshes_avoided(self):
+        return self._requests - self._refreshes - (1 if self._pending else 0)
+
+    # Total time in ms spent sleeping until the display was ready.
+    @property
+    def blocked_time(self):
+        return self._blocked_ns / 1_000_000
+
+    def stats_text(self):
+        return (f"{self._refreshes} refreshes, {self.refreshes_avoided} avoided, "
+                f"{self._deferrals} deferred, {self.blocked_time:.0f} ms blocked")
@@ -0,0 +1,191 @@
+import struct
+import time
+from binascii import crc32
+from collections import namedtuple
+
+# What's on the map, kept across reloads so it can be shown again right
+# away at startup instead of starting empty.
+#
+#   saved_at:   unix seconds when it was taken
+#   fix_time:   unix seconds of the last ISS position, or 0 if there was none
+#   coordinate: that position as (lat, lon), or None
+#   trail:      the trail's dots, oldest first, as (x, y, age in ms) at saved_at
+#   geodata:    the position's GeoData fields as a tuple, or None
+Snapshot = namedtuple("Snapshot", ["saved_at", "fix_time", "coordinate", "trail", "geodata"])
+
+# Binary format, little endian:
+#   header: "SNAP", version (B), reserved (B), payload length (H), CRC-32 of the payload (I)
+#   payload:
+#     saved_at (I), fix_time (I), lat (f), lon (f)
+#     trail dot count (H), then for each: x (h), y (h), age (I)
+#     geodata field count (B, 0 for none), then for each: UTF-8 length (B,
+#     255 for None) and the bytes
+_MAGIC = b"SNAP"
+_VERSION = 1
+_HEADER = "<4sBBHI"
+_HEADER_SIZE = struct.calcsize(_HEADER)
+_FIX = "<IIff"
+_FIX_SIZE = struct.calcsize(_FIX)
+_DOT = "<hhI"
+_DOT_SIZE = struct.calcsize(_DOT)
+
+_NONE_LENGTH = 255
+
+def encode(snapshot):
+    lat, lon = snapshot.coordinate if snapshot.coordinate is not None else (0, 0)
+    trail = snapshot.trail
+    geodata = snapshot.geodata or ()
+
+    size = _FIX_SIZE + 2 + len(trail) * _DOT_SIZE + 1
+    fields = []
+
+    for field in geodata:
+        if field is not None:
+            # Shorten by characters, so a multi-byte one isn't cut in half.
+            while len(field.encode("utf-8")) >= _NONE_LENGTH:
+                field = field[:-1]
+
+            field = field.encode("utf-8")
+
+        fields.append(field)
+        size += 1 + (0 if field is None else len(field))
+
+    payload = bytearray(size)
+    struct.pack_into(_FIX, payload, 0, snapshot.saved_at, snapshot.fix_time, lat, lon)
+    offset = _FIX_SIZE
+
+    struct.pack_into("<H", payload, offset, len(trail))
+    offset += 2
+
+    for x, y, age in trail:
+        struct.pack_into(_DOT, payload, offset, x, y, age)
+        offset += _DOT_SIZE
+
+    payload[offset] = len(fields)
+    offset += 1
+
+    for field in fields:
+        if field is None:
+            payload[offset] = _NONE_LENGTH
+            offset += 1
+        else:
+            payload[offset] = len(field)
+            payload[offset + 1:offset + 1 + len(field)] = field
+            offset += 1 + len(field)
+
+    return struct.pack(_HEADER, _MAGIC, _VERSION, 0, size, crc32(payload)) + payload
+
+# Returns the Snapshot in data, or None if there isn't a valid one.
+def decode(data):
+    if len(data) < _HEADER_SIZE:
+        return None
+
+    magic, version, _, size, checksum = struct.unpack_from(_HEADER, data, 0)
+
+    if magic != _MAGIC or version != _VERSION or len(data) < _HEADER_SIZE + size:
+        return None
+
+    payload = memoryview(data)[_HEADER_SIZE:_HEADER_SIZE + size]
+
+    if crc32(payload) != checksum:
+        return None
+
+    saved_at, fix_time, lat, lon = struct.unpack_from(_FIX, payload, 0)
+    offset = _FIX_SIZE
+
+    count = struct.unpack_from("<H", payload, offset)[0]
+    offset += 2
+    trail = []
+
+    for _ in range(count):
+        trail.append(struct.unpack_from(_DOT, payload, offset))
+        offset += _DOT_SIZE
+
+    count = payload[offset]
+    offset += 1
+    fields = []
+
+    for _ in range(count):
+        length = payload[offset]
+        offset += 1
+
+        if length == _NONE_LENGTH:
+            fields.append(None)
+        else:
+            fields.append(str(bytes(payload[offset:offset + length]), "utf-8"))
+            offset += length
+
+    return Snapshot(
+        saved_at=saved_at,
+        fix_time=fix_time,
+        coordinate=(lat, lon) if fix_time != 0 else None,
+        trail=trail,
+        geodata=tuple(fields) if fields else None
+    )
+
+# Loads and saves snapshots, either in microcontroller.nvm (location "nvm"),
+# which keeps them across reloads and power cycles without boot.py having
+# to make the drive writable, or in a file (location is its path).
+# Flash wears out, so save on a schedule, not every refresh.
+class SnapshotStore:
+    def __init__(self, location):
+        self._location = location
+        self._saves = 0
+        self._save_ns = 0
+        self._size = 0
+
+    def load(self):
+        try:
+            if self._location == "nvm":
+                import microcontroller
+                nvm = microcontroller.nvm
+                header = nvm[0:_HEADER_SIZE]
+
+                if header[0:4] != _MAGIC:
+                    return None
+
+                size = struct.unpack_from(_HEADER, header, 0)[3]
+                data = nvm[0:min(_HEADER_SIZE + size, len(nvm))]
+            else:
+                with open(self._location, "rb") as f:
+                    data = f.read()
+        except (OSError, ImportError) as err:
+            print(f"No snapshot loaded: {err}")
+            return None
+
+        snapshot = decode(data)
+
+        if snapshot is None:
+            print("No valid snapshot found")
+
+        return snapshot
+
+    def save(self, snapshot):
+        start = time.monotonic_ns()
+        data = encode(snapshot)
+
+        try:
+            if self._location == "nvm":
+                import microcontroller
+                nvm = microcontroller.nvm
+
+                if len(data) > len(nvm):
+                    print(f"Snapshot is {len(data)} bytes, too big for {len(nvm)} bytes of NVM")
+                    return False
+
+                nvm[0:len(data)] = data
+            else:
+                with open(self._location, "wb") as f:
+                    f.write(data)
+        except (OSError, ImportError) as err:
+            print(f"Unable to save snapshot, error: {err}")
+            return False
+
+        self._saves += 1
+        self._save_ns += time.monotonic_ns() - start
+        self._size = len(data)
+        return True
+
+    def stats_text(self):
+        mean_ms = 0 if self._saves == 0 else self._save_ns / self._saves / 1_000_000
+        return f"{self._saves} saved to {self._location}, {self._size} bytes, {mean_ms:.1f} ms each"
@@ -0,0 +1,129 @@
+import time
+from adafruit_ticks import ticks_ms, ticks_add, ticks_diff
+
+# A small cooperative scheduler for the main loop.
+#
+# Each task is a generator. Every time it's run it does one step of work
+# and yields how many ms to wait before its next step (0 to run again on
+# the next pass). Steps can't be interrupted, so a blocking network request
+# still holds up the other tasks while it runs, but everything else
+# (buttons, LEDs, the display) gets a turn between one request and the
+# next, instead of only once the whole refresh is done.
+#
+# A step that raises doesn't stop the others: the error is printed, and the
+# task is started over with a new generator after RESTART_DELAY ms.
+
+# ms to wait before starting a task over after an error.
+RESTART_DELAY = 5000
+
+class Task:
+    # function makes the task's generator, again whenever it's restarted.
+    def __init__(self, name, function):
+        self._name = name
+        self._function = function
+        self._generator = function()
+        self.due = 0
+
+        self._runs = 0
+        self._total_ns = 0
+        self._max_ns = 0
+        self._max_late_ms = 0
+        self._restarts = 0
+
+    @property
+    def name(self):
+        return self._name
+
+    # Times the task was started over after an error.
+    @property
+    def restarts(self):
+        return self._restarts
+
+    @property
+    def runs(self):
+        return self._runs
+
+    # Mean and longest time one step took, in ms.
+    @property
+    def mean_time(self):
+        return 0 if self._runs == 0 else self._total_ns / self._runs / 1_000_000
+
+    @property
+    def max_time(self):
+        return self._max_ns / 1_000_000
+
+    # Longest a step started after it was due, in ms.
+    @property
+    def max_late(self):
+        return self._max_late_ms
+
+    def _step(self, now):
+        late = ticks_diff(now, self.due)
+        start = time.monotonic_ns()
+
+        try:
+            delay = next(self._generator)
+        except StopIteration:
+            raise
+        except Exception as err:
+            print(f"Task {self._name} failed, error: {err}. Restarting it in {RESTART_DELAY} ms")
+            self._generator = self._function()
+            self._restarts += 1
+            delay = RESTART_DELAY
+
+        elapsed = time.monotonic_ns() - start
+
+        self._runs += 1
+        self._total_ns += elapsed
+        self._max_ns = max(self._max_ns, elapsed)
+        self._max_late_ms = max(self._max_late_ms, late)
+        self.due = ticks_add(now, delay or 0)
+
+class Scheduler:
+    def __init__(self):
+        self._tasks = []
+
+        # Ticks at the start of the current pass, shared by every task in it.
+        self.now = ticks_ms()
+
+    # Add a task, run in the order added, from a function that makes its
+    # generator. Its first step runs on the next pass.
+    def add(self, name, function):
+        task = Task(name, function)
+        task.due = self.now
+        self._tasks.append(task)
+        return task
+
+    @property
+    def tasks(self):
+        return self._tasks
+
+    # Run each task that's due once. Tasks that finish are removed.
+    def run_once(self):
+        self.now = ticks_ms()
+        finished = None
+
+        for task in self._tasks:
+            if ticks_diff(self.now, task.due) < 0:
+                continue
+
+            try:
+                task._step(self.now)
+            except StopIteration:
+                finished = finished or []
+                finished.append(task)
+
+        if finished:
+            for task in finished:
+                self._tasks.remove(task)
+
+    def run_forever(self):
+        while True:
+            self.run_once()
+
+    # Longest step and longest wait past due, per task: how long each task
+    # held up the others, and how long it was held up by them.
+    # Restarts are only shown for tasks that had any.
+    def stats_text(self):
+        return ", ".join(f"{task.name} {task.max_time:.0f}/{task.max_late} ms"
+                         + (f" ({task.restarts} restarts)" if task.restarts else "") for task in self._tasks)
@@ -0,0 +1,182 @@
+from array import array
+from math import ceil
+import displayio
+import bitmaptools
+
+# Birth times are kept relative to a clock in ms that starts at 0. Once it
+# passes this, everything is shifted back so the times fit in 32 bits.
+_CLOCK_REBASE = 1 << 30
+
+# The ISS's trail, drawn as dots that shrink linearly with age until they
+# disappear after `duration` ms.
+#
+# All dots are drawn into one 1-bit bitmap the size of the map, and their
+# state is kept in fixed-size arrays (a ring buffer, oldest first), so the
+# trail takes the same memory however long it is. When a dot shrinks, only
+# the area it covered is cleared, and any dots overlapping that area are
+# drawn back into it.
+class TrailLayer:
+    def __init__(self, width, height, capacity, radius, duration):
+        self._width = width
+        self._height = height
+        self._capacity = capacity
+        self._radius = radius
+        self._duration = duration
+
+        self._bitmap = displayio.Bitmap(width, height, 2)
+        palette = displayio.Palette(2)
+        palette[1] = 0x000000
+        palette.make_transparent(0)
+        self._tile_grid = displayio.TileGrid(self._bitmap, pixel_shader=palette)
+
+        self._x = array("h", [0] * capacity)
+        self._y = array("h", [0] * capacity)
+        self._birth = array("l", [0] * capacity)
+
+        # Radius each dot is drawn at now, and the radius to clear it from
+        # when it has shrunk (0 if it hasn't).
+        self._drawn = bytearray(capacity)
+        self._erase = bytearray(capacity)
+
+        self._start = 0
+        self._count = 0
+        self._clock = 0
+
+        # Half the width of each row of a dot, by radius and distance from the center row.
+        self._spans = [bytes(_half_width(r, dy) for dy in range(r + 1)) for r in range(radius + 1)]
+
+    @property
+    def tile_grid(self):
+        return self._tile_grid
+
+    def __len__(self):
+        return self._count
+
+    # Add a dot at map pixel (x, y), full-size unless it's already age ms old.
+    def add(self, x, y, age=0):
+        time_to_live = self._duration - age
+
+        if time_to_live <= 0:
+            return
+
+        if self._count == self._capacity:
+            self._remove_oldest()
+
+        radius = ceil(time_to_live * self._radius / self._duration)
+        i = (self._start + self._count) % self._capacity
+        self._x[i] = x
+        self._y[i] = y
+        self._birth[i] = self._clock - age
+        self._drawn[i] = radius
+        self._erase[i] = 0
+        self._count += 1
+
+        self._draw(x, y, radius, 0, 0, self._width, self._height)
+
+    # (x, y, age in ms) of each dot, oldest first.
+    def points(self):
+        points = []
+
+        for n in range(self._count):
+            i = (self._start + n) % self._capacity
+            points.append((self._x[i], self._y[i], self._clock - self._birth[i]))
+
+        return points
+
+    # Age every dot by dt ms. Returns True if the bitmap changed.
+    def update(self, dt):
+        self._clock += dt
+        changed = False
+
+        for n in range(self._count):
+            i = (self._start + n) % self._capacity
+            time_to_live = self._duration - (self._clock - self._birth[i])
+            radius = ceil(time_to_live * self._radius / self._duration) if time_to_live > 0 else 0
+
+            if radius != self._drawn[i]:
+                self._erase[i] = self._drawn[i]
+                self._drawn[i] = radius
+                changed = True
+
+        if changed:
+            for n in range(self._count):
+                i = (self._start + n) % self._capacity
+
+                if self._erase[i] > 0:
+                    self._redraw_around(self._x[i], self._y[i], self._erase[i])
+                    self._erase[i] = 0
+
+            # Dots are oldest first, so the dead ones are all at the front.
+            while self._count > 0 and self._drawn[self._start] == 0:
+                self._start = (self._start + 1) % self._capacity
+                self._count -= 1
+
+        if self._clock >= _CLOCK_REBASE:
+            for n in range(self._count):
+                i = (self._start + n) % self._capacity
+                self._birth[i] -= self._clock
+
+            self._clock = 0
+
+        return changed
+
+    def clear(self):
+        self._bitmap.fill(0)
+        self._start = 0
+        self._count = 0
+
+    def _remove_oldest(self):
+        i = self._start
+        radius = self._drawn[i]
+        self._drawn[i] = 0
+        self._start = (self._start + 1) % self._capacity
+        self._count -= 1
+        self._redraw_around(self._x[i], self._y[i], radius)
+
+    # Clear the square a dot of the given radius covered, then draw back
+    # the parts of any dots that overlap it.
+    def _redraw_around(self, x, y, radius):
+        x1 = max(x - radius, 0)
+        y1 = max(y - radius, 0)
+        x2 = min(x + radius + 1, self._width)
+        y2 = min(y + radius + 1, self._height)
+
+        if x1 >= x2 or y1 >= y2:
+            return
+
+        bitmaptools.fill_region(self._bitmap, x1, y1, x2, y2, 0)
+
+        for n in range(self._count):
+            i = (self._start + n) % self._capacity
+            other_radius = self._drawn[i]
+
+            if other_radius > 0 and abs(self._x[i] - x) <= radius + other_radius and abs(self._y[i] - y) <= radius + other_radius:
+                self._draw(self._x[i], self._y[i], other_radius, x1, y1, x2, y2)
+
+    # Draw a dot, clipped to the rectangle from (x1, y1) up to (x2, y2).
+    def _draw(self, x, y, radius, x1, y1, x2, y2):
+        if radius == 0:
+            return
+
+        spans = self._spans[radius]
+
+        for dy in range(-radius, radius + 1):
+            row = y + dy
+
+            if row < y1 or row >= y2:
+                continue
+
+            half_width = spans[abs(dy)]
+            left = max(x - half_width, x1)
+            right = min(x + half_width + 1, x2)
+
+            if left < right:
+                bitmaptools.fill_region(self._bitmap, left, row, right, row + 1, 1)
+
+def _half_width(radius, dy):
+    half_width = 0
+
+    while (half_width + 1) * (half_width + 1) + dy * dy <= radius * radius + radius:
+        half_width += 1
+
+    return half_width
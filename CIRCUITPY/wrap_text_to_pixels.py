@@ -8,6 +8,8 @@
 # https://github.com/adafruit/Adafruit_CircuitPython_Display_Text/blob/main/adafruit_display_text/__init__.py
 
 
+from array import array
+
 try:
     from typing import List, Optional, Tuple
 
@@ -17,6 +19,33 @@ except ImportError:
 
 _WRAP_DELIMITERS = ['-', '/']
 
+# Advance tables cover code points below this; anything above is looked up
+# through the font each time.
+_ADVANCE_TABLE_SIZE = 0x180
+
+# Per-font tables of glyph advances (shift_x) by code point, filled in as
+# characters are first seen. -1 means not looked up yet.
+_advance_tables = {}
+
+def _advance_table(font):
+    table = _advance_tables.get(font)
+
+    if table is None:
+        table = array("h", [-1] * _ADVANCE_TABLE_SIZE)
+        _advance_tables[font] = table
+
+    return table
+
+# Looks up an advance that isn't in the table yet, adding it if it fits.
+def _advance(font, table, code_point):
+    glyph = font.get_glyph(code_point)
+    advance = glyph.shift_x if glyph else 0
+
+    if code_point < _ADVANCE_TABLE_SIZE:
+        table[code_point] = advance
+
+    return advance
+
 def _sub_split(line, delimiter):
     output_text = []
 
@@ -64,9 +93,19 @@ def wrap_text_to_pixels(
         input text at ``max_width`` pixels size
     :rtype: List[str]
 
+    Widths are kept as running totals rather than re-measuring joined
+    strings, so splitting a long word is linear in its length. The lines
+    are the same as the original's, quirks included: ``width`` counts a
+    space after a word ending in a delimiter even though none is inserted,
+    and is reset to just the last part after splitting a long word.
+    ``partial_width`` is the true width of ``partial``, which is what the
+    long word splitting compares against.
     """
     if font is None:
 
+        def measure_char(char):
+            return 1
+
         def measure(text):
             return len(text)
 
@@ -74,62 +113,74 @@ def wrap_text_to_pixels(
         if hasattr(font, "load_glyphs"):
             font.load_glyphs(string)
 
+        table = _advance_table(font)
+
+        def measure_char(char):
+            code_point = ord(char)
+
+            if code_point < _ADVANCE_TABLE_SIZE:
+                advance = table[code_point]
+
+                if advance >= 0:
+                    return advance
+
+            return _advance(font, table, code_point)
+
         def measure(text):
             total_len = 0
             for char in text:
-                this_glyph = font.get_glyph(ord(char))
-                if this_glyph:
-                    total_len += this_glyph.shift_x
+                total_len += measure_char(char)
             return total_len
 
     lines = []
+    indent1_width = measure(indent1)
     partial = [indent0]
-    width = measure(indent0)
-    swidth = measure(" ")
+    partial_width = measure(indent0)
+    width = partial_width
+    swidth = measure_char(" ")
+    dash_width = measure_char("-")
     firstword = True
     for line_in_input in string.split("\n"):
         newline = True
         for index, word in enumerate(split_for_wrapping(line_in_input)):
             wwidth = measure(word)
-            word_parts = []
-            cur_part = ""
 
             if wwidth > max_width:
-                for char in word:
+                # The current part of the word is word[part_start:i].
+                part_start = 0
+                part_width = 0
+
+                for i, char in enumerate(word):
                     if newline:
                         extraspace = 0
                         leadchar = ""
                     else:
                         extraspace = swidth
                         leadchar = " "
-                    if (
-                        measure("".join(partial))
-                        + measure(cur_part)
-                        + measure(char)
-                        + measure("-")
-                        + extraspace
-                        > max_width
-                    ):
-                        if cur_part:
-                            word_parts.append("".join(partial) + leadchar + cur_part + "-")
 
+                    cwidth = measure_char(char)
+
+                    if partial_width + part_width + cwidth + dash_width + extraspace > max_width:
+                        if i > part_start:
+                            lines.append("".join(partial) + leadchar + word[part_start:i] + "-")
                         else:
-                            word_parts.append("".join(partial))
-                        cur_part = char
+                            lines.append("".join(partial))
+                        part_start = i
+                        part_width = cwidth
                         partial = [indent1]
+                        partial_width = indent1_width
                         newline = True
                     else:
-                        cur_part += char
-                if cur_part:
-                    word_parts.append(cur_part)
-                for line in word_parts[:-1]:
-                    lines.append(line)
-                partial.append(word_parts[-1])
-                width = measure(word_parts[-1])
+                        part_width += cwidth
+
+                partial.append(word[part_start:])
+                partial_width += part_width
+                width = part_width
                 if firstword:
                     firstword = False
             elif firstword:
                 partial.append(word)
+                partial_width += wwidth
                 firstword = False
                 width += wwidth
             elif width + swidth + wwidth < max_width:
@@ -144,19 +195,23 @@ def wrap_text_to_pixels(
                                 should_insert_space = False
                     
                     if should_insert_space == True:
-                        partial.append(" ")                
+                        partial.append(" ")
+                        partial_width += swidth
 
                 partial.append(word)
+                partial_width += wwidth
                 width += wwidth + swidth
             else:
                 lines.append("".join(partial))
                 partial = [indent1, word]
-                width = measure(indent1) + wwidth
+                partial_width = indent1_width + wwidth
+                width = indent1_width + wwidth
             if newline:
                 newline = False
 
         lines.append("".join(partial))
         partial = [indent1]
-        width = measure(indent1)
+        partial_width = indent1_width
+        width = indent1_width
 
     return lines
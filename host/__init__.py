@@ -0,0 +1,2 @@
+# Desktop (CPython) tooling for the ISS tracker firmware in ../CIRCUITPY.
+# Nothing in this package is copied to the MagTag.
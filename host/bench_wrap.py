@@ -0,0 +1,114 @@
+# Benchmarks wrap_text_to_pixels.py against the original quadratic version
+# in host/wrap_reference.py, on long place names in every font the layout
+# uses. The lines must come out identical; any difference is reported and
+# fails the run.
+#
+# Usage, from the repository root:
+#   python -m host.bench_wrap
+#   python -m host.bench_wrap --repeat 50
+import argparse
+import sys
+import time
+
+from host import runtime
+
+# Place names as they reach the layout: already passed through
+# printable.transliterate, so in ascii where the fonts lack the glyphs.
+NAMES = (
+    "Llanfairpwllgwyngyllgogerychwyrndrobwllllantysiliogogogoch",
+    "Krung Thep Mahanakhon Amon Rattanakosin Mahinthara Ayuthaya Mahadilok Phop Noppharat Ratchathani "
+    "Burirom Udomratchaniwet Mahasathan Amon Piman Awatan Sathit Sakkathattiya Witsanukam Prasit",
+    "Krungthepmahanakhonamonrattanakosinmahintharayuthayamahadilokphopnopparatratchathani",
+    "Taumatawhakatangihangakoauauotamateaturipukakapikimaungahoronukupokaiwhenuakitanatahu",
+    "Chargoggagoggmanchauggagoggchaubunagungamaugg",
+    "Saint-Remy-en-Bouzemont-Saint-Genest-et-Isson",
+    "Provence-Alpes-Cote d'Azur/Auvergne-Rhone-Alpes",
+    "Ynys Mon\nLlanfairpwllgwyngyll\nGwynedd",
+    "North Pacific Ocean",
+    "Quebec, Canada",
+    "Nunavut",
+    "",
+)
+
+# (font name in fonts.py, widths to wrap to)
+FONTS = (
+    ("REGULAR_8", (40, 90, 160)),
+    ("REGULAR_12", (40, 90, 160)),
+    ("LOCATION_SMALL", (60, 100, 180)),
+    ("LOCATION_MEDIUM", (60, 100, 180)),
+    ("LOCATION_LARGE", (60, 100, 180)),
+    ("NUMERIC_28", (60, 180)),
+)
+
+INDENTS = (("", ""), ("", "  "), ("- ", "  "))
+
+
+def _cases():
+    import fonts
+
+    for font_name, widths in FONTS:
+        font = getattr(fonts, font_name)
+
+        for width in widths:
+            for indent0, indent1 in INDENTS:
+                for name in NAMES:
+                    yield font_name, (name, width, font, indent0, indent1)
+
+    # No font, where every character is one unit wide.
+    for width in (5, 12, 30):
+        for name in NAMES:
+            yield "None", (name, width, None, "", "")
+
+
+def _time(wrap, cases, repeat):
+    start = time.perf_counter_ns()
+
+    for _ in range(repeat):
+        for _, args in cases:
+            wrap(*args)
+
+    return (time.perf_counter_ns() - start) / 1e6
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m host.bench_wrap", description=__doc__)
+    parser.add_argument("--repeat", type=int, default=20, help="passes over the names to time")
+    args = parser.parse_args(argv)
+
+    runtime.install()
+    from wrap_text_to_pixels import wrap_text_to_pixels
+    from host.wrap_reference import wrap_text_to_pixels as wrap_reference
+
+    cases = list(_cases())
+    mismatches = 0
+
+    for font_name, case in cases:
+        expected = wrap_reference(*case)
+        actual = wrap_text_to_pixels(*case)
+
+        if actual != expected:
+            mismatches += 1
+            name, width, _, indent0, indent1 = case
+            print(f"MISMATCH {font_name} width {width} indents {indent0!r}/{indent1!r} {name!r}:\n"
+                  f"  expected {expected}\n  got      {actual}")
+
+    reference_ms = _time(wrap_reference, cases, args.repeat)
+    rewrite_ms = _time(wrap_text_to_pixels, cases, args.repeat)
+    calls = len(cases) * args.repeat
+
+    print(f"{len(cases)} cases, {mismatches} mismatched")
+    print(f"original  {reference_ms:9.1f} ms  {reference_ms * 1000 / calls:8.1f} us per call")
+    print(f"rewrite   {rewrite_ms:9.1f} ms  {rewrite_ms * 1000 / calls:8.1f} us per call")
+    print(f"speedup   {reference_ms / rewrite_ms:9.1f}x")
+
+    # The longest name on its own, where the difference is largest.
+    longest = [case for case in cases if case[1][0] == NAMES[2] and case[0] == "LOCATION_LARGE"]
+    reference_ms = _time(wrap_reference, longest, args.repeat)
+    rewrite_ms = _time(wrap_text_to_pixels, longest, args.repeat)
+    print(f"longest word ({len(NAMES[2])} characters): {reference_ms / rewrite_ms:.1f}x")
+
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,292 @@
+# Benchmarks one pass of the main loop in code.py on desktop CPython.
+#
+# The firmware runs unmodified against the stand-ins in host/stubs, with
+# network responses replayed from a trace in host/traces. Each stage of the
+# refresh cycle is timed per call, and with --memory the Python heap is traced
+# too (this slows everything down, so compare timings only between runs made
+# with the same flags).
+#
+# Usage, from the repository root:
+#   python -m host.benchmark
+#   python -m host.benchmark --cycles 200 --memory --json out.json
+#   python -m host.benchmark --baseline out.json --tolerance 25
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+from host import runtime
+from host.replay import TraceReplay, load_trace
+
+DEFAULT_TRACE = os.path.join(runtime.TRACES_DIR, "pacific-to-quebec.jsonl")
+
+ISS_URL = "http://api.open-notify.org/iss-now.json"
+
+# Stages of the refresh cycle, in the order the main loop runs them.
+# (name bound in code.py, method name or None for a plain function)
+STAGES = (
+    ("position_source", "position"),
+    ("network", "fetch_tle"),
+    ("network", "fetch_iss_coordinate"),
+    ("home_distance", "measure"),
+    ("set_distance_text", None),
+    ("land_mask", "is_land"),
+    ("geodata_cache", "get"),
+    ("network", "fetch_geodata"),
+    ("offline_geocoder", "lookup"),
+    ("layout", "location_name_from_geodata"),
+    ("set_location_text", None),
+    ("update_map", None),
+    ("update_history_markers", None),
+)
+
+# Stages that only run inside another stage. They're reported, but not
+# added to the per-cycle total. (With --memory, their peak resets the outer
+# stage's, so the outer peak only covers what happens after them.)
+NESTED_STAGES = {"network.fetch_tle", "network.fetch_iss_coordinate"}
+
+# A new cycle begins each time this stage is entered.
+CYCLE_START_STAGE = "position_source.position"
+
+# Stages faster than this are too noisy to flag as regressions.
+NOISE_FLOOR_MS = 0.05
+
+
+class BenchmarkFinished(BaseException):
+    pass
+
+
+def _stage_label(name, method):
+    return name if method is None else f"{name}.{method}"
+
+
+class StageStats:
+    def __init__(self, label):
+        self.label = label
+        self.times_ns = []
+        self.peak_bytes = []
+        self.net_blocks = []
+
+    def record(self, elapsed_ns, peak=None, blocks=None):
+        self.times_ns.append(elapsed_ns)
+
+        if peak is not None:
+            self.peak_bytes.append(peak)
+            self.net_blocks.append(blocks)
+
+    def summary(self):
+        times = sorted(self.times_ns)
+        n = len(times)
+        result = {
+            "calls": n,
+            "total_ms": sum(times) / 1e6,
+            "mean_ms": (sum(times) / n / 1e6) if n else 0.0,
+            "p50_ms": (times[n // 2] / 1e6) if n else 0.0,
+            "max_ms": (times[-1] / 1e6) if n else 0.0,
+        }
+
+        if self.peak_bytes:
+            result["mean_peak_kib"] = sum(self.peak_bytes) / len(self.peak_bytes) / 1024
+            result["max_peak_kib"] = max(self.peak_bytes) / 1024
+            result["mean_net_blocks"] = sum(self.net_blocks) / len(self.net_blocks)
+
+        return result
+
+
+class Benchmark:
+    def __init__(self, cycles, start_time, warmup=1, trace_memory=False):
+        self._cycles = cycles
+        self._time = runtime.VirtualTime(start_time)
+        self._warmup = warmup
+        self._trace_memory = trace_memory
+        self._cycle = 0
+        self._targets = {}
+        self.stats = {}
+
+        for name, method in STAGES:
+            label = _stage_label(name, method)
+            self._targets.setdefault(name, []).append(method)
+            self.stats[label] = StageStats(label)
+
+    @property
+    def completed_cycles(self):
+        return max(self._cycle - 1 - self._warmup, 0)
+
+    def _instrument(self, label, func):
+        stats = self.stats[label]
+
+        def timed(*args, **kwargs):
+            if label == CYCLE_START_STAGE:
+                self._cycle += 1
+                if self._cycle > self._cycles + self._warmup:
+                    raise BenchmarkFinished()
+
+            recording = self._cycle > self._warmup
+
+            if recording and self._trace_memory:
+                tracemalloc.reset_peak()
+                start_bytes = tracemalloc.get_traced_memory()[0]
+                start_blocks = sys.getallocatedblocks()
+
+            start = time.perf_counter_ns()
+            result = func(*args, **kwargs)
+            elapsed = time.perf_counter_ns() - start
+
+            if recording:
+                if self._trace_memory:
+                    peak = tracemalloc.get_traced_memory()[1] - start_bytes
+                    stats.record(elapsed, peak, sys.getallocatedblocks() - start_blocks)
+                else:
+                    stats.record(elapsed)
+
+            return result
+
+        return timed
+
+    # Hook for runtime.run_firmware: swaps stage functions for timed wrappers
+    # as code.py defines them.
+    def on_store(self, name, value):
+        if name == "time":
+            return self._time
+
+        methods = self._targets.get(name)
+
+        # Optional features are bound to None when they're turned off.
+        if methods is None or value is None:
+            return value
+
+        for method in methods:
+            if method is None:
+                value = self._instrument(name, value)
+            else:
+                setattr(value, method, self._instrument(_stage_label(name, method), getattr(value, method)))
+
+        return value
+
+    def run(self, replay, verbose=False):
+        import adafruit_ticks
+        import socketpool
+        import supervisor
+
+        socketpool.handler = replay
+        # Each ticks_ms() call advances one second of virtual time, so the idle
+        # part of the loop spins a bounded number of times between refreshes.
+        adafruit_ticks.step_ms = 1000
+
+        if self._trace_memory:
+            tracemalloc.start()
+
+        output = contextlib.nullcontext() if verbose else contextlib.redirect_stdout(io.StringIO())
+        start = time.perf_counter()
+
+        try:
+            with output:
+                runtime.run_firmware(on_store=self.on_store)
+        except BenchmarkFinished:
+            pass
+        except supervisor.ReloadRequested:
+            print("Firmware requested a reload, stopping early.", file=sys.stderr)
+        finally:
+            if self._trace_memory:
+                tracemalloc.stop()
+
+        return time.perf_counter() - start
+
+    def report(self):
+        return {label: stats.summary() for label, stats in self.stats.items()}
+
+
+def _print_report(report, cycles, wall_s, trace_memory):
+    header = f"{'stage':<36} {'calls':>6} {'mean ms':>9} {'p50 ms':>9} {'max ms':>9}"
+    if trace_memory:
+        header += f" {'peak KiB':>9} {'net blk':>8}"
+    print(header)
+    print("-" * len(header))
+
+    cycle_ms = 0.0
+    for label, summary in report.items():
+        name = f"  {label}" if label in NESTED_STAGES else label
+        line = f"{name:<36} {summary['calls']:>6} {summary['mean_ms']:>9.3f} {summary['p50_ms']:>9.3f} {summary['max_ms']:>9.3f}"
+        if trace_memory and summary["calls"]:
+            line += f" {summary['mean_peak_kib']:>9.1f} {summary['mean_net_blocks']:>8.1f}"
+        print(line)
+
+        if label not in NESTED_STAGES:
+            cycle_ms += summary["total_ms"]
+
+    print("-" * len(header))
+    if cycles:
+        print(f"{cycles} cycles, {cycle_ms / cycles:.3f} ms per cycle in measured stages, {wall_s:.2f} s wall time")
+    if trace_memory:
+        print("(timings include tracemalloc overhead)")
+
+
+# Compare against a saved report. Returns the stages that got slower than
+# the tolerance allows.
+def _regressions(report, baseline, tolerance):
+    slower = []
+
+    for label, summary in report.items():
+        previous = baseline.get("stages", {}).get(label)
+
+        if previous is None or not summary["calls"]:
+            continue
+
+        limit = previous["mean_ms"] * (1 + tolerance / 100)
+
+        if summary["mean_ms"] > limit and summary["mean_ms"] - previous["mean_ms"] > NOISE_FLOOR_MS:
+            slower.append((label, previous["mean_ms"], summary["mean_ms"]))
+
+    return slower
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m host.benchmark", description=__doc__)
+    parser.add_argument("--trace", default=DEFAULT_TRACE, help="recorded responses to replay")
+    parser.add_argument("--cycles", type=int, default=None, help="refresh cycles to measure, looping the trace if needed (default: one pass)")
+    parser.add_argument("--warmup", type=int, default=1, help="cycles to run before measuring")
+    parser.add_argument("--memory", action="store_true", help="trace heap allocations per stage")
+    parser.add_argument("--json", metavar="PATH", help="write the report to PATH")
+    parser.add_argument("--baseline", metavar="PATH", help="fail if a stage is slower than this saved report")
+    parser.add_argument("--tolerance", type=float, default=25.0, help="allowed slowdown against --baseline, in percent")
+    parser.add_argument("--verbose", action="store_true", help="show the firmware's console output")
+    args = parser.parse_args(argv)
+
+    runtime.install()
+
+    metadata, entries = load_trace(args.trace)
+    replay = TraceReplay(entries)
+    cycles = args.cycles if args.cycles is not None else replay.count(ISS_URL) - args.warmup
+
+    benchmark = Benchmark(cycles=cycles, start_time=metadata.get("start", int(time.time())),
+                          warmup=args.warmup, trace_memory=args.memory)
+    wall_s = benchmark.run(replay, verbose=args.verbose)
+    report = benchmark.report()
+
+    _print_report(report, benchmark.completed_cycles, wall_s, args.memory)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"cycles": benchmark.completed_cycles, "memory": args.memory, "stages": report}, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, "r") as f:
+            baseline = json.load(f)
+
+        slower = _regressions(report, baseline, args.tolerance)
+
+        for label, before, after in slower:
+            print(f"REGRESSION {label}: {before:.3f} ms -> {after:.3f} ms")
+
+        if slower:
+            return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
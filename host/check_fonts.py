@@ -0,0 +1,81 @@
+# Checks the precompiled fonts (assets/fonts/*.bin, built by
+# tools/build_fonts.py) against the BDF files they were built from: every
+# glyph must have the same metrics and pixels, and code points missing from
+# the BDF must be missing from the .bin. Also times opening each font both
+# ways.
+#
+# Usage, from the repository root:
+#   python -m host.check_fonts
+import glob
+import os
+import sys
+import time
+
+from host import runtime
+
+# Code points that are in none of the fonts, to check they come back as None.
+MISSING = (0x01, 0x7F, 0x0180, 0x0E00, 0xFFFF, 0x10000, 0x1F680)
+
+
+def _pixels(bitmap):
+    return [bitmap[x, y] for y in range(bitmap.height) for x in range(bitmap.width)]
+
+
+def _compare(bdf, binary):
+    failures = []
+
+    if bdf.get_bounding_box() != binary.get_bounding_box():
+        failures.append(f"bounding box {bdf.get_bounding_box()} != {binary.get_bounding_box()}")
+
+    if (bdf.ascent, bdf.descent) != (binary.ascent, binary.descent):
+        failures.append(f"ascent/descent {(bdf.ascent, bdf.descent)} != {(binary.ascent, binary.descent)}")
+
+    for code_point, expected in sorted(bdf._glyphs.items()):
+        actual = binary.get_glyph(code_point)
+
+        if actual is None:
+            failures.append(f"U+{code_point:04X} missing")
+        elif expected[2:] != actual[2:]:
+            failures.append(f"U+{code_point:04X} metrics {tuple(expected[2:])} != {tuple(actual[2:])}")
+        elif _pixels(expected.bitmap) != _pixels(actual.bitmap):
+            failures.append(f"U+{code_point:04X} pixels differ")
+
+    for code_point in MISSING:
+        if code_point not in bdf._glyphs and binary.get_glyph(code_point) is not None:
+            failures.append(f"U+{code_point:04X} should be missing")
+
+    return failures
+
+
+def main(argv=None):
+    runtime.install()
+    from adafruit_bitmap_font import bitmap_font
+    from binary_font import BinaryFont
+
+    failed = 0
+
+    for path in sorted(glob.glob(os.path.join("assets", "fonts", "*.bdf"))):
+        binary_path = os.path.splitext(path)[0] + ".bin"
+
+        start = time.perf_counter_ns()
+        bdf = bitmap_font.load_font(path)
+        bdf_ms = (time.perf_counter_ns() - start) / 1e6
+
+        start = time.perf_counter_ns()
+        binary = BinaryFont(binary_path)
+        binary_ms = (time.perf_counter_ns() - start) / 1e6
+
+        failures = _compare(bdf, binary)
+        failed += len(failures) > 0
+
+        print(f"{os.path.basename(binary_path):<36} {len(bdf._glyphs):>4} glyphs  "
+              f"open {binary_ms:6.2f} ms (BDF {bdf_ms:6.1f} ms)  {'FAILED' if failures else 'ok'}")
+
+        for failure in failures[:10]:
+            print(f"  {failure}")
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
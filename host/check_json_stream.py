@@ -0,0 +1,96 @@
+# Checks the streaming JSON extractor (json_stream.py) against recorded
+# geoapify responses: for every payload in the traces, the properties it
+# extracts must match what json.loads() finds, whatever the chunk size and
+# however the payload is escaped.
+#
+# Usage, from the repository root:
+#   python -m host.check_json_stream
+#   python -m host.check_json_stream host/traces/pacific-to-quebec.jsonl
+import argparse
+import glob
+import json
+import os
+import sys
+
+from host import runtime
+from host.replay import load_trace
+
+CHUNK_SIZES = (1, 7, 64, 256, 4096)
+
+
+# The payload as recorded, with all non-ASCII escaped as \uXXXX, and with
+# whitespace between tokens.
+def _variants(body):
+    document = json.loads(body)
+    return (
+        ("recorded", body.encode("utf-8")),
+        ("escaped", json.dumps(document, ensure_ascii=True).encode("utf-8")),
+        ("indented", json.dumps(document, ensure_ascii=False, indent=2).encode("utf-8")),
+    )
+
+
+def _expected(body, path, keys):
+    value = json.loads(body)
+
+    try:
+        for selector in path:
+            value = value[selector]
+    except (IndexError, KeyError):
+        return None
+
+    return {key: value[key] for key in keys if key in value and (value[key] is None or isinstance(value[key], str))}
+
+
+def _extract(payload, chunk_size, path, keys):
+    from json_stream import JsonFieldExtractor
+
+    extractor = JsonFieldExtractor(path, keys)
+
+    for start in range(0, len(payload), chunk_size):
+        if extractor.feed(memoryview(payload)[start:start + chunk_size]):
+            break
+
+    return extractor.fields if extractor.complete else None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m host.check_json_stream", description=__doc__)
+    parser.add_argument("traces", nargs="*", help="traces to check (default: all in host/traces)")
+    args = parser.parse_args(argv)
+
+    runtime.install()
+    from network_helper import _GEODATA_KEYS, _GEODATA_PATH
+
+    # Responses with no features, which have no properties to find.
+    payloads = [
+        ("no features", '{"type":"FeatureCollection","features":[],"query":{"lat":0,"lon":0}}'),
+        ("nested names", '{"features":[{"properties":{"rank":{"name":"no"},"name":"yes","city":null}}]}'),
+        ("escapes", r'{"features":[{"properties":{"name":"\ud83d\ude80 \"ISS\" \\ \/ \u00e9\t"}}]}'),
+    ]
+
+    for path in args.traces or sorted(glob.glob(os.path.join(runtime.TRACES_DIR, "*.jsonl"))):
+        _, entries = load_trace(path)
+        payloads += [(f"{os.path.basename(path)} #{i}", entry["body"])
+                     for i, entry in enumerate(entries) if "geoapify" in entry["url"]]
+
+    failures = 0
+    checks = 0
+
+    for name, body in payloads:
+        expected = _expected(body, _GEODATA_PATH, _GEODATA_KEYS)
+
+        for variant, payload in _variants(body):
+            for chunk_size in CHUNK_SIZES:
+                checks += 1
+                actual = _extract(payload, chunk_size, _GEODATA_PATH, _GEODATA_KEYS)
+
+                if actual != expected:
+                    failures += 1
+                    print(f"MISMATCH {name} ({variant}, {chunk_size} byte chunks):\n  expected {expected}\n  got      {actual}")
+
+    print(f"{len(payloads)} payloads, {checks} checks, {failures} failed")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,71 @@
+# Checks the offline land/ocean map (CIRCUITPY/assets/land-mask.bin, built by
+# tools/build_land_mask.py) and the ocean names in land_mask.py: seas joined
+# to the ocean through narrow straits are ocean and get their own names,
+# while lakes and land still go to Geoapify.
+#
+# Usage, from the repository root:
+#   python -m host.check_land_mask
+import sys
+
+from host import runtime
+
+# (lat, lon, name) of points well away from any coast.
+SEAS = (
+    (15.0, -75.0, "Caribbean Sea"),
+    (25.0, -88.0, "Gulf of Mexico"),
+    (58.75, -86.75, "Hudson Bay"),
+    (35.75, 19.25, "Mediterranean Sea"),
+    (38.75, 5.75, "Mediterranean Sea"),
+    (43.25, 32.25, "Black Sea"),
+    (56.25, 19.75, "Baltic Sea"),
+    (20.25, 38.25, "Red Sea"),
+    (12.75, 47.75, "Gulf of Aden"),
+    (0.0, -140.0, "North Pacific Ocean"),
+    (-30.0, -20.0, "South Atlantic Ocean"),
+    (-20.0, 80.0, "Indian Ocean"),
+)
+
+# (lat, lon, what) of lakes and land.
+LAND = (
+    (47.5, -87.5, "Lake Superior"),
+    (42.0, 50.0, "the Caspian Sea"),
+    (-1.0, 33.0, "Lake Victoria"),
+    (40.0, -100.0, "Kansas"),
+    (0.0, 20.0, "the Congo"),
+)
+
+
+class Checker:
+    def __init__(self):
+        self.failures = 0
+
+    def check(self, name, condition, detail=""):
+        print(f"{'ok  ' if condition else 'FAIL'} {name}{'' if condition else ': ' + detail}")
+
+        if not condition:
+            self.failures += 1
+
+
+def main(argv=None):
+    runtime.install()
+
+    from land_mask import LandMask, ocean_name
+
+    land_mask = LandMask()
+    checker = Checker()
+
+    for lat, lon, name in SEAS:
+        is_land = land_mask.is_land(lat, lon)
+        found = ocean_name(lat, lon)
+        checker.check(f"{lat}, {lon} is ocean, named {name}", not is_land and found == name,
+                      f"land: {is_land}, named {found}")
+
+    for lat, lon, what in LAND:
+        checker.check(f"{lat}, {lon} ({what}) is looked up online", land_mask.is_land(lat, lon))
+
+    print(f"{checker.failures} failed" if checker.failures else "All passed")
+    return 1 if checker.failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,269 @@
+# Checks the network supervisor (network_supervisor.py) against a local fake
+# server (host/fake_server.py): the firmware's Network makes real requests
+# over real sockets, the server fails them on cue, and the circuit breakers,
+# backoff and recovery steps must respond as designed. The supervisor's
+# clock is virtual, so backoffs of minutes take no time.
+#
+# Usage, from the repository root:
+#   python -m host.check_network_supervisor
+import contextlib
+import io
+import sys
+
+from host import runtime
+from host.fake_server import FakeServer
+
+ISS = "/iss-now.json"
+
+
+class Clock:
+    def __init__(self):
+        self.ns = 0
+
+    def __call__(self):
+        return self.ns
+
+    def advance(self, seconds):
+        self.ns += int(seconds * 1_000_000_000)
+
+
+class Checker:
+    def __init__(self):
+        self.failures = 0
+
+    def check(self, name, condition, detail=""):
+        print(f"{'ok  ' if condition else 'FAIL'} {name}{'' if condition else ': ' + detail}")
+
+        if not condition:
+            self.failures += 1
+
+
+def _network(clock):
+    from network_helper import Network
+
+    network = Network(clock=clock)
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        network.connect_to_wifi()
+
+    return network
+
+
+def _quietly(func, *args):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return func(*args)
+
+
+def check_backoff(checker):
+    from network_supervisor import backoff_delay
+
+    within = True
+
+    for attempt in range(12):
+        expected = min(30 * (1 << attempt), 1800)
+
+        for _ in range(200):
+            delay = backoff_delay(attempt, 30, 1800)
+            within = within and expected / 2 <= delay <= expected
+
+    checker.check("backoff delays double, are capped, and jitter within the upper half", within)
+
+
+def check_healthy(checker, server):
+    clock = Clock()
+    network = _network(clock)
+
+    coordinate = _quietly(network.fetch_iss_coordinate)
+    tle = _quietly(network.fetch_tle)
+    geodata = _quietly(network.fetch_geodata, 45.5, -73.6)
+
+    checker.check("healthy endpoints answer", coordinate is not None and tle is not None and geodata is not None)
+    checker.check("healthy endpoints keep their circuits closed",
+                  all(network.supervisor.breaker(name).state == "closed" for name in ("open-notify", "celestrak", "geoapify")))
+
+
+def check_breaker(checker, server):
+    from network_supervisor import BACKOFF_BASE, BACKOFF_MAX
+
+    clock = Clock()
+    network = _network(clock)
+    breaker = network.supervisor.breaker("open-notify")
+
+    # (A reset on a kept socket is retried once on a new one, so it's only
+    # used where every request fails.)
+    server.fail(ISS, "error", "garbage", "error")
+
+    for _ in range(3):
+        clock.advance(60)
+        _quietly(network.fetch_iss_coordinate)
+
+    checker.check("three failures open the circuit", breaker.state == "open", breaker.state)
+
+    hits = server.hit_count(ISS)
+    skipped = [_quietly(network.fetch_iss_coordinate) for _ in range(5)]
+    checker.check("an open circuit skips requests", skipped == [None] * 5 and server.hit_count(ISS) == hits,
+                  f"{server.hit_count(ISS) - hits} requests made")
+
+    # Other endpoints aren't affected, and their success resets recovery.
+    checker.check("other endpoints still answer", _quietly(network.fetch_tle) is not None)
+
+    # Past the longest possible first backoff, one request is let through.
+    clock.advance(BACKOFF_BASE)
+    server.fail(ISS, "error")
+    _quietly(network.fetch_iss_coordinate)
+    checker.check("a failed trial request opens the circuit again", breaker.state == "open" and breaker.opens == 2,
+                  f"{breaker.state}, opened {breaker.opens} times")
+
+    clock.advance(BACKOFF_MAX)
+    coordinate = _quietly(network.fetch_iss_coordinate)
+    checker.check("a successful trial request closes the circuit", coordinate is not None and breaker.state == "closed",
+                  breaker.state)
+
+    now = clock()
+    open_s = breaker.time_in("open", now)
+    checker.check("time open is tracked", BACKOFF_BASE / 2 + BACKOFF_BASE <= open_s <= BACKOFF_BASE + BACKOFF_MAX,
+                  f"{open_s:.0f} s")
+    checker.check("time in every state adds up",
+                  abs(sum(breaker.time_in(state, now) for state in ("closed", "open", "half-open")) - now / 1e9) < 1e-6)
+
+
+def check_escalation(checker, server):
+    import supervisor
+    from network_supervisor import BACKOFF_MAX
+
+    clock = Clock()
+    network = _network(clock)
+    saved = []
+    network.before_reload = lambda: saved.append(True)
+    reloaded = False
+
+    server.fail_always("reset")
+    steps = []
+
+    try:
+        for _ in range(20):
+            for fetch in (network.fetch_iss_coordinate, network.fetch_tle):
+                clock.advance(BACKOFF_MAX)
+                _quietly(fetch)
+
+                steps = [name for name, count in network.supervisor.recoveries.items() if count > 0]
+    except supervisor.ReloadRequested:
+        reloaded = True
+    finally:
+        server.clear()
+
+    checker.check("recovery escalates session, socket pool, radio, then reload",
+                  steps == ["new session", "new socket pool", "restart radio"] and reloaded,
+                  f"{steps}, reloaded: {reloaded}")
+    checker.check("state is saved before the reload", saved == [True])
+
+    # A success resets the escalation.
+    clock.advance(BACKOFF_MAX)
+    network = _network(clock)
+    server.fail_always("reset")
+
+    for _ in range(3):
+        clock.advance(BACKOFF_MAX)
+        _quietly(network.fetch_iss_coordinate)
+
+    server.clear()
+    clock.advance(BACKOFF_MAX)
+    _quietly(network.fetch_iss_coordinate)
+    server.fail_always("reset")
+
+    for _ in range(3):
+        clock.advance(BACKOFF_MAX)
+        _quietly(network.fetch_iss_coordinate)
+
+    server.clear()
+    checker.check("a success starts recovery over from the gentlest step",
+                  network.supervisor.recoveries == {"new session": 2, "new socket pool": 0, "restart radio": 0, "reload": 0},
+                  str(network.supervisor.recoveries))
+
+
+def check_status_errors(checker, server):
+    from network_supervisor import BACKOFF_MAX
+
+    clock = Clock()
+    network = _network(clock)
+    breaker = network.supervisor.breaker("open-notify")
+
+    # The server answers, just not usefully, so the network is fine.
+    try:
+        server.fail_always("limited")
+
+        for _ in range(9):
+            clock.advance(BACKOFF_MAX)
+            _quietly(network.fetch_iss_coordinate)
+
+        limited_state = breaker.state
+
+        server.fail_always("error")
+
+        for _ in range(9):
+            clock.advance(BACKOFF_MAX)
+            _quietly(network.fetch_tle)
+    finally:
+        server.clear()
+
+    checker.check("error statuses open the endpoint's circuit",
+                  limited_state == "open" and network.supervisor.breaker("celestrak").state == "open",
+                  f"open-notify {limited_state}, celestrak {network.supervisor.breaker('celestrak').state}")
+    checker.check("error statuses don't recover the network",
+                  all(count == 0 for count in network.supervisor.recoveries.values()),
+                  str(network.supervisor.recoveries))
+
+
+def check_transport_reset(checker):
+    from network_helper import Network
+
+    class Transport:
+        def __init__(self):
+            self.resets = 0
+
+        def get(self, url, timeout=30):
+            raise OSError("Connection closed")
+
+        def reset(self):
+            self.resets += 1
+
+    clock = Clock()
+    transport = Transport()
+    network = Network(clock=clock, transport=transport)
+    _quietly(network.connect_to_wifi)
+
+    for _ in range(6):
+        clock.advance(60)
+        _quietly(network.fetch_iss_coordinate)
+        _quietly(network.fetch_tle)
+
+    checker.check("recovery steps start the transport over", transport.resets >= 2,
+                  f"{transport.resets} resets, {network.supervisor.recoveries}")
+
+
+def main(argv=None):
+    runtime.install()
+
+    import socketpool
+
+    server = FakeServer().start()
+    socketpool.redirect = server.address
+    checker = Checker()
+
+    try:
+        check_backoff(checker)
+        check_healthy(checker, server)
+        check_breaker(checker, server)
+        check_escalation(checker, server)
+        check_status_errors(checker, server)
+        check_transport_reset(checker)
+    finally:
+        socketpool.redirect = None
+        server.stop()
+
+    print(f"{checker.failures} failed" if checker.failures else "All passed")
+    return 1 if checker.failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,113 @@
+# Checks the predicted ground track (predicted_track.py) against the orbit
+# in a recorded TLE: corrections from downloaded positions shift the track
+# and stay shifted over the refreshes after them, and moving the track
+# along draws the same dots as drawing it from scratch.
+#
+# Usage, from the repository root:
+#   python -m host.check_predicted_track
+import contextlib
+import io
+import os
+import sys
+
+from host import runtime
+from host.replay import load_trace
+
+DEFAULT_TRACE = os.path.join(runtime.TRACES_DIR, "pacific-to-quebec.jsonl")
+
+MAP_WIDTH = 192
+MAP_HEIGHT = 128
+
+
+class Checker:
+    def __init__(self):
+        self.failures = 0
+
+    def check(self, name, condition, detail=""):
+        print(f"{'ok  ' if condition else 'FAIL'} {name}{'' if condition else ': ' + detail}")
+
+        if not condition:
+            self.failures += 1
+
+
+def _to_map(lat, lon):
+    return round(MAP_WIDTH / 2 + lon * MAP_WIDTH / 360), round(MAP_HEIGHT / 2 - lat * MAP_HEIGHT / 180)
+
+
+def _track():
+    from predicted_track import PredictedTrack
+    return PredictedTrack(MAP_WIDTH, MAP_HEIGHT, _to_map, tolerance=50)
+
+
+def _quietly(func, *args):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return func(*args)
+
+
+def check_correction(checker, orbit, start):
+    track = _track()
+    _quietly(track.update, orbit, start)
+
+    # Open Notify says the ISS is 20 s ahead of the orbit.
+    fix = orbit.position(start + 60 + 20)
+    _quietly(track.update, orbit, start + 60, (fix.latitude, fix.longitude))
+    checker.check("a downloaded position off the track shifts it", track.offset == 20, f"shifted {track.offset} s")
+
+    # The refreshes after it are propagated, so (as in code.py) they pass no fix.
+    batches = track.batches
+
+    for minute in range(2, 30):
+        _quietly(track.update, orbit, start + minute * 60)
+
+    checker.check("the correction survives the propagated refreshes after it", track.offset == 20,
+                  f"shifted {track.offset} s")
+    checker.check("and they don't compute a new batch", track.batches == batches,
+                  f"{track.batches - batches} new batches")
+
+    # A later download that agrees with the shifted track changes nothing.
+    fix = orbit.position(start + 30 * 60 + 20)
+    _quietly(track.update, orbit, start + 30 * 60, (fix.latitude, fix.longitude))
+    checker.check("a downloaded position on the shifted track keeps it", track.offset == 20, f"shifted {track.offset} s")
+
+
+def check_advance(checker, orbit, start):
+    track = _track()
+
+    for minute in range(150):
+        _quietly(track.update, orbit, start + minute * 60)
+
+    # Draw the same batch from scratch, as of the same time.
+    fresh = _track()
+    fresh._orbit = orbit
+    fresh._start = track._start
+    fresh._horizon = track._horizon
+    fresh._samples = track._samples
+    fresh._lat = track._lat
+    fresh._lon = track._lon
+    fresh._make_dots()
+    fresh._advance(start + 149 * 60)
+
+    checker.check("moving the track along draws the same as drawing it afresh",
+                  bytes(track._bitmap._data) == bytes(fresh._bitmap._data))
+
+
+def main(argv=None):
+    runtime.install()
+
+    from orbit import Orbit, split_tle
+
+    metadata, entries = load_trace(DEFAULT_TRACE)
+    tle = next(entry["body"] for entry in entries if "gp.php" in entry["url"])
+    orbit = Orbit(*split_tle(tle))
+    start = metadata["start"]
+    checker = Checker()
+
+    check_correction(checker, orbit, start)
+    check_advance(checker, orbit, start)
+
+    print(f"{checker.failures} failed" if checker.failures else "All passed")
+    return 1 if checker.failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
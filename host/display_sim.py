@@ -0,0 +1,373 @@
+# Renders what the MagTag would show, without a MagTag.
+#
+# The firmware runs against the stand-ins in host/stubs with responses
+# replayed from a trace (as in host.benchmark), and every display.refresh()
+# rasterizes display.root_group (Groups, TileGrids, Labels and shapes) into a
+# 296x128 grayscale frame, quantized to the panel's four gray levels, and
+# writes it as a PNG. With --diff, the regions that changed since the
+# previous frame are reported too, and drawn over the frame in a second PNG.
+#
+# Usage, from the repository root:
+#   python -m host.display_sim --out frames
+#   python -m host.display_sim --out frames --refreshes 5 --diff
+import argparse
+import contextlib
+import io
+import os
+import struct
+import sys
+import time
+import zlib
+
+from host import runtime
+from host.replay import TraceReplay, load_trace
+
+DEFAULT_TRACE = os.path.join(runtime.TRACES_DIR, "pacific-to-quebec.jsonl")
+
+# The panel's gray levels, darkest first.
+GRAY_LEVELS = (0x00, 0x55, 0xAA, 0xFF)
+
+WHITE = 0xFF
+
+
+class SimulationFinished(BaseException):
+    pass
+
+
+def _gray(color, levels):
+    r, g, b = (color >> 16) & 0xFF, (color >> 8) & 0xFF, color & 0xFF
+    value = (r * 299 + g * 587 + b * 114) // 1000
+
+    if levels is None:
+        return value
+
+    return min(levels, key=lambda level: abs(level - value))
+
+
+# Gray (or None for transparent) for each value a TileGrid's bitmap can hold.
+def _shade_table(tile_grid, levels):
+    shader = tile_grid.pixel_shader
+
+    if hasattr(shader, "is_transparent"):
+        return [None if shader.is_transparent(i) else _gray(shader[i], levels) for i in range(len(shader))]
+
+    # A ColorConverter: bitmap values are RGB888 colors.
+    return None
+
+
+# Rasterize a display tree into width * height gray bytes.
+class Renderer:
+    def __init__(self, width=296, height=128, levels=GRAY_LEVELS):
+        self.width = width
+        self.height = height
+        self._levels = levels
+
+    def render(self, root):
+        frame = bytearray([WHITE]) * (self.width * self.height)
+
+        if root is not None:
+            self._draw(frame, root, 0, 0, 1)
+
+        return frame
+
+    def _draw(self, frame, layer, x, y, scale):
+        if getattr(layer, "hidden", False):
+            return
+
+        if hasattr(layer, "bitmap") and hasattr(layer, "pixel_shader"):
+            self._draw_tile_grid(frame, layer, x + layer.x * scale, y + layer.y * scale, scale)
+            return
+
+        # A Group, including Labels; children are offset and scaled by it.
+        x += layer.x * scale
+        y += layer.y * scale
+        scale *= layer.scale
+
+        for child in layer:
+            self._draw(frame, child, x, y, scale)
+
+    def _draw_tile_grid(self, frame, grid, left, top, scale):
+        bitmap = grid.bitmap
+        shades = _shade_table(grid, self._levels)
+        converter = grid.pixel_shader if shades is None else None
+        tile_width = grid.tile_width
+        tile_height = grid.tile_height
+        tiles_per_row = max(bitmap.width // tile_width, 1)
+        flip_x = getattr(grid, "flip_x", False)
+        flip_y = getattr(grid, "flip_y", False)
+        transpose = getattr(grid, "transpose_xy", False)
+        cell_width, cell_height = (tile_height, tile_width) if transpose else (tile_width, tile_height)
+        width, height = self.width, self.height
+
+        for tile_y in range(grid.height):
+            for tile_x in range(grid.width):
+                tile = grid[tile_x, tile_y]
+                source_x = (tile % tiles_per_row) * tile_width
+                source_y = (tile // tiles_per_row) * tile_height
+                cell_left = left + tile_x * cell_width * scale
+                cell_top = top + tile_y * cell_height * scale
+
+                for dy in range(cell_height):
+                    screen_y = cell_top + dy * scale
+
+                    if screen_y + scale <= 0 or screen_y >= height:
+                        continue
+
+                    for dx in range(cell_width):
+                        screen_x = cell_left + dx * scale
+
+                        if screen_x + scale <= 0 or screen_x >= width:
+                            continue
+
+                        u, v = (dy, dx) if transpose else (dx, dy)
+                        if flip_x:
+                            u = tile_width - 1 - u
+                        if flip_y:
+                            v = tile_height - 1 - v
+
+                        value = bitmap[source_x + u, source_y + v]
+
+                        if converter is None:
+                            shade = shades[value] if value < len(shades) else None
+                        elif value == getattr(converter, "_transparent_color", None):
+                            shade = None
+                        else:
+                            shade = _gray(converter.convert(value), self._levels)
+
+                        if shade is None:
+                            continue
+
+                        for sy in range(max(screen_y, 0), min(screen_y + scale, height)):
+                            row = sy * width
+                            for sx in range(max(screen_x, 0), min(screen_x + scale, width)):
+                                frame[row + sx] = shade
+
+
+# Columns compared at a time when diffing, and how far apart two changes in
+# a row can be and still count as one region.
+DIFF_BLOCK = 8
+DIFF_GAP = 16
+
+
+# Changed spans in one row, as [first, last] columns.
+def _changed_spans(old, new, width):
+    spans = []
+
+    for x in range(0, width, DIFF_BLOCK):
+        end = min(x + DIFF_BLOCK, width)
+
+        if old[x:end] == new[x:end]:
+            continue
+
+        first = x
+        while old[first] == new[first]:
+            first += 1
+
+        last = end - 1
+        while old[last] == new[last]:
+            last -= 1
+
+        if spans and first - spans[-1][1] <= DIFF_GAP:
+            spans[-1][1] = last
+        else:
+            spans.append([first, last])
+
+    return spans
+
+
+# Remove item from items by identity; returns whether it was there.
+def _remove(items, item):
+    for i, candidate in enumerate(items):
+        if candidate is item:
+            del items[i]
+            return True
+
+    return False
+
+
+# Regions that differ between two frames, as (x, y, width, height). Rows are
+# compared a block at a time as byte strings; nearby changes in a row become
+# spans, and spans that overlap one in the row above grow its region.
+def changed_regions(before, after, width, height):
+    done = []
+    open_regions = []
+
+    for y in range(height):
+        start = y * width
+        old = before[start:start + width]
+        new = after[start:start + width]
+        spans = _changed_spans(old, new, width) if old != new else []
+        still_open = []
+
+        for first, last in spans:
+            touching = [r for r in open_regions + still_open if r[0] <= last + 1 and first - 1 <= r[2]]
+
+            if touching:
+                region = touching[0]
+                for other in touching[1:]:
+                    region[0] = min(region[0], other[0])
+                    region[1] = min(region[1], other[1])
+                    region[2] = max(region[2], other[2])
+                    _remove(open_regions, other)
+                    _remove(still_open, other)
+                region[0] = min(region[0], first)
+                region[2] = max(region[2], last)
+                region[3] = y
+
+                if _remove(open_regions, region):
+                    still_open.append(region)
+            else:
+                still_open.append([first, y, last, y])
+
+        done += open_regions
+        open_regions = still_open
+
+    done += open_regions
+
+    # A region can end up overlapping one that grew around it later.
+    merged = []
+
+    for region in sorted(done, key=lambda r: (r[1], r[0])):
+        for other in merged:
+            if region[0] <= other[2] and other[0] <= region[2] and region[1] <= other[3] and other[1] <= region[3]:
+                other[0] = min(other[0], region[0])
+                other[1] = min(other[1], region[1])
+                other[2] = max(other[2], region[2])
+                other[3] = max(other[3], region[3])
+                break
+        else:
+            merged.append(region)
+
+    return [(x1, y1, x2 - x1 + 1, y2 - y1 + 1) for x1, y1, x2, y2 in merged]
+
+
+# Frame with the changed regions outlined in black and dimmed elsewhere.
+def diff_frame(frame, regions, width, height):
+    image = bytearray(WHITE - (WHITE - b) // 3 for b in frame)
+
+    for x, y, w, h in regions:
+        for row in range(y, y + h):
+            image[row * width + x:row * width + x + w] = frame[row * width + x:row * width + x + w]
+
+        for px in range(x, x + w):
+            image[y * width + px] = 0
+            image[(y + h - 1) * width + px] = 0
+
+        for py in range(y, y + h):
+            image[py * width + x] = 0
+            image[py * width + x + w - 1] = 0
+
+    return image
+
+
+# 8 bit grayscale PNG.
+def write_png(path, frame, width, height):
+    raw = b"".join(b"\x00" + bytes(frame[y * width:(y + 1) * width]) for y in range(height))
+
+    def chunk(kind, data):
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data) & 0xFFFFFFFF)
+
+    with open(path, "wb") as f:
+        f.write(b"\x89PNG\r\n\x1a\n")
+        f.write(chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 0, 0, 0, 0)))
+        f.write(chunk(b"IDAT", zlib.compress(raw, 9)))
+        f.write(chunk(b"IEND", b""))
+
+
+class Simulator:
+    def __init__(self, out_dir, refreshes, start_time, diff=False, levels=GRAY_LEVELS):
+        self._out_dir = out_dir
+        self._refreshes = refreshes
+        self._diff = diff
+        self._renderer = Renderer(levels=levels)
+        self._time = runtime.VirtualTime(start_time)
+        self._previous = None
+        self.frames = 0
+        self.render_ns = []
+
+    def on_store(self, name, value):
+        if name == "time":
+            return self._time
+
+        return value
+
+    def on_refresh(self, display):
+        start = time.perf_counter_ns()
+        frame = self._renderer.render(display.root_group)
+        self.render_ns.append(time.perf_counter_ns() - start)
+        self.frames += 1
+
+        width, height = self._renderer.width, self._renderer.height
+        path = os.path.join(self._out_dir, f"frame-{self.frames:04d}.png")
+        write_png(path, frame, width, height)
+
+        line = f"{path}: rendered in {self.render_ns[-1] / 1e6:.1f} ms"
+
+        if self._diff and self._previous is not None:
+            start = time.perf_counter_ns()
+            regions = changed_regions(self._previous, frame, width, height)
+            diff_ms = (time.perf_counter_ns() - start) / 1e6
+            pixels = sum(w * h for _, _, w, h in regions)
+            line += f", {len(regions)} changed regions ({pixels} px, diffed in {diff_ms:.2f} ms)"
+
+            for x, y, w, h in regions:
+                line += f"\n    x={x} y={y} {w}x{h}"
+
+            write_png(os.path.join(self._out_dir, f"frame-{self.frames:04d}-diff.png"),
+                      diff_frame(frame, regions, width, height), width, height)
+
+        print(line, file=sys.stderr)
+        self._previous = frame
+
+        if self.frames >= self._refreshes:
+            raise SimulationFinished()
+
+    def run(self, replay):
+        import adafruit_ticks
+        import board
+        import socketpool
+        import supervisor
+
+        socketpool.handler = replay
+        adafruit_ticks.step_ms = 1000
+        board.DISPLAY.on_refresh = self.on_refresh
+
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                runtime.run_firmware(on_store=self.on_store)
+        except SimulationFinished:
+            pass
+        except supervisor.ReloadRequested:
+            print("Firmware requested a reload, stopping early.", file=sys.stderr)
+        finally:
+            board.DISPLAY.on_refresh = None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m host.display_sim", description=__doc__)
+    parser.add_argument("--out", required=True, help="directory to write PNG frames to")
+    parser.add_argument("--trace", default=DEFAULT_TRACE, help="recorded responses to replay")
+    parser.add_argument("--refreshes", type=int, default=3, help="display refreshes to capture")
+    parser.add_argument("--diff", action="store_true", help="report and draw changed regions between frames")
+    parser.add_argument("--full-gray", action="store_true", help="keep all 256 gray levels instead of the panel's four")
+    args = parser.parse_args(argv)
+
+    out_dir = os.path.abspath(args.out)
+    os.makedirs(out_dir, exist_ok=True)
+
+    runtime.install()
+
+    metadata, entries = load_trace(args.trace)
+    simulator = Simulator(out_dir, args.refreshes, metadata.get("start", int(time.time())),
+                          diff=args.diff, levels=None if args.full_gray else GRAY_LEVELS)
+    simulator.run(TraceReplay(entries))
+
+    if simulator.frames:
+        mean_ms = sum(simulator.render_ns) / len(simulator.render_ns) / 1e6
+        print(f"{simulator.frames} frames, {mean_ms:.1f} ms per render", file=sys.stderr)
+
+    return 0 if simulator.frames else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
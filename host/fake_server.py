@@ -0,0 +1,128 @@
+# A local HTTP server standing in for Open Notify, CelesTrak and Geoapify,
+# which can be told to fail in particular ways, for exercising the
+# firmware's network error handling over real sockets.
+#
+# Point the socketpool stand-in at it (socketpool.redirect = server.address)
+# and every request the firmware makes, http or https, lands here. Each
+# endpoint serves its first recorded response from a trace, unless faults
+# are queued for it:
+#   "error"    503 Service Unavailable
+#   "limited"  429 Too Many Requests
+#   "reset"    the connection is closed without a response
+#   "garbage"  200 with a body cut off halfway
+import http.server
+import os
+import threading
+
+from host import runtime
+from host.replay import endpoint, load_trace
+
+DEFAULT_TRACE = os.path.join(runtime.TRACES_DIR, "pacific-to-quebec.jsonl")
+
+FAULTS = ("error", "limited", "reset", "garbage")
+
+
+class FakeServer:
+    def __init__(self, trace=DEFAULT_TRACE):
+        _, entries = load_trace(trace)
+        self._bodies = {}
+
+        # Keyed by path, since every host resolves to this server.
+        for entry in entries:
+            path = "/" + endpoint(entry["url"]).split("/", 1)[1]
+            self._bodies.setdefault(path, entry["body"].encode("utf-8"))
+
+        self._faults = {}
+        self._lock = threading.Lock()
+        self.hits = {}
+
+        server = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                server._serve(self)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._httpd = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+
+    @property
+    def address(self):
+        return self._httpd.server_address
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    # Queue faults for the next requests to any endpoint whose path starts with prefix.
+    def fail(self, prefix, *faults):
+        for fault in faults:
+            if fault not in FAULTS:
+                raise ValueError(f"Unknown fault {fault!r}")
+
+        with self._lock:
+            self._faults.setdefault(prefix, []).extend(faults)
+
+    # Fail every request to every endpoint until clear() is called.
+    def fail_always(self, fault):
+        with self._lock:
+            self._faults[""] = fault
+
+    def clear(self):
+        with self._lock:
+            self._faults = {}
+
+    def hit_count(self, prefix):
+        return sum(count for path, count in self.hits.items() if path.startswith(prefix))
+
+    def _next_fault(self, path):
+        with self._lock:
+            self.hits[path] = self.hits.get(path, 0) + 1
+
+            for prefix, faults in self._faults.items():
+                if not path.startswith(prefix):
+                    continue
+
+                if isinstance(faults, str):
+                    return faults
+
+                if faults:
+                    return faults.pop(0)
+
+        return None
+
+    def _serve(self, request):
+        path = request.path.split("?", 1)[0]
+        fault = self._next_fault(path)
+        body = self._bodies.get(path)
+
+        if fault == "reset":
+            request.close_connection = True
+            request.connection.close()
+            return
+
+        if fault == "error":
+            status, body = 503, b"Service Unavailable"
+        elif fault == "limited":
+            status, body = 429, b"Too Many Requests"
+        elif body is None:
+            status, body = 404, b"Not Found"
+        else:
+            status = 200
+
+            if fault == "garbage":
+                body = body[:len(body) // 2]
+
+        request.send_response(status)
+        request.send_header("Content-Length", str(len(body)))
+        request.send_header("Connection", "keep-alive")
+        request.end_headers()
+        request.wfile.write(body)
@@ -0,0 +1,97 @@
+# Serves recorded HTTP responses to the firmware through the socketpool
+# stand-in.
+#
+# A trace is a JSON-lines file. The first line holds metadata:
+#   {"trace": name, "start": unix time the recording started}
+# followed by one response per line:
+#   {"t": ms since trace start, "url": ..., "status": 200, "elapsed": ms, "body": "..."}
+# Responses are matched to requests by host and path, and served in recorded
+# order per endpoint, starting over when an endpoint runs out. Requests with
+# lat and lon query parameters (reverse geocoding) instead get the recorded
+# response for the nearest position, since the firmware may skip some of
+# them. Recorded latency advances the virtual tick clock rather than sleeping.
+import json
+
+
+def endpoint(url):
+    url = url.split("://", 1)[-1]
+    return url.split("?", 1)[0]
+
+
+# (lat, lon) from a URL's query string, or None if it doesn't have both.
+def position(url):
+    query = url.split("?", 1)[1] if "?" in url else ""
+    params = dict(param.split("=", 1) for param in query.split("&") if "=" in param)
+
+    try:
+        return float(params["lat"]), float(params["lon"])
+    except (KeyError, ValueError):
+        return None
+
+
+# Returns (metadata, entries)
+def load_trace(path):
+    metadata = {}
+    entries = []
+
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+
+            record = json.loads(line)
+            if "url" in record:
+                entries.append(record)
+            else:
+                metadata.update(record)
+
+    return metadata, entries
+
+
+class TraceReplay:
+    def __init__(self, entries):
+        self._entries = {}
+        self._positions = {}
+        self.served = 0
+
+        for entry in entries:
+            self._entries.setdefault(endpoint(entry["url"]), []).append(entry)
+
+    def count(self, url):
+        return len(self._entries.get(endpoint(url), ()))
+
+    def __call__(self, method, url, headers):
+        import adafruit_requests
+        import adafruit_ticks
+
+        key = endpoint(url)
+        entries = self._entries.get(key)
+
+        if not entries:
+            raise OSError(f"No recorded response for {key}")
+
+        requested = position(url)
+
+        if requested is not None and all(position(entry["url"]) is not None for entry in entries):
+            entry = min(entries, key=lambda entry: _squared_distance(requested, position(entry["url"])))
+        else:
+            index = self._positions.get(key, 0)
+
+            if index >= len(entries):
+                index = 0
+
+            self._positions[key] = index + 1
+            entry = entries[index]
+
+        self.served += 1
+
+        adafruit_ticks.advance(entry["elapsed"])
+        return adafruit_requests.Response(entry["body"], status_code=entry["status"])
+
+
+# Good enough to find the nearest recorded position; longitude wraps.
+def _squared_distance(a, b):
+    d_lon = abs(a[1] - b[1]) % 360
+    d_lon = min(d_lon, 360 - d_lon)
+    return (a[0] - b[0]) ** 2 + d_lon ** 2
@@ -0,0 +1,94 @@
+# Runs the CIRCUITPY firmware on desktop CPython.
+#
+# The stand-ins in host/stubs replace the CircuitPython-only modules (board,
+# displayio, wifi, the bundled .mpy libraries, ...). The firmware's own modules
+# are imported straight from CIRCUITPY, so what gets measured is the code that
+# ships to the device.
+import builtins
+import gc
+import os
+import sys
+import time
+
+HOST_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(HOST_DIR)
+CIRCUITPY_DIR = os.path.join(REPO_DIR, "CIRCUITPY")
+STUBS_DIR = os.path.join(HOST_DIR, "stubs")
+TRACES_DIR = os.path.join(HOST_DIR, "traces")
+
+_installed = False
+
+# Make the stand-ins and firmware importable, and mimic the device's working
+# directory and settings.toml environment.
+def install():
+    global _installed
+
+    if _installed:
+        return
+
+    sys.path.insert(0, STUBS_DIR)
+    sys.path.insert(1, CIRCUITPY_DIR)
+    os.chdir(CIRCUITPY_DIR)
+
+    os.environ.setdefault("WIFI_SSID", "host")
+    os.environ.setdefault("WIFI_PASSWORD", "host")
+    os.environ.setdefault("GEOAPIFY_KEY", "host")
+
+    # CPython's gc has no heap statistics; the firmware only prints these.
+    if not hasattr(gc, "mem_free"):
+        gc.mem_free = lambda: 0
+        gc.mem_alloc = lambda: 0
+
+    _installed = True
+
+# Stands in for the time module in code.py when the firmware runs on the
+# virtual tick clock: wall-clock time starts at `start` (unix seconds) and
+# advances with adafruit_ticks. Like the MagTag's RTC, localtime() is UTC.
+class VirtualTime:
+    def __init__(self, start):
+        self._start = start
+
+    def __getattr__(self, name):
+        return getattr(time, name)
+
+    def time(self):
+        import adafruit_ticks
+        return self._start + adafruit_ticks.elapsed_ms() // 1000
+
+    def localtime(self, secs=None):
+        return time.gmtime(self.time() if secs is None else secs)
+
+# Module-level names stored by code.py pass through on_store(name, value),
+# which may return a replacement (e.g. an instrumented function).
+# All reads and writes land in the real globals dict, so functions defined
+# in code.py see the replacements too.
+class _FirmwareNamespace:
+    def __init__(self, globals_dict, on_store):
+        self._globals = globals_dict
+        self._on_store = on_store
+
+    def __getitem__(self, name):
+        return self._globals[name]
+
+    def __setitem__(self, name, value):
+        if self._on_store is not None:
+            value = self._on_store(name, value)
+        self._globals[name] = value
+
+    def __delitem__(self, name):
+        del self._globals[name]
+
+    def __contains__(self, name):
+        return name in self._globals
+
+# Execute code.py. Returns only when the firmware raises a BaseException
+# that isn't caught by its own handlers (host tools use those to stop it).
+def run_firmware(on_store=None):
+    install()
+
+    path = os.path.join(CIRCUITPY_DIR, "code.py")
+    with open(path, "r") as f:
+        code = compile(f.read(), path, "exec")
+
+    firmware_globals = {"__name__": "__main__", "__file__": path, "__builtins__": builtins}
+    exec(code, firmware_globals, _FirmwareNamespace(firmware_globals, on_store))
@@ -0,0 +1,151 @@
+# Runs the firmware for thousands of refresh cycles against synthetic
+# network responses (network_transport.SyntheticTransport), to find memory
+# that grows with every cycle.
+#
+# The firmware runs against the stand-ins in host/stubs on the virtual tick
+# clock, so hours of operation take seconds. Every --every cycles, after a
+# collection, the traced Python heap and the allocated block count are
+# sampled; once the warmup is over, they should stay flat. (The geodata
+# cache takes about a thousand cycles to fill, with SyntheticTransport's
+# places; the layout cache and fonts fill sooner.)
+#
+# Usage, from the repository root:
+#   python -m host.soak
+#   python -m host.soak --cycles 10000 --every 1000 --tolerance 32
+import argparse
+import contextlib
+import gc
+import os
+import sys
+import time
+import tracemalloc
+
+from host import runtime
+
+# A new cycle begins each time this is called.
+CYCLE_NAME = "position_source"
+CYCLE_METHOD = "position"
+
+
+class SoakFinished(BaseException):
+    pass
+
+
+class Soak:
+    def __init__(self, cycles, every, warmup, start_time):
+        self._cycles = cycles
+        self._every = every
+        self._warmup = warmup
+        self._time = runtime.VirtualTime(start_time)
+        self._cycle = 0
+        self._wall_start = None
+
+        # (cycle, traced bytes, allocated blocks, wall seconds)
+        self.samples = []
+
+    def _sample(self):
+        gc.collect()
+        traced = tracemalloc.get_traced_memory()[0]
+        self.samples.append((self._cycle, traced, sys.getallocatedblocks(), time.perf_counter() - self._wall_start))
+
+    def _counted(self, func):
+        def counted(*args, **kwargs):
+            if self._cycle >= self._warmup and (self._cycle - self._warmup) % self._every == 0:
+                self._sample()
+
+            if self._cycle == self._warmup + self._cycles:
+                raise SoakFinished()
+
+            self._cycle += 1
+            return func(*args, **kwargs)
+
+        return counted
+
+    # Hook for runtime.run_firmware.
+    def on_store(self, name, value):
+        if name == "time":
+            return self._time
+
+        if name == CYCLE_NAME and value is not None:
+            setattr(value, CYCLE_METHOD, self._counted(getattr(value, CYCLE_METHOD)))
+
+        return value
+
+    def run(self, verbose=False):
+        import adafruit_ticks
+        import config
+        import supervisor
+
+        config.NETWORK_TRANSPORT = "synthetic"
+        # One ticks_ms() call is one second, as in host.benchmark.
+        adafruit_ticks.step_ms = 1000
+
+        # Output is thrown away rather than captured, which would grow too.
+        sink = None if verbose else open(os.devnull, "w")
+        output = contextlib.nullcontext() if verbose else contextlib.redirect_stdout(sink)
+        self._wall_start = time.perf_counter()
+        tracemalloc.start()
+
+        try:
+            with output:
+                runtime.run_firmware(on_store=self.on_store)
+        except SoakFinished:
+            pass
+        except supervisor.ReloadRequested:
+            print(f"Firmware requested a reload after {self._cycle} cycles, stopping early.", file=sys.stderr)
+        finally:
+            tracemalloc.stop()
+
+            if sink is not None:
+                sink.close()
+
+        return self._cycle
+
+
+def _print_samples(samples):
+    header = f"{'cycle':>7} {'heap KiB':>10} {'blocks':>9} {'wall s':>8}"
+    print(header)
+    print("-" * len(header))
+
+    for cycle, traced, blocks, wall_s in samples:
+        print(f"{cycle:>7} {traced / 1024:>10.1f} {blocks:>9} {wall_s:>8.2f}")
+
+    print("-" * len(header))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m host.soak", description=__doc__)
+    parser.add_argument("--cycles", type=int, default=3000, help="refresh cycles to run after the warmup")
+    parser.add_argument("--every", type=int, default=500, help="cycles between memory samples")
+    parser.add_argument("--warmup", type=int, default=1000, help="cycles to run before the first sample")
+    parser.add_argument("--tolerance", type=float, default=64.0, help="allowed heap growth over the run, in KiB")
+    parser.add_argument("--verbose", action="store_true", help="show the firmware's console output")
+    args = parser.parse_args(argv)
+
+    runtime.install()
+
+    soak = Soak(cycles=args.cycles, every=args.every, warmup=args.warmup, start_time=int(time.time()))
+    cycles = soak.run(verbose=args.verbose)
+    samples = soak.samples
+
+    _print_samples(samples)
+
+    if len(samples) < 2:
+        print(f"Only {cycles} cycles ran, not enough to measure growth")
+        return 1
+
+    first, last = samples[0], samples[-1]
+    measured = last[0] - first[0]
+    growth_kib = (last[1] - first[1]) / 1024
+    print(f"{measured} cycles: heap {growth_kib:+.1f} KiB ({growth_kib * 1024 / measured:+.1f} bytes per cycle), "
+          f"blocks {last[2] - first[2]:+d}, {last[3] - first[3]:.1f} s wall time")
+
+    if growth_kib > args.tolerance:
+        print(f"GROWTH heap grew by more than {args.tolerance:.0f} KiB")
+        return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,70 @@
+# Desktop stand-in for adafruit_bitmap_font.bitmap_font. BDF files are parsed
+# completely on load; load_glyphs() is a no-op.
+import displayio
+from fontio import Glyph, FontProtocol
+
+
+class BDF(FontProtocol):
+    def __init__(self, filename, bitmap_class=displayio.Bitmap):
+        self._glyphs = {}
+        self._bounding_box = (0, 0, 0, 0)
+        self.ascent = 0
+        self.descent = 0
+        self.load_count = 0
+
+        with open(filename, "r") as f:
+            self._parse(f, bitmap_class)
+
+    def _parse(self, f, bitmap_class):
+        encoding = None
+        shift_x = shift_y = 0
+        width = height = dx = dy = 0
+        rows = None
+
+        for line in f:
+            if rows is not None:
+                if line.startswith("ENDCHAR"):
+                    if encoding is not None and encoding >= 0:
+                        bitmap = bitmap_class(width, height, 2)
+                        for y, row in enumerate(rows):
+                            bits = int(row, 16) if row else 0
+                            row_bits = len(row) * 4
+                            for x in range(width):
+                                if bits & (1 << (row_bits - 1 - x)):
+                                    bitmap[x, y] = 1
+                        self._glyphs[encoding] = Glyph(bitmap, 0, width, height, dx, dy, shift_x, shift_y)
+                    rows = None
+                    encoding = None
+                else:
+                    rows.append(line.strip())
+                continue
+
+            if line.startswith("FONTBOUNDINGBOX"):
+                self._bounding_box = tuple(int(v) for v in line.split()[1:5])
+            elif line.startswith("FONT_ASCENT"):
+                self.ascent = int(line.split()[1])
+            elif line.startswith("FONT_DESCENT"):
+                self.descent = int(line.split()[1])
+            elif line.startswith("ENCODING"):
+                encoding = int(line.split()[1])
+            elif line.startswith("DWIDTH"):
+                shift_x, shift_y = (int(v) for v in line.split()[1:3])
+            elif line.startswith("BBX"):
+                width, height, dx, dy = (int(v) for v in line.split()[1:5])
+            elif line.startswith("BITMAP"):
+                rows = []
+
+    def get_bounding_box(self):
+        return self._bounding_box
+
+    def load_glyphs(self, code_points):
+        self.load_count += 1
+
+    def get_glyph(self, code_point):
+        return self._glyphs.get(code_point)
+
+
+def load_font(filename, bitmap=None):
+    if bitmap is None:
+        return BDF(filename)
+    return BDF(filename, bitmap)
@@ -0,0 +1,30 @@
+# Desktop stand-in for adafruit_connection_manager.
+import ssl
+
+
+# Like CircuitPython's, wrap_socket() returns a socket that does the TLS
+# handshake in connect(). Sockets from the socketpool stand-in's handler,
+# and redirected ones, skip TLS.
+class _SSLContext:
+    def __init__(self):
+        self._context = ssl.create_default_context()
+
+    def wrap_socket(self, sock, server_side=False, server_hostname=None):
+        if hasattr(sock, "start_tls"):
+            sock.start_tls(server_hostname)
+            return sock
+
+        import socketpool
+        if socketpool.redirect is not None:
+            return sock
+
+        return self._context.wrap_socket(sock, server_side=server_side, server_hostname=server_hostname)
+
+
+def get_radio_ssl_context(radio):
+    return _SSLContext()
+
+
+def get_radio_socketpool(radio):
+    import socketpool
+    return socketpool.SocketPool(radio)
@@ -0,0 +1,22 @@
+# Desktop stand-in for adafruit_debouncer. Host tools can queue presses with
+# press(), which report `fell` on the next update().
+
+
+class Debouncer:
+    def __init__(self, io, interval=0.010):
+        self._io = io
+        self._pending_presses = 0
+        self.fell = False
+        self.rose = False
+
+    def press(self):
+        self._pending_presses += 1
+
+    def update(self):
+        self.fell = self._pending_presses > 0
+        if self.fell:
+            self._pending_presses -= 1
+
+    @property
+    def value(self):
+        return not self.fell
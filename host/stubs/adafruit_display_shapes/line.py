@@ -0,0 +1,21 @@
+# Desktop stand-in for adafruit_display_shapes.line.
+import displayio
+
+
+class Line(displayio.TileGrid):
+    def __init__(self, x0, y0, x1, y1, color):
+        left, top = min(x0, x1), min(y0, y1)
+        width = abs(x1 - x0) + 1
+        height = abs(y1 - y0) + 1
+
+        self._bitmap = displayio.Bitmap(width, height, 2)
+        self._palette = displayio.Palette(2)
+        self._palette.make_transparent(0)
+        self._palette[1] = color
+
+        steps = max(width, height) - 1
+        for s in range(steps + 1):
+            t = s / steps if steps else 0
+            self._bitmap[round(x0 - left + (x1 - x0) * t), round(y0 - top + (y1 - y0) * t)] = 1
+
+        super().__init__(self._bitmap, pixel_shader=self._palette, x=left, y=top)
@@ -0,0 +1,36 @@
+# Desktop stand-in for adafruit_display_shapes.rect.
+import displayio
+
+
+class Rect(displayio.TileGrid):
+    def __init__(self, x, y, width, height, *, fill=None, outline=None, stroke=1):
+        self._bitmap = displayio.Bitmap(width, height, 2)
+        self._palette = displayio.Palette(2)
+
+        if outline is not None:
+            for w in range(width):
+                for line in range(stroke):
+                    self._bitmap[w, line] = 1
+                    self._bitmap[w, height - 1 - line] = 1
+            for _h in range(height):
+                for line in range(stroke):
+                    self._bitmap[line, _h] = 1
+                    self._bitmap[width - 1 - line, _h] = 1
+            self._palette[1] = outline
+        else:
+            self._palette.make_transparent(1)
+
+        if fill is not None:
+            self._palette[0] = fill
+        else:
+            self._palette.make_transparent(0)
+
+        super().__init__(self._bitmap, pixel_shader=self._palette, x=x, y=y)
+
+    @property
+    def fill(self):
+        return None if self._palette.is_transparent(0) else self._palette[0]
+
+    @property
+    def outline(self):
+        return None if self._palette.is_transparent(1) else self._palette[1]
@@ -0,0 +1,49 @@
+# Desktop stand-in for adafruit_display_shapes.roundrect.
+import displayio
+
+
+class RoundRect(displayio.TileGrid):
+    # Palette index 0 is transparent, 1 is the fill and 2 is the outline.
+    def __init__(self, x, y, width, height, r, *, fill=None, outline=None, stroke=1):
+        self._bitmap = displayio.Bitmap(width, height, 3)
+        self._palette = displayio.Palette(3)
+        self._palette.make_transparent(0)
+        self._r = r
+
+        cx = (width - 1) / 2
+        cy = (height - 1) / 2
+        half_w = width / 2 - r
+        half_h = height / 2 - r
+        limit = r * r + r
+
+        for py in range(height):
+            for px in range(width):
+                # Distance from the rounded core rectangle
+                ox = max(abs(px - cx) - half_w + 0.5, 0)
+                oy = max(abs(py - cy) - half_h + 0.5, 0)
+                d = ox * ox + oy * oy
+
+                if d > limit:
+                    continue
+
+                inner = max(r - stroke, 0)
+                if outline is not None and d > inner * inner + inner:
+                    self._bitmap[px, py] = 2
+                elif fill is not None:
+                    self._bitmap[px, py] = 1
+
+        if fill is not None:
+            self._palette[1] = fill
+        else:
+            self._palette.make_transparent(1)
+
+        if outline is not None:
+            self._palette[2] = outline
+        else:
+            self._palette.make_transparent(2)
+
+        super().__init__(self._bitmap, pixel_shader=self._palette, x=x, y=y)
+
+    @property
+    def r(self):
+        return self._r
@@ -0,0 +1,51 @@
+# Desktop stand-in for adafruit_display_shapes.triangle.
+import displayio
+
+
+def _edge(ax, ay, bx, by, px, py):
+    return (bx - ax) * (py - ay) - (by - ay) * (px - ax)
+
+
+class Triangle(displayio.TileGrid):
+    def __init__(self, x0, y0, x1, y1, x2, y2, *, fill=None, outline=None):
+        xs = (x0, x1, x2)
+        ys = (y0, y1, y2)
+        left, top = min(xs), min(ys)
+        width = max(xs) - left + 1
+        height = max(ys) - top + 1
+
+        self._bitmap = displayio.Bitmap(width, height, 3)
+        self._palette = displayio.Palette(3)
+        self._palette.make_transparent(0)
+
+        points = [(x - left, y - top) for x, y in zip(xs, ys)]
+        (ax, ay), (bx, by), (cx, cy) = points
+        area = _edge(ax, ay, bx, by, cx, cy)
+
+        for py in range(height):
+            for px in range(width):
+                w0 = _edge(bx, by, cx, cy, px, py)
+                w1 = _edge(cx, cy, ax, ay, px, py)
+                w2 = _edge(ax, ay, bx, by, px, py)
+                if area < 0:
+                    w0, w1, w2 = -w0, -w1, -w2
+                if w0 >= 0 and w1 >= 0 and w2 >= 0:
+                    self._bitmap[px, py] = 1
+
+        if outline is not None:
+            for i in range(3):
+                sx, sy = points[i]
+                ex, ey = points[(i + 1) % 3]
+                steps = max(abs(ex - sx), abs(ey - sy), 1)
+                for s in range(steps + 1):
+                    self._bitmap[round(sx + (ex - sx) * s / steps), round(sy + (ey - sy) * s / steps)] = 2
+            self._palette[2] = outline
+        else:
+            self._palette.make_transparent(2)
+
+        if fill is not None:
+            self._palette[1] = fill
+        else:
+            self._palette.make_transparent(1)
+
+        super().__init__(self._bitmap, pixel_shader=self._palette, x=left, y=top)
@@ -0,0 +1,161 @@
+# Desktop stand-in for adafruit_display_text.label. Like the real Label, it is
+# a Group holding one TileGrid per glyph, rebuilt whenever text or font change.
+import displayio
+
+
+class Label(displayio.Group):
+    def __init__(self, font, *, text="", color=0xFFFFFF, background_color=None,
+                 anchor_point=None, anchored_position=None, scale=1, x=0, y=0,
+                 line_spacing=1.25, **kwargs):
+        super().__init__(x=x, y=y, scale=scale)
+        self._font = font
+        self._text = ""
+        self._line_spacing = line_spacing
+        self._palette = displayio.Palette(2)
+        self._color = color
+        self._background_color = background_color
+        self._anchor_point = anchor_point
+        self._anchored_position = anchored_position
+        self._bounding_box = (0, 0, 0, 0)
+        self._apply_colors()
+        self._update_text(text)
+
+    def _ascent_descent(self):
+        if hasattr(self._font, "ascent") and hasattr(self._font, "descent"):
+            return self._font.ascent, self._font.descent
+
+        _, height, _, y_offset = self._font.get_bounding_box()
+        return height + y_offset, -y_offset
+
+    def _apply_colors(self):
+        self._palette[1] = self._color if self._color is not None else 0
+        if self._color is None:
+            self._palette.make_transparent(1)
+        else:
+            self._palette.make_opaque(1)
+
+        if self._background_color is None:
+            self._palette.make_transparent(0)
+        else:
+            self._palette[0] = self._background_color
+            self._palette.make_opaque(0)
+
+    def _update_text(self, text):
+        while len(self):
+            self.pop()
+
+        self._text = text
+        ascent, descent = self._ascent_descent()
+        y_offset = ascent // 2
+        line_height = int((ascent + descent) * self._line_spacing)
+
+        x = 0
+        y = 0
+        right = 0
+        for char in text:
+            if char == "\n":
+                x = 0
+                y += line_height
+                continue
+
+            glyph = self._font.get_glyph(ord(char))
+            if glyph is None:
+                continue
+
+            if glyph.width > 0 and glyph.height > 0:
+                self.append(displayio.TileGrid(
+                    glyph.bitmap,
+                    pixel_shader=self._palette,
+                    default_tile=glyph.tile_index,
+                    tile_width=glyph.width,
+                    tile_height=glyph.height,
+                    x=x + glyph.dx,
+                    y=y - glyph.height - glyph.dy + y_offset,
+                ))
+
+            x += glyph.shift_x
+            right = max(right, x)
+
+        top = y_offset - ascent
+        height = y + ascent + descent
+        self._bounding_box = (0, top, right, height)
+
+        if self._background_color is not None and right > 0:
+            background = displayio.Bitmap(right, height, 1)
+            self.insert(0, displayio.TileGrid(background, pixel_shader=self._palette, x=0, y=top))
+
+        self._reposition()
+
+    def _reposition(self):
+        if self._anchor_point is None or self._anchored_position is None:
+            return
+
+        box_x, box_y, box_w, box_h = self._bounding_box
+        self.x = int(self._anchored_position[0] - box_x * self.scale - round(self._anchor_point[0] * box_w * self.scale))
+        self.y = int(self._anchored_position[1] - box_y * self.scale - round(self._anchor_point[1] * box_h * self.scale))
+
+    @property
+    def text(self):
+        return self._text
+
+    @text.setter
+    def text(self, new_text):
+        self._update_text(str(new_text))
+
+    @property
+    def font(self):
+        return self._font
+
+    @font.setter
+    def font(self, new_font):
+        self._font = new_font
+        self._update_text(self._text)
+
+    @property
+    def color(self):
+        return self._color
+
+    @color.setter
+    def color(self, new_color):
+        self._color = new_color
+        self._apply_colors()
+
+    @property
+    def background_color(self):
+        return self._background_color
+
+    @background_color.setter
+    def background_color(self, new_color):
+        self._background_color = new_color
+        self._apply_colors()
+        self._update_text(self._text)
+
+    @property
+    def anchor_point(self):
+        return self._anchor_point
+
+    @anchor_point.setter
+    def anchor_point(self, new_anchor_point):
+        self._anchor_point = new_anchor_point
+        self._reposition()
+
+    @property
+    def anchored_position(self):
+        return self._anchored_position
+
+    @anchored_position.setter
+    def anchored_position(self, new_position):
+        self._anchored_position = new_position
+        self._reposition()
+
+    @property
+    def bounding_box(self):
+        return self._bounding_box
+
+    @property
+    def width(self):
+        return self._bounding_box[2]
+
+    @property
+    def height(self):
+        return self._bounding_box[3]
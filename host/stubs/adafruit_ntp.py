@@ -0,0 +1,11 @@
+# Desktop stand-in for adafruit_ntp, answering from the host clock.
+import time
+
+
+class NTP:
+    def __init__(self, socketpool, *, server="0.adafruit.pool.ntp.org", port=123, tz_offset=0, socket_timeout=10, cache_seconds=0):
+        self._tz_offset = tz_offset
+
+    @property
+    def datetime(self):
+        return time.gmtime(time.time() + self._tz_offset * 3600)
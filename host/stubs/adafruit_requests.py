@@ -0,0 +1,58 @@
+# Desktop stand-in for adafruit_requests. There is no live network on the
+# host: requests are answered by `handler`, a callable installed by host tools
+# that takes (method, url, headers) and returns a Response.
+import json as _json
+
+handler = None
+
+
+class Response:
+    def __init__(self, body, status_code=200, headers=None):
+        if isinstance(body, str):
+            body = body.encode("utf-8")
+        self._body = body
+        self.status_code = status_code
+        self.headers = headers or {}
+        self.reason = b"OK"
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        pass
+
+    @property
+    def content(self):
+        return self._body
+
+    @property
+    def text(self):
+        return self._body.decode("utf-8")
+
+    def json(self):
+        return _json.loads(self._body)
+
+    def iter_content(self, chunk_size=1, decode_unicode=False):
+        for i in range(0, len(self._body), chunk_size):
+            yield self._body[i:i + chunk_size]
+
+
+class Session:
+    def __init__(self, socket_pool, ssl_context=None, session_id=None):
+        self._socket_pool = socket_pool
+        self._ssl_context = ssl_context
+
+    def request(self, method, url, data=None, json=None, headers=None, stream=False, timeout=60):
+        if handler is None:
+            raise OSError("No network on the host: install adafruit_requests.handler")
+
+        return handler(method, url, headers or {})
+
+    def get(self, url, **kw):
+        return self.request("GET", url, **kw)
+
+    def post(self, url, **kw):
+        return self.request("POST", url, **kw)
@@ -0,0 +1,44 @@
+# Desktop stand-in for adafruit_ticks. By default ticks follow the wall clock.
+# Host tools can switch to a virtual clock by setting step_ms (advanced on
+# every ticks_ms() call) and/or calling advance() to simulate elapsed time.
+import time
+
+_TICKS_PERIOD = 1 << 29
+_TICKS_MAX = _TICKS_PERIOD - 1
+_TICKS_HALFPERIOD = _TICKS_PERIOD // 2
+
+step_ms = None
+_virtual_ms = 0
+_elapsed_ms = 0
+
+
+def advance(ms):
+    global _virtual_ms, _elapsed_ms
+    _virtual_ms = (_virtual_ms + int(ms)) & _TICKS_MAX
+    _elapsed_ms += int(ms)
+
+
+# Total virtual time advanced so far, without wrapping.
+def elapsed_ms():
+    return _elapsed_ms
+
+
+def ticks_ms():
+    if step_ms is None:
+        return int(time.monotonic() * 1000) & _TICKS_MAX
+
+    advance(step_ms)
+    return _virtual_ms
+
+
+def ticks_add(ticks, delta):
+    return (ticks + delta) % _TICKS_PERIOD
+
+
+def ticks_diff(ticks1, ticks2):
+    diff = (ticks1 - ticks2) & _TICKS_MAX
+    return ((diff + _TICKS_HALFPERIOD) & _TICKS_MAX) - _TICKS_HALFPERIOD
+
+
+def ticks_less(ticks1, ticks2):
+    return ticks_diff(ticks1, ticks2) < 0
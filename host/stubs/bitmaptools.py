@@ -0,0 +1,38 @@
+# Desktop stand-in for CircuitPython's bitmaptools (only what the firmware uses).
+# Works directly on the displayio stand-in's pixel storage, since the real
+# functions are native code and shouldn't dominate host timings.
+
+
+# Fill the rectangle from (x1, y1) up to but not including (x2, y2).
+def fill_region(dest_bitmap, x1, y1, x2, y2, value):
+    x1, x2 = max(min(x1, x2), 0), min(max(x1, x2), dest_bitmap.width)
+    y1, y2 = max(min(y1, y2), 0), min(max(y1, y2), dest_bitmap.height)
+
+    if x1 >= x2:
+        return
+
+    row = bytes((value,)) * (x2 - x1)
+    data = dest_bitmap._data
+    width = dest_bitmap.width
+
+    for y in range(y1, y2):
+        data[y * width + x1:y * width + x2] = row
+
+
+# Read a bitmap's pixels from a file, row by row. Only what binary_font.py
+# uses: 1 bit per pixel, MSB first, rows padded to whole bytes.
+def readinto(bitmap, file, bits_per_pixel, element_size=1, reverse_pixels_in_element=False,
+             swap_bytes_in_element=False, reverse_rows=False):
+    if bits_per_pixel != 1 or element_size != 1 or reverse_pixels_in_element or swap_bytes_in_element or reverse_rows:
+        raise NotImplementedError("bitmaptools.readinto stand-in only reads 1 bit MSB first rows")
+
+    width = bitmap.width
+    row_bytes = (width + 7) // 8
+    data = bitmap._data
+
+    for y in range(bitmap.height):
+        row = file.read(row_bytes)
+        offset = y * width
+
+        for x in range(width):
+            data[offset + x] = (row[x >> 3] >> (7 - (x & 7))) & 1
@@ -0,0 +1,42 @@
+# Desktop stand-in for the MagTag's board module.
+
+NEOPIXEL = "NEOPIXEL"
+BUTTON_A = "BUTTON_A"
+BUTTON_B = "BUTTON_B"
+BUTTON_C = "BUTTON_C"
+BUTTON_D = "BUTTON_D"
+BOOT0 = "BOOT0"
+
+
+class _I2C:
+    def try_lock(self):
+        return True
+
+    def unlock(self):
+        pass
+
+
+def I2C():
+    return _I2C()
+
+
+class _EPaperDisplay:
+    # Mirrors the MagTag's 296x128 panel. on_refresh, if set, is called with
+    # the display whenever refresh() is invoked.
+    def __init__(self):
+        self.width = 296
+        self.height = 128
+        self.rotation = 270
+        self.root_group = None
+        self.time_to_refresh = 0
+        self.refresh_count = 0
+        self.on_refresh = None
+
+    def refresh(self):
+        self.refresh_count += 1
+
+        if self.on_refresh is not None:
+            self.on_refresh(self)
+
+
+DISPLAY = _EPaperDisplay()
@@ -0,0 +1,246 @@
+# Desktop stand-in for CircuitPython's displayio module.
+# Objects keep real pixel storage so the host tools can time allocations
+# and, later, rasterize the display tree.
+
+class Bitmap:
+    def __init__(self, width, height, value_count):
+        self._width = width
+        self._height = height
+        self._value_count = value_count
+        self._data = bytearray(width * height)
+
+    @property
+    def width(self):
+        return self._width
+
+    @property
+    def height(self):
+        return self._height
+
+    def _index(self, key):
+        if isinstance(key, tuple):
+            x, y = key
+            return y * self._width + x
+        return key
+
+    def __getitem__(self, key):
+        return self._data[self._index(key)]
+
+    def __setitem__(self, key, value):
+        self._data[self._index(key)] = value
+
+    def fill(self, value):
+        for i in range(len(self._data)):
+            self._data[i] = value
+
+    def dirty(self, x1=0, y1=0, x2=-1, y2=-1):
+        pass
+
+
+class Palette:
+    def __init__(self, color_count, *, dither=False):
+        self._colors = [0] * color_count
+        self._transparent = [False] * color_count
+
+    def __len__(self):
+        return len(self._colors)
+
+    def __getitem__(self, index):
+        return self._colors[index]
+
+    def __setitem__(self, index, color):
+        self._colors[index] = color
+
+    def make_transparent(self, index):
+        self._transparent[index] = True
+
+    def make_opaque(self, index):
+        self._transparent[index] = False
+
+    def is_transparent(self, index):
+        return self._transparent[index]
+
+
+class ColorConverter:
+    def __init__(self, *, input_colorspace=None, dither=False):
+        self._transparent_color = None
+
+    def convert(self, color):
+        return color
+
+    def make_transparent(self, color):
+        self._transparent_color = color
+
+    def make_opaque(self, color):
+        self._transparent_color = None
+
+
+class OnDiskBitmap:
+    # Reads the whole BMP up front; 1, 4, 8 and 24 bit images are supported.
+    def __init__(self, file):
+        if isinstance(file, str):
+            with open(file, "rb") as f:
+                data = f.read()
+        else:
+            data = file.read()
+
+        offset = int.from_bytes(data[10:14], "little")
+        header_size = int.from_bytes(data[14:18], "little")
+        width = int.from_bytes(data[18:22], "little", signed=True)
+        height = int.from_bytes(data[22:26], "little", signed=True)
+        bpp = int.from_bytes(data[28:30], "little")
+        color_count = int.from_bytes(data[46:50], "little")
+
+        if bpp <= 8:
+            color_count = color_count or (1 << bpp)
+            self._pixel_shader = Palette(color_count)
+            table = 14 + header_size
+            for i in range(color_count):
+                b, g, r = data[table + i * 4:table + i * 4 + 3]
+                self._pixel_shader[i] = (r << 16) | (g << 8) | b
+        else:
+            self._pixel_shader = ColorConverter()
+
+        bottom_up = height > 0
+        height = abs(height)
+        stride = ((width * bpp + 31) // 32) * 4
+
+        self._width = width
+        self._height = height
+        self._pixels = [0] * (width * height)
+
+        for row in range(height):
+            y = height - 1 - row if bottom_up else row
+            start = offset + row * stride
+            for x in range(width):
+                if bpp == 24:
+                    b, g, r = data[start + x * 3:start + x * 3 + 3]
+                    value = (r << 16) | (g << 8) | b
+                else:
+                    bit = x * bpp
+                    byte = data[start + bit // 8]
+                    shift = 8 - bpp - (bit % 8)
+                    value = (byte >> shift) & ((1 << bpp) - 1)
+                self._pixels[y * width + x] = value
+
+    @property
+    def width(self):
+        return self._width
+
+    @property
+    def height(self):
+        return self._height
+
+    @property
+    def pixel_shader(self):
+        return self._pixel_shader
+
+    def __getitem__(self, key):
+        if isinstance(key, tuple):
+            x, y = key
+            return self._pixels[y * self._width + x]
+        return self._pixels[key]
+
+
+class TileGrid:
+    def __init__(self, bitmap, *, pixel_shader, width=1, height=1,
+                 tile_width=None, tile_height=None, default_tile=0, x=0, y=0):
+        self._bitmap = bitmap
+        self._pixel_shader = pixel_shader
+        self._width = width
+        self._height = height
+        self._tile_width = tile_width if tile_width is not None else bitmap.width
+        self._tile_height = tile_height if tile_height is not None else bitmap.height
+        self._tiles = [default_tile] * (width * height)
+        self.x = x
+        self.y = y
+        self.hidden = False
+        self.flip_x = False
+        self.flip_y = False
+        self.transpose_xy = False
+
+    @property
+    def bitmap(self):
+        return self._bitmap
+
+    @property
+    def pixel_shader(self):
+        return self._pixel_shader
+
+    @pixel_shader.setter
+    def pixel_shader(self, shader):
+        self._pixel_shader = shader
+
+    @property
+    def width(self):
+        return self._width
+
+    @property
+    def height(self):
+        return self._height
+
+    @property
+    def tile_width(self):
+        return self._tile_width
+
+    @property
+    def tile_height(self):
+        return self._tile_height
+
+    def __getitem__(self, key):
+        if isinstance(key, tuple):
+            x, y = key
+            return self._tiles[y * self._width + x]
+        return self._tiles[key]
+
+    def __setitem__(self, key, value):
+        if isinstance(key, tuple):
+            x, y = key
+            key = y * self._width + x
+        self._tiles[key] = value
+
+
+class Group:
+    def __init__(self, *, scale=1, x=0, y=0):
+        self._children = []
+        self.scale = scale
+        self.x = x
+        self.y = y
+        self.hidden = False
+
+    def append(self, layer):
+        self._children.append(layer)
+
+    def insert(self, index, layer):
+        self._children.insert(index, layer)
+
+    def index(self, layer):
+        return self._children.index(layer)
+
+    def pop(self, i=-1):
+        return self._children.pop(i)
+
+    def remove(self, layer):
+        self._children.remove(layer)
+
+    def __len__(self):
+        return len(self._children)
+
+    def __getitem__(self, index):
+        return self._children[index]
+
+    def __setitem__(self, index, layer):
+        self._children[index] = layer
+
+    def __delitem__(self, index):
+        del self._children[index]
+
+    def __iter__(self):
+        return iter(self._children)
+
+    def __contains__(self, layer):
+        return layer in self._children
+
+
+def release_displays():
+    pass
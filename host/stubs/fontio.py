@@ -0,0 +1,12 @@
+# Desktop stand-in for CircuitPython's fontio module.
+from collections import namedtuple
+
+Glyph = namedtuple("Glyph", ["bitmap", "tile_index", "width", "height", "dx", "dy", "shift_x", "shift_y"])
+
+
+class FontProtocol:
+    pass
+
+
+class BuiltinFont(FontProtocol):
+    pass
@@ -0,0 +1,4 @@
+# Desktop stand-in for microcontroller. nvm is a zeroed bytearray the size
+# of the ESP32-S2's, so it starts empty on every run.
+
+nvm = bytearray(8192)
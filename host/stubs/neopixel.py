@@ -0,0 +1,24 @@
+# Desktop stand-in for neopixel.
+
+
+class NeoPixel:
+    def __init__(self, pin, n, *, brightness=1.0, auto_write=True, pixel_order=None):
+        self._pixels = [0] * n
+        self.brightness = brightness
+        self.auto_write = auto_write
+
+    def __len__(self):
+        return len(self._pixels)
+
+    def __getitem__(self, index):
+        return self._pixels[index]
+
+    def __setitem__(self, index, color):
+        self._pixels[index] = color
+
+    def fill(self, color):
+        for i in range(len(self._pixels)):
+            self._pixels[i] = color
+
+    def show(self):
+        pass
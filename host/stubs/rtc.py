@@ -0,0 +1,7 @@
+# Desktop stand-in for rtc. Setting datetime is accepted and ignored;
+# time.localtime() keeps following the host clock.
+
+
+class RTC:
+    def __init__(self):
+        self.datetime = None
@@ -0,0 +1,114 @@
+# Desktop stand-in for socketpool, backed by CPython sockets.
+#
+# If `handler` is set, sockets don't touch the network: each HTTP request
+# written to one is passed to handler(method, url, headers), which returns an
+# adafruit_requests.Response (or raises OSError), and the response is served
+# back over the same socket with keep-alive.
+#
+# If `redirect` is set to a (host, port), every connection goes there over
+# plain TCP, whatever the URL, e.g. to a local fake server (host.fake_server).
+import socket as _socket
+
+handler = None
+redirect = None
+
+# Sockets opened while `handler` is set.
+opened = 0
+
+
+class _HandlerSocket:
+    def __init__(self):
+        self._https = False
+        self._host = None
+        self._request = b""
+        self._response = b""
+        self._closed = False
+
+    def settimeout(self, timeout):
+        pass
+
+    def setsockopt(self, *args):
+        pass
+
+    # Called by the adafruit_connection_manager stand-in's SSL context.
+    def start_tls(self, server_hostname):
+        self._https = True
+
+    def connect(self, address):
+        pass
+
+    def send(self, data):
+        if self._closed:
+            raise OSError(32, "Broken pipe")
+
+        self._request += bytes(data)
+        return len(data)
+
+    def recv_into(self, buffer, nbytes=0):
+        if self._closed:
+            raise OSError(9, "Bad file descriptor")
+
+        if not self._response and b"\r\n\r\n" in self._request:
+            self._respond()
+
+        count = min(nbytes or len(buffer), len(buffer), len(self._response))
+        buffer[0:count] = self._response[:count]
+        self._response = self._response[count:]
+        return count
+
+    def _respond(self):
+        head, _, self._request = self._request.partition(b"\r\n\r\n")
+        lines = head.decode("utf-8").split("\r\n")
+        method, path, _ = lines[0].split(" ", 2)
+        headers = {}
+
+        for line in lines[1:]:
+            name, _, value = line.partition(":")
+            headers[name.strip()] = value.strip()
+
+        url = f"{'https' if self._https else 'http'}://{headers.get('Host', '')}{path}"
+        response = handler(method, url, headers)
+        body = response.content
+
+        self._response = (
+            f"HTTP/1.1 {response.status_code} {response.reason.decode('utf-8')}\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            "Connection: keep-alive\r\n"
+            "\r\n"
+        ).encode("utf-8") + body
+
+    def close(self):
+        self._closed = True
+
+
+class SocketPool:
+    AF_INET = _socket.AF_INET
+    SOCK_STREAM = _socket.SOCK_STREAM
+    SOCK_DGRAM = _socket.SOCK_DGRAM
+    IPPROTO_TCP = _socket.IPPROTO_TCP
+    SOL_SOCKET = _socket.SOL_SOCKET
+    SO_REUSEADDR = _socket.SO_REUSEADDR
+    TCP_NODELAY = _socket.TCP_NODELAY
+    EAGAIN = 11
+    ETIMEDOUT = 116
+
+    def __init__(self, radio):
+        self._radio = radio
+
+    def getaddrinfo(self, host, port, family=0, type=0, proto=0, flags=0):
+        if handler is not None:
+            return [(_socket.AF_INET, _socket.SOCK_STREAM, 0, "", ("192.0.2.1", port))]
+
+        if redirect is not None:
+            return [(_socket.AF_INET, _socket.SOCK_STREAM, 0, "", redirect)]
+
+        return _socket.getaddrinfo(host, port, family, type or _socket.SOCK_STREAM, proto, flags)
+
+    def socket(self, family=AF_INET, type=SOCK_STREAM, proto=0):
+        global opened
+
+        if handler is not None:
+            opened += 1
+            return _HandlerSocket()
+
+        return _socket.socket(family, type, proto)
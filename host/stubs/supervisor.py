@@ -0,0 +1,20 @@
+# Desktop stand-in for supervisor. reload() unwinds the running program with
+# ReloadRequested so host tools can observe it instead of restarting.
+
+
+class ReloadRequested(BaseException):
+    pass
+
+
+reload_count = 0
+
+
+def reload():
+    global reload_count
+    reload_count += 1
+    raise ReloadRequested()
+
+
+def ticks_ms():
+    import adafruit_ticks
+    return adafruit_ticks.ticks_ms()
@@ -0,0 +1,7 @@
+# Desktop stand-in for terminalio. There is no BDF of the builtin font in the
+# tree, so the 12px New Science Medium font stands in for it.
+import os
+
+from adafruit_bitmap_font import bitmap_font
+
+FONT = bitmap_font.load_font(os.path.join("assets", "fonts", "new-science-medium-12.bdf"))
@@ -0,0 +1,18 @@
+# Desktop stand-in for wifi. Connecting always succeeds.
+
+
+class _Radio:
+    def __init__(self):
+        self.enabled = True
+        self.connected = False
+        self.ipv4_address = None
+
+    def connect(self, ssid, password=None, *, channel=0, bssid=None, timeout=None):
+        self.connected = True
+        self.ipv4_address = "127.0.0.1"
+
+    def stop_station(self):
+        self.connected = False
+
+
+radio = _Radio()
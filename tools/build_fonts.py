@@ -0,0 +1,135 @@
+# Builds the precompiled fonts read by binary_font.py: each
+# CIRCUITPY/assets/fonts/*.bdf is converted to a .bin next to it. Needs only
+# a desktop Python.
+#
+# Usage: python tools/build_fonts.py [FONT.bdf ...]
+#
+# File format (little endian, so the index can be read straight into memory):
+#   b"BFNT", version (B), bounding box width, height, x offset, y offset (h),
+#   ascent (h), descent (h), glyph count (H), page count (H)
+#   pages: 256 bytes, by code point high byte, page number + 1 or 0 for none
+#   glyph indexes: page count * 256 (H), by code point low byte, 0xFFFF for none
+#   glyphs: width (B), height (B), dx (b), dy (b), shift x (b), shift y (b),
+#   bitmap offset (I) each
+#   bitmaps: height rows of width bits each, MSB first, rows padded to whole
+#   bytes. Offsets are from the start of this section.
+# Only code points up to U+FFFF are supported.
+import glob
+import os
+import struct
+import sys
+
+FONTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "CIRCUITPY", "assets", "fonts")
+
+NO_GLYPH = 0xFFFF
+
+
+def _parse_bdf(path):
+    font = {"bounding_box": (0, 0, 0, 0), "ascent": 0, "descent": 0}
+    glyphs = {}
+    encoding = None
+    rows = None
+
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            fields = line.split()
+
+            if not fields:
+                continue
+
+            if rows is not None:
+                if fields[0] == "ENDCHAR":
+                    if encoding is not None and encoding >= 0:
+                        glyphs[encoding] = (width, height, dx, dy, shift_x, shift_y, _pack_rows(rows, width))
+                    rows = None
+                    encoding = None
+                else:
+                    rows.append(fields[0])
+                continue
+
+            keyword = fields[0]
+
+            if keyword == "FONTBOUNDINGBOX":
+                font["bounding_box"] = tuple(int(v) for v in fields[1:5])
+            elif keyword == "FONT_ASCENT":
+                font["ascent"] = int(fields[1])
+            elif keyword == "FONT_DESCENT":
+                font["descent"] = int(fields[1])
+            elif keyword == "STARTCHAR":
+                shift_x = shift_y = 0
+                width = height = dx = dy = 0
+            elif keyword == "ENCODING":
+                encoding = int(fields[1])
+            elif keyword == "DWIDTH":
+                shift_x, shift_y = int(fields[1]), int(fields[2])
+            elif keyword == "BBX":
+                width, height, dx, dy = (int(v) for v in fields[1:5])
+            elif keyword == "BITMAP":
+                rows = []
+
+    font["glyphs"] = glyphs
+    return font
+
+
+# BDF rows are hex, left aligned and padded to whole bytes; repack them to
+# exactly (width + 7) // 8 bytes each.
+def _pack_rows(rows, width):
+    row_bytes = (width + 7) // 8
+    packed = bytearray()
+
+    for row in rows:
+        bits = int(row, 16) if row else 0
+        bits >>= max(len(row) * 4 - row_bytes * 8, 0)
+        bits <<= max(row_bytes * 8 - len(row) * 4, 0)
+        packed += bits.to_bytes(row_bytes, "big")
+
+    return bytes(packed)
+
+
+def _build(font):
+    glyphs = font["glyphs"]
+    code_points = sorted(glyphs)
+
+    if code_points and code_points[-1] > 0xFFFF:
+        raise ValueError("Code points above U+FFFF aren't supported")
+
+    page_numbers = sorted({code_point >> 8 for code_point in code_points})
+    pages = bytearray(256)
+    indexes = [NO_GLYPH] * (len(page_numbers) * 256)
+
+    for number, page in enumerate(page_numbers):
+        pages[page] = number + 1
+
+    glyph_table = bytearray()
+    bitmaps = bytearray()
+
+    for index, code_point in enumerate(code_points):
+        width, height, dx, dy, shift_x, shift_y, bitmap = glyphs[code_point]
+        indexes[(pages[code_point >> 8] - 1) * 256 + (code_point & 0xFF)] = index
+        glyph_table += struct.pack("<BBbbbbI", width, height, dx, dy, shift_x, shift_y, len(bitmaps))
+        bitmaps += bitmap
+
+    header = b"BFNT" + struct.pack("<BhhhhhhHH", 1, *font["bounding_box"], font["ascent"], font["descent"],
+                                   len(code_points), len(page_numbers))
+
+    return header + bytes(pages) + struct.pack(f"<{len(indexes)}H", *indexes) + bytes(glyph_table) + bytes(bitmaps)
+
+
+def main(argv):
+    paths = argv[1:] or sorted(glob.glob(os.path.join(FONTS_DIR, "*.bdf")))
+
+    for path in paths:
+        font = _parse_bdf(path)
+        output = os.path.splitext(path)[0] + ".bin"
+
+        with open(output, "wb") as f:
+            f.write(_build(font))
+
+        print(f"Wrote {os.path.normpath(output)}: {len(font['glyphs'])} glyphs, "
+              f"{os.path.getsize(output)} bytes (from {os.path.getsize(path)})")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
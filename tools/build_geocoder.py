@@ -0,0 +1,227 @@
+# Builds CIRCUITPY/assets/geocoder.bin, the country/region grid used by
+# offline_geocoder.py. Needs a desktop Python with:
+#   pip install numpy pyshp
+# and two data files:
+#   * Natural Earth 1:110m admin 0 countries, as a shapefile
+#     (naturalearth_lowres.shp, also bundled with geopandas < 1.0).
+#   * GeoNames places as CSV with lat,lon,name,admin1,admin2,cc columns
+#     (rg_cities1000.csv, bundled with the reverse_geocoder package).
+#
+# Usage: python tools/build_geocoder.py COUNTRIES.shp PLACES.csv
+#
+# Each cell gets the country whose polygon contains its center (coastal
+# cells outside every polygon borrow a neighbour's), and the first-level
+# region (state, province, ...) of the nearest GeoNames place in that country.
+#
+# File format (little endian, so arrays can be read straight into memory):
+#   b"RGEO", version (B), cell size in hundredths of a degree (H),
+#   width (H), height (H), country count (H), region count (H), run count (I)
+#   country names: count + 1 offsets (H) into a UTF-8 blob, then the blob
+#   regions: country index (H) each, then count + 1 name offsets (H) into a
+#   UTF-8 blob, then the blob (an empty name means the region is unknown)
+#   row starts: height + 1 run indexes (I)
+#   runs: (first column (H), region index + 1 or 0 for none (H)) each
+# Row 0 starts at 90N, column 0 at 180W.
+import csv
+import os
+import struct
+import sys
+from collections import Counter
+
+import numpy as np
+import shapefile
+
+CELL_SIZE = 0.5
+OUTPUT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "CIRCUITPY", "assets", "geocoder.bin")
+
+# A country needs this many places inside its polygon before their regions
+# are used for it (so a few places just across a border don't count).
+MIN_PLACES = 3
+
+# Natural Earth's short names, spelled out the way Geoapify spells them.
+COUNTRY_NAMES = {
+    "United States of America": "United States",
+    "Dem. Rep. Congo": "Democratic Republic of the Congo",
+    "Congo": "Republic of the Congo",
+    "Central African Rep.": "Central African Republic",
+    "Dominican Rep.": "Dominican Republic",
+    "Eq. Guinea": "Equatorial Guinea",
+    "Bosnia and Herz.": "Bosnia and Herzegovina",
+    "Solomon Is.": "Solomon Islands",
+    "Falkland Is.": "Falkland Islands",
+    "Fr. S. Antarctic Lands": "French Southern and Antarctic Lands",
+    "S. Sudan": "South Sudan",
+    "W. Sahara": "Western Sahara",
+    "N. Cyprus": "Northern Cyprus",
+    "eSwatini": "Eswatini",
+}
+
+
+def _rasterize(reader, width, height):
+    grid = np.zeros((height, width), np.int32)
+    names = []
+    centers_lat = 90 - (np.arange(height) + 0.5) * CELL_SIZE
+    centers_lon = -180 + (np.arange(width) + 0.5) * CELL_SIZE
+
+    for shape_record in reader.iterShapeRecords():
+        name = shape_record.record["name"]
+        names.append(COUNTRY_NAMES.get(name, name))
+        index = len(names)
+        shape = shape_record.shape
+        inside = np.zeros((height, width), bool)
+        parts = list(shape.parts) + [len(shape.points)]
+
+        # Even-odd scanline fill over all rings, so holes come out right.
+        for start, end in zip(parts[:-1], parts[1:]):
+            ring = np.array(shape.points[start:end])
+            x1, y1 = ring[:-1, 0], ring[:-1, 1]
+            x2, y2 = ring[1:, 0], ring[1:, 1]
+
+            for row in np.nonzero((centers_lat >= ring[:, 1].min()) & (centers_lat <= ring[:, 1].max()))[0]:
+                lat = centers_lat[row]
+                crossing = (y1 > lat) != (y2 > lat)
+
+                if not crossing.any():
+                    continue
+
+                xs = x1[crossing] + (lat - y1[crossing]) * (x2[crossing] - x1[crossing]) / (y2[crossing] - y1[crossing])
+
+                for x in xs:
+                    inside[row] ^= centers_lon < x
+
+        grid[inside] = index
+
+    return grid, names
+
+
+def _load_places(path):
+    with open(path, newline="", encoding="utf-8") as f:
+        rows = list(csv.DictReader(f))
+
+    lat = np.array([float(row["lat"]) for row in rows])
+    lon = np.array([float(row["lon"]) for row in rows])
+    return lat, lon, [row["cc"] for row in rows], [row["admin1"] for row in rows]
+
+
+def _unit_vectors(lat, lon):
+    lat = np.radians(lat)
+    lon = np.radians(lon)
+    return np.stack([np.cos(lat) * np.cos(lon), np.cos(lat) * np.sin(lon), np.sin(lat)], axis=-1)
+
+
+def _name_table(names):
+    blob = bytearray()
+    offsets = [0]
+
+    for name in names:
+        blob += name.encode("utf-8")
+        offsets.append(len(blob))
+
+    if len(blob) > 0xFFFF:
+        raise ValueError("Name table too large for 16 bit offsets")
+
+    return struct.pack(f"<{len(offsets)}H", *offsets) + bytes(blob)
+
+
+def main(argv):
+    if len(argv) != 3:
+        print("Usage: python tools/build_geocoder.py COUNTRIES.shp PLACES.csv")
+        return 1
+
+    height = int(180 / CELL_SIZE)
+    width = int(360 / CELL_SIZE)
+
+    grid, countries = _rasterize(shapefile.Reader(argv[1]), width, height)
+
+    # Coastal cells outside every polygon take the country of a neighbour,
+    # wrapping around the antimeridian but not over the poles.
+    coast = grid.copy()
+    for dy in (-1, 0, 1):
+        for dx in (-1, 0, 1):
+            shifted = np.roll(grid, dx, axis=1)
+            if dy > 0:
+                shifted = np.vstack([np.zeros((dy, width), grid.dtype), shifted[:-dy]])
+            elif dy < 0:
+                shifted = np.vstack([shifted[-dy:], np.zeros((-dy, width), grid.dtype)])
+            coast = np.where(coast == 0, shifted, coast)
+    grid = coast
+
+    # Which places lie in which country.
+    place_lat, place_lon, place_cc, place_admin1 = _load_places(argv[2])
+    rows = np.clip(((90 - place_lat) / CELL_SIZE).astype(int), 0, height - 1)
+    cols = np.clip(((place_lon + 180) / CELL_SIZE).astype(int), 0, width - 1)
+    place_country = grid[rows, cols]
+
+    codes = {}
+    for country, cc in zip(place_country, place_cc):
+        if country:
+            codes.setdefault(country, Counter())[cc] += 1
+
+    place_vectors = _unit_vectors(place_lat, place_lon)
+    cell_lat, cell_lon = np.meshgrid(90 - (np.arange(height) + 0.5) * CELL_SIZE,
+                                     -180 + (np.arange(width) + 0.5) * CELL_SIZE, indexing="ij")
+    cell_vectors = _unit_vectors(cell_lat, cell_lon)
+
+    regions = []
+    region_index = {}
+    cells = np.zeros((height, width), np.int32)
+
+    for country in range(1, len(countries) + 1):
+        country_cells = np.nonzero(grid == country)
+        counted = codes.get(country, Counter())
+        candidates = np.array([cc in counted and counted[cc] >= MIN_PLACES for cc in place_cc])
+        candidates = np.nonzero(candidates)[0]
+
+        if len(candidates) == 0:
+            admin1 = [""] * len(country_cells[0])
+        else:
+            vectors = cell_vectors[country_cells]
+            nearest = np.empty(len(vectors), np.int64)
+
+            for start in range(0, len(vectors), 512):
+                dots = vectors[start:start + 512] @ place_vectors[candidates].T
+                nearest[start:start + 512] = candidates[dots.argmax(axis=1)]
+
+            admin1 = [place_admin1[i] for i in nearest]
+
+        for row, col, name in zip(*country_cells, admin1):
+            key = (country - 1, name)
+
+            if key not in region_index:
+                region_index[key] = len(regions)
+                regions.append(key)
+
+            cells[row, col] = region_index[key] + 1
+
+    # Run length encode each row.
+    row_starts = [0]
+    runs = []
+
+    for row in range(height):
+        previous = None
+
+        for col in range(width):
+            value = int(cells[row, col])
+
+            if value != previous:
+                runs.append((col, value))
+                previous = value
+
+        row_starts.append(len(runs))
+
+    with open(OUTPUT, "wb") as f:
+        f.write(b"RGEO")
+        f.write(struct.pack("<BHHHHHI", 1, round(CELL_SIZE * 100), width, height, len(countries), len(regions), len(runs)))
+        f.write(_name_table(countries))
+        f.write(struct.pack(f"<{len(regions)}H", *[country for country, _ in regions]))
+        f.write(_name_table([name for _, name in regions]))
+        f.write(struct.pack(f"<{len(row_starts)}I", *row_starts))
+        f.write(b"".join(struct.pack("<HH", *run) for run in runs))
+
+    print(f"Wrote {os.path.normpath(OUTPUT)}: {len(countries)} countries, {len(regions)} regions, "
+          f"{len(runs)} runs, {os.path.getsize(OUTPUT)} bytes")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
@@ -0,0 +1,71 @@
+# Generates CIRCUITPY/glyph_coverage.py, the table fonts.contains_glyph uses
+# to tell whether a code point can be drawn, from the text fonts'
+# .bdf files. Run it whenever those fonts change. Needs only a desktop
+# Python.
+#
+# Usage: python tools/build_glyph_coverage.py
+#
+# A code point counts as covered only if every text font has it, so the
+# same name can be drawn at any size. The table is a bytes literal of
+# little endian (H) code point ranges, each a first and an end (one past
+# the last), sorted, so it can be wrapped in an array and binary searched
+# without building any Python ints or sets.
+import os
+import struct
+import sys
+
+from build_fonts import FONTS_DIR, _parse_bdf
+
+# The numeric fonts only have digits, so they're left out.
+TEXT_FONTS = (
+    "new-science-medium-12.bdf",
+    "new-science-medium-13.bdf",
+    "new-science-medium-16.bdf",
+    "new-science-medium-21.bdf",
+)
+
+OUTPUT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "CIRCUITPY", "glyph_coverage.py")
+
+BYTES_PER_LINE = 16
+
+
+def _ranges(code_points):
+    ranges = []
+
+    for code_point in sorted(code_points):
+        if ranges and ranges[-1][1] == code_point:
+            ranges[-1][1] = code_point + 1
+        else:
+            ranges.append([code_point, code_point + 1])
+
+    return ranges
+
+
+def main():
+    fonts = [set(_parse_bdf(os.path.join(FONTS_DIR, name))["glyphs"]) for name in TEXT_FONTS]
+    covered = set.intersection(*fonts)
+
+    if max(covered) >= 0xFFFF:
+        raise ValueError("Code points above U+FFFE aren't supported")
+
+    ranges = _ranges(covered)
+    table = b"".join(struct.pack("<HH", first, end) for first, end in ranges)
+    lines = []
+
+    for start in range(0, len(table), BYTES_PER_LINE):
+        chunk = table[start:start + BYTES_PER_LINE]
+        lines.append('    b"' + "".join(f"\\x{b:02x}" for b in chunk) + '"')
+
+    with open(OUTPUT, "w") as f:
+        f.write("# Generated by tools/build_glyph_coverage.py from the text fonts; don't edit.\n")
+        f.write(f"# {len(covered)} code points in {len(ranges)} ranges of (first, end) as little endian H.\n")
+        f.write("RANGES = (\n")
+        f.write("\n".join(lines))
+        f.write("\n)\n")
+
+    print(f"Wrote {os.path.normpath(OUTPUT)}: {len(covered)} code points in {len(ranges)} ranges, {len(table)} bytes")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
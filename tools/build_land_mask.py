@@ -0,0 +1,84 @@
+# Builds CIRCUITPY/assets/land-mask.bin, the bit-packed land/ocean grid used by
+# land_mask.py, from the 1 km GLOBE land mask bundled with the
+# global-land-mask package. Needs a desktop Python with:
+#   pip install numpy global-land-mask
+#
+# A cell counts as land if any land falls inside it, and land is then grown
+# by one cell so coasts and small islands still get looked up online.
+# Water that isn't connected to the open ocean (lakes, the Caspian) is also
+# counted as land, since ocean names don't apply there. Straits like
+# Gibraltar and the Bosporus are narrower than a cell, so the connection is
+# followed through every cell with any water in it, not just all-water ones;
+# at this cell size that reaches the enclosed seas without leaking up rivers
+# into lakes.
+#
+# File format (big endian):
+#   b"LMSK", version (B), cell size in hundredths of a degree (H), width (H), height (H)
+#   then height rows of width bits, MSB first, 1 = land. Row 0 starts at 90N,
+#   column 0 at 180W.
+import os
+import struct
+import sys
+from collections import deque
+
+import numpy as np
+from global_land_mask import globe
+
+CELL_SIZE = 0.5
+OUTPUT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "CIRCUITPY", "assets", "land-mask.bin")
+
+# A point in the middle of the Pacific, to flood fill the open ocean from.
+OCEAN_SEED = (0.0, -140.0)
+
+
+def main():
+    # The package's mask is True for water.
+    source = ~globe._mask
+    source_rows, source_cols = source.shape
+    height = int(180 / CELL_SIZE)
+    width = int(360 / CELL_SIZE)
+    block = source_rows // height
+
+    blocks = source.reshape(height, block, width, block)
+    land = blocks.any(axis=(1, 3))
+    has_water = ~blocks.all(axis=(1, 3))
+
+    # Grow land by one cell, wrapping around the antimeridian.
+    grown = land.copy()
+    for dy in (-1, 0, 1):
+        for dx in (-1, 0, 1):
+            shifted = np.roll(land, dx, axis=1)
+            if dy > 0:
+                shifted = np.vstack([np.zeros((dy, width), bool), shifted[:-dy]])
+            elif dy < 0:
+                shifted = np.vstack([shifted[-dy:], np.zeros((-dy, width), bool)])
+            grown |= shifted
+
+    # Keep only water connected to the open ocean.
+    ocean = np.zeros_like(land)
+    seed_row = int((90 - OCEAN_SEED[0]) / CELL_SIZE)
+    seed_col = int((OCEAN_SEED[1] + 180) / CELL_SIZE)
+    queue = deque([(seed_row, seed_col)])
+    ocean[seed_row, seed_col] = True
+
+    while queue:
+        row, col = queue.popleft()
+        for next_row, next_col in ((row - 1, col), (row + 1, col), (row, (col - 1) % width), (row, (col + 1) % width)):
+            if 0 <= next_row < height and has_water[next_row, next_col] and not ocean[next_row, next_col]:
+                ocean[next_row, next_col] = True
+                queue.append((next_row, next_col))
+
+    mask = ~ocean | grown
+    packed = np.packbits(mask, axis=1)
+
+    with open(OUTPUT, "wb") as f:
+        f.write(b"LMSK")
+        f.write(struct.pack(">BHHH", 1, round(CELL_SIZE * 100), width, height))
+        f.write(packed.tobytes())
+
+    print(f"Wrote {os.path.normpath(OUTPUT)}: {width}x{height} cells, {mask.mean() * 100:.1f}% land, {os.path.getsize(OUTPUT)} bytes")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())